@@ -0,0 +1,244 @@
+"""
+Aggregations behind the dashboard sections
+"""
+import numpy as np
+import pandas as pd
+
+# Columns summed / averaged per player in the season aggregates
+SUM_COLUMNS = [
+    'goals', 'assists', 'points', 'plus_minus', 'shots', 'passes', 'hits',
+    'giveaways', 'takeaways', 'interceptions', 'possession_minutes'
+]
+MEAN_COLUMNS = [
+    'war', 'total_offense', 'total_defense', 'efficiency', 'shot_pct', 'pass_pct',
+    'points', 'giveaways'
+]
+AGGREGATE_COLUMNS = list(dict.fromkeys(SUM_COLUMNS + MEAN_COLUMNS))
+
+# Build splits: one table row per (player, split column value)
+SPLIT_COLUMNS = ['position', 'player_class']
+
+PLAYER_GAME_LOG_COLUMNS = [
+    'match_id', 'timestamp', 'player_name', 'goals', 'assists', 'points', 'score',
+    'opponent_score', 'result', 'outcome', 'plus_minus', 'shots', 'pass_pct', 'giveaways',
+    'war', 'efficiency'
+]
+
+
+def get_team_record(data):
+    """Team record as W-L, or W-L-OTL once there are overtime losses"""
+    games = data.groupby('match_id')[['is_win', 'is_ot_loss']].first()
+    wins = int(games['is_win'].sum())
+    ot_losses = int(games['is_ot_loss'].sum())
+    losses = len(games) - wins - ot_losses
+    return f"{wins}-{losses}-{ot_losses}" if ot_losses else f"{wins}-{losses}"
+
+
+def split_wins_losses(df):
+    """Split player rows into (wins_df, losses_df) by the game's outcome"""
+    return df[df['is_win']], df[df['is_loss']]
+
+
+def team_split_metrics(data):
+    """Team-level averages shown in the Wins vs Losses section"""
+    return {
+        'pass_pct': data['pass_pct'].mean(),
+        'giveaways_per_game': data.groupby('match_id')['giveaways'].sum().mean(),
+        'hits_per_game': data.groupby('match_id')['hits'].sum().mean(),
+        'team_war': data.groupby('match_id')['war'].mean().mean(),
+        'shot_pct': data['shot_pct'].mean(),
+        'total_offense': data['total_offense'].mean(),
+        'total_defense': data['total_defense'].mean(),
+    }
+
+
+def get_game_trends(df):
+    """Per-game team averages/totals ordered by date"""
+    return df.groupby(['match_id', 'game_date', 'outcome'], observed=True).agg({
+        'war': 'mean',
+        'pass_pct': 'mean',
+        'giveaways': 'sum',
+        'total_offense': 'mean',
+        'total_defense': 'mean'
+    }).reset_index().sort_values('game_date')
+
+
+def _with_all_split(frame):
+    """Append an 'all' row per player (sum of the win and loss partitions)"""
+    total = frame.groupby(level='player_name', observed=True).sum()
+    total.index = pd.MultiIndex.from_product([total.index, ['all']], names=['player_name', 'split'])
+    return pd.concat([frame, total])
+
+
+def compute_player_aggregates(df):
+    """Per-player totals and averages for all games, wins and losses
+
+    One row per (player_name, split). Sums are stored as `<col>_sum` and
+    averages as `<col>_mean`, so any split can be looked up without touching
+    the game-level rows.
+    """
+    split = np.where(df['is_win'], 'wins', 'losses')
+    grouped = df.groupby([df['player_name'], pd.Series(split, index=df.index, name='split')], observed=True)
+
+    sums = _with_all_split(grouped[AGGREGATE_COLUMNS].sum())
+    counts = _with_all_split(grouped[MEAN_COLUMNS].count())
+    games = _with_all_split(grouped.size().to_frame('games'))
+
+    aggregates = games
+    for column in SUM_COLUMNS:
+        aggregates[f'{column}_sum'] = sums[column]
+    for column in MEAN_COLUMNS:
+        aggregates[f'{column}_mean'] = sums[column] / counts[column].where(counts[column] > 0)
+
+    return aggregates.sort_index().reset_index()
+
+
+def compute_player_splits(df):
+    """Per-player performance by position and by player class
+
+    One row per (player_name, split_type, split_value), where split_type is
+    'position' or 'player_class'.
+    """
+    frames = []
+    for column in SPLIT_COLUMNS:
+        split = df.groupby(['player_name', column], observed=True).agg(
+            games=('match_id', 'size'),
+            wins=('is_win', 'sum'),
+            goals=('goals', 'sum'),
+            points=('points', 'sum'),
+            shots=('shots', 'sum'),
+            hits=('hits', 'sum'),
+            takeaways=('takeaways', 'sum'),
+            giveaways=('giveaways', 'sum'),
+            war=('war', 'mean'),
+            total_offense=('total_offense', 'mean'),
+            total_defense=('total_defense', 'mean'),
+            pass_pct=('pass_pct', 'mean'),
+        ).reset_index()
+        split = split.rename(columns={column: 'split_value'}).astype({'player_name': str, 'split_value': str})
+        split.insert(1, 'split_type', column)
+        frames.append(split)
+
+    splits = pd.concat(frames, ignore_index=True)
+    splits['win_pct'] = (splits['wins'] / splits['games'] * 100).round(1)
+    for column in ['goals', 'points', 'shots', 'hits', 'takeaways', 'giveaways']:
+        splits[f'{column}_per_game'] = (splits[column] / splits['games']).round(2)
+    return splits.round({'war': 1, 'total_offense': 1, 'total_defense': 1, 'pass_pct': 1})
+
+
+def player_stats_from_aggregates(aggregates, split='all', players=None):
+    """Player comparison table for one split of the precomputed aggregates"""
+    rows = aggregates[aggregates['split'] == split]
+    if players is not None:
+        rows = rows[rows['player_name'].isin(players)]
+
+    player_stats = pd.DataFrame({
+        'Goals': rows['goals_sum'],
+        'Assists': rows['assists_sum'],
+        'Points': rows['points_sum'],
+        'Avg WAR': rows['war_mean'],
+        'Avg TO%': rows['total_offense_mean'],
+        'Avg TD%': rows['total_defense_mean'],
+        'Avg Efficiency': rows['efficiency_mean'],
+        'Shots': rows['shots_sum'],
+        'Shot%': rows['shot_pct_mean'],
+        'Pass%': rows['pass_pct_mean'],
+        'Passes': rows['passes_sum'],
+        'Hits': rows['hits_sum'],
+        'Giveaways': rows['giveaways_sum'],
+        'Takeaways': rows['takeaways_sum'],
+        'Ints': rows['interceptions_sum'],
+        'Poss Min': rows['possession_minutes_sum'],
+        'Games': rows['games'],
+    }).set_axis(pd.Index(rows['player_name'], name='player_name')).round(2)
+
+    # Calculate per-game metrics
+    player_stats['Goals/Game'] = (player_stats['Goals'] / player_stats['Games']).round(2)
+    player_stats['Shots/Game'] = (player_stats['Shots'] / player_stats['Games']).round(1)
+    player_stats['Pass Attempts/Game'] = (player_stats['Passes'] / player_stats['Games']).round(1)
+    player_stats['Takeaways/Game'] = (player_stats['Takeaways'] / player_stats['Games']).round(2)
+    player_stats['Giveaways/Min'] = (player_stats['Giveaways'] / player_stats['Poss Min']).round(3)
+    player_stats['Points/Game'] = (player_stats['Points'] / player_stats['Games']).round(2)
+    player_stats['Hits/Game'] = (player_stats['Hits'] / player_stats['Games']).round(2)
+    player_stats['Avg T.O.P (min)'] = (player_stats['Poss Min'] / player_stats['Games']).round(2)
+    player_stats['Ints/Game'] = (player_stats['Ints'] / player_stats['Games']).round(2)
+
+    return player_stats.sort_values('player_name', ascending=False)
+
+
+def player_win_loss_comparison(aggregates):
+    """Per-player averages in wins next to the same averages in losses"""
+    player_wins = aggregates[aggregates['split'] == 'wins'].set_index('player_name').round(1)
+    player_losses = aggregates[aggregates['split'] == 'losses'].set_index('player_name').round(1)
+    player_losses = player_losses.reindex(player_wins.index, fill_value=0)
+
+    return pd.DataFrame({
+        'Player': player_wins.index,
+        'WAR (Wins)': player_wins['war_mean'].values,
+        'WAR (Losses)': player_losses['war_mean'].values,
+        'Pass% (Wins)': player_wins['pass_pct_mean'].values,
+        'Pass% (Losses)': player_losses['pass_pct_mean'].values,
+        'Giveaways (Wins)': player_wins['giveaways_mean'].values,
+        'Giveaways (Losses)': player_losses['giveaways_mean'].values
+    })
+
+
+def build_game_log(df):
+    """One row per game with team totals, newest first"""
+    games = df.groupby('match_id', sort=False).agg(
+        game_date=('game_date', 'first'),
+        score=('score', 'first'),
+        opponent_score=('opponent_score', 'first'),
+        outcome=('outcome', 'first'),
+        goals=('goals', 'sum'),
+        shots=('shots', 'sum'),
+        pass_pct=('pass_pct', 'mean'),
+        giveaways=('giveaways', 'sum'),
+        war=('war', 'mean'),
+    )
+
+    game_log_df = pd.DataFrame({
+        'Date': games['game_date'].dt.strftime('%Y-%m-%d'),
+        'Result': games['outcome'],
+        'Score': games['score'].astype(int).astype(str) + '-' + games['opponent_score'].astype(int).astype(str),
+        'Goals': games['goals'].astype(int),
+        'Shots': games['shots'].astype(int),
+        'Pass%': games['pass_pct'].map(lambda v: f"{v:.1f}%"),
+        'Giveaways': games['giveaways'].astype(int),
+        'Avg WAR': games['war'].map(lambda v: f"{v:.1f}%"),
+        'Match ID': games.index,
+    })
+
+    return game_log_df.sort_values('Date', ascending=False)
+
+
+def season_totals(totals):
+    """Season totals table from one player's 'all' aggregate row"""
+    return {
+        'Games Played': str(int(totals['games'])),
+        'Goals': str(int(totals['goals_sum'])),
+        'Assists': str(int(totals['assists_sum'])),
+        'Points': str(int(totals['points_sum'])),
+        'Points/Game': f"{totals['points_mean']:.2f}",
+        'Plus/Minus': str(int(totals['plus_minus_sum'])),
+        'Avg WAR': f"{totals['war_mean']:.1f}%",
+        'Avg TO%': f"{totals['total_offense_mean']:.1f}%",
+        'Avg TD%': f"{totals['total_defense_mean']:.1f}%",
+        'Avg Efficiency': f"{totals['efficiency_mean']:.1f}%",
+        'Shot%': f"{totals['shot_pct_mean']:.1f}%",
+        'Pass%': f"{totals['pass_pct_mean']:.1f}%",
+        'Total Shots': str(int(totals['shots_sum'])),
+        'Total Hits': str(int(totals['hits_sum'])),
+        'Takeaways': str(int(totals['takeaways_sum'])),
+        'Giveaways': str(int(totals['giveaways_sum'])),
+        'Giveaways/Min': f"{(totals['giveaways_sum'] / totals['possession_minutes_sum']):.3f}"
+    }
+
+
+def player_game_logs(df):
+    """Per-player game logs, oldest game first: {player_name: frame}"""
+    logs = df[PLAYER_GAME_LOG_COLUMNS].sort_values(['player_name', 'timestamp'])
+    return {
+        player_name: games.reset_index(drop=True)
+        for player_name, games in logs.groupby('player_name', observed=True)
+    }
@@ -0,0 +1,35 @@
+"""
+Categorical encoding for the merged stats frame
+
+player_name, position, player_class, result and outcome repeat a handful of
+values across every row, so they are loaded as pandas categoricals: one small
+integer code per row instead of a Python string, and groupby on codes. Group
+on these columns with observed=True so unplayed categories are not emitted.
+The other column types come from the declared schema in utils/schema.py.
+"""
+import pandas as pd
+
+from analytics.outcomes import ensure_outcome_columns
+from utils.schema import MERGED_SCHEMA, read_table
+
+CATEGORICAL_COLUMNS = [column for column, dtype in MERGED_SCHEMA.items() if dtype == 'category']
+
+POSITION_LABELS = {'center': 'C', 'leftWing': 'LW', 'rightWing': 'RW', 'defenseMen': 'D'}
+
+
+def categorize(df):
+    """Return `df` with the categorical columns it has converted to category dtype"""
+    columns = [c for c in CATEGORICAL_COLUMNS if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not columns:
+        return df
+    return df.astype({c: 'category' for c in columns})
+
+
+def read_merged_stats(path):
+    """Load merged_stats.csv typed by MERGED_SCHEMA, with the outcome columns and game_date"""
+    df = categorize(ensure_outcome_columns(read_table(path, MERGED_SCHEMA)))
+    return df.assign(game_date=pd.to_datetime(df['timestamp'], unit='s'))
+
+
+def position_label(position):
+    return POSITION_LABELS.get(position, position)
@@ -0,0 +1,151 @@
+"""
+Rolling-window, exponentially weighted and streak form for players and the team
+"""
+import numpy as np
+import pandas as pd
+
+# Per-game values tracked in the form table
+FORM_COLUMNS = ['points', 'goals', 'war', 'pass_pct', 'giveaways', 'plus_minus']
+
+# Entity name used for the team's rows
+TEAM_ENTITY = 'TEAM'
+
+KEY_COLUMNS = ['entity', 'match_id', 'timestamp', 'won']
+FORM_TABLE_COLUMNS = (
+    KEY_COLUMNS + FORM_COLUMNS
+    + [f'{c}_rolling' for c in FORM_COLUMNS]
+    + [f'{c}_ewm' for c in FORM_COLUMNS]
+    + ['streak']
+)
+
+
+def form_inputs(df):
+    """One row per (entity, game): every player plus the team totals/averages"""
+    players = df[['player_name', 'match_id', 'timestamp', 'is_win'] + FORM_COLUMNS]
+    players = players.rename(columns={'player_name': 'entity', 'is_win': 'won'}).astype({'entity': str})
+
+    team = df.groupby('match_id', as_index=False).agg(
+        timestamp=('timestamp', 'first'),
+        won=('is_win', 'first'),
+        points=('points', 'sum'),
+        goals=('goals', 'sum'),
+        war=('war', 'mean'),
+        pass_pct=('pass_pct', 'mean'),
+        giveaways=('giveaways', 'sum'),
+        plus_minus=('plus_minus', 'sum'),
+    )
+    team['entity'] = TEAM_ENTITY
+
+    inputs = pd.concat([players, team[players.columns]], ignore_index=True)
+    return inputs[KEY_COLUMNS + FORM_COLUMNS]
+
+
+def _ordered(frame):
+    return frame.sort_values(['entity', 'timestamp', 'match_id'], kind='stable').reset_index(drop=True)
+
+
+def _recent(history, entities, n):
+    """Last `n` stored rows per entity, scanning back from the end of the table"""
+    span = max(n, 1) * max(len(entities), 1)
+    while True:
+        tail = history.iloc[-span:]
+        counts = tail['entity'].value_counts()
+        if span >= len(history) or all(counts.get(e, 0) >= n for e in entities):
+            return tail.groupby('entity').tail(n)
+        span *= 2
+
+
+def _rolling(frame, window):
+    """Mean of the last `window` games (fewer at the start of a history)"""
+    rolled = frame.groupby('entity', sort=False)[FORM_COLUMNS].rolling(window, min_periods=1).mean()
+    return rolled.reset_index(level=0, drop=True).sort_index()
+
+
+def _ewm(frame, alpha):
+    """Exponentially weighted form: ewm_t = alpha * x_t + (1 - alpha) * ewm_(t-1)"""
+    return frame.groupby('entity', sort=False)[FORM_COLUMNS].transform(
+        lambda s: s.ewm(alpha=alpha, adjust=False, ignore_na=True).mean()
+    )
+
+
+def _streak(frame, seed_streak):
+    """Signed current streak: +3 is a three-game win streak, -2 a two-game losing streak
+
+    `seed_streak` holds the stored streak on seed rows (the entity's last stored
+    game) and 0 elsewhere, so runs carry on from history.
+    """
+    sign = np.where(frame['won'], 1, -1)
+    new_run = (sign != np.roll(sign, 1)) | (frame['entity'] != frame['entity'].shift())
+    run_id = new_run.cumsum()
+    position = frame.groupby(run_id).cumcount() + 1
+    offset = (seed_streak.abs() - 1).clip(lower=0).groupby(run_id).transform('first')
+    return pd.Series(sign * (position + offset), index=frame.index)
+
+
+def compute_form(inputs, window=5, alpha=0.3, history=None):
+    """Form rows for `inputs` (see form_inputs)
+
+    With `history` (the stored form table, which the inputs must follow in
+    time) only the new rows are computed: rolling means read the last
+    window - 1 stored games, the EWM and streak continue from the last stored
+    row, so an appended game costs O(window) regardless of history length.
+    """
+    new = _ordered(inputs)
+    if history is None:
+        history = pd.DataFrame(columns=FORM_TABLE_COLUMNS)
+    # Stored rows are chronological (update_form only ever appends newer games)
+    entities = new['entity'].unique()
+    context = _recent(history, entities, max(window - 1, 1))
+    context = context[context['entity'].isin(entities)]
+    seeds = context.groupby('entity').tail(1)
+    context = context.groupby('entity').tail(max(window - 1, 0))
+
+    # Rolling: raw values of the previous window - 1 games followed by the new games
+    rolling_frame = _ordered(pd.concat([context[KEY_COLUMNS + FORM_COLUMNS].assign(is_new=False),
+                                        new.assign(is_new=True)], ignore_index=True))
+    rolling = _rolling(rolling_frame, window)[rolling_frame['is_new']]
+
+    # EWM and streak: the last stored row, carrying its EWM as the value, followed by the new games
+    seed_rows = seeds[KEY_COLUMNS].copy()
+    for column in FORM_COLUMNS:
+        seed_rows[column] = seeds[f'{column}_ewm'].values
+    seed_rows['seed_streak'] = seeds['streak'].values
+    seeded_frame = _ordered(pd.concat([seed_rows.assign(is_new=False),
+                                       new.assign(is_new=True, seed_streak=0)], ignore_index=True))
+    ewm = _ewm(seeded_frame, alpha)[seeded_frame['is_new']]
+    streak = _streak(seeded_frame, seeded_frame['seed_streak'].astype(int))[seeded_frame['is_new']]
+
+    form = new.copy()
+    for column in FORM_COLUMNS:
+        form[f'{column}_rolling'] = rolling[column].values
+        form[f'{column}_ewm'] = ewm[column].values
+    form['streak'] = streak.values
+    return form.sort_values(['timestamp', 'match_id', 'entity'], kind='stable')[FORM_TABLE_COLUMNS].reset_index(drop=True)
+
+
+def update_form(history, inputs, window=5, alpha=0.3):
+    """Append form rows for games not in `history`; returns (form_table, new_row_count)
+
+    Falls back to a full recompute when a new game predates the last stored
+    game, since the stored windows would otherwise be out of order.
+    """
+    if history is None or history.empty:
+        form = compute_form(inputs, window, alpha)
+        return form, len(form)
+
+    # Games are written whole, so a stored match_id covers every entity in it
+    new = inputs[~inputs['match_id'].isin(history['match_id'].unique())]
+    if new.empty:
+        return history, 0
+
+    if new['timestamp'].min() < history['timestamp'].iloc[-1]:
+        form = compute_form(inputs, window, alpha)
+        return form, len(new)
+
+    form = pd.concat([history, compute_form(new, window, alpha, history)], ignore_index=True)
+    return form, len(new)
+
+
+def current_form(form):
+    """Latest row per entity: current rolling/EWM form and streak"""
+    return _ordered(form).groupby('entity').tail(1).set_index('entity')
@@ -0,0 +1,141 @@
+"""
+Ridge regression estimate of WAR / GAR / TO% / TD% from the basic API stats
+
+The model keeps only sufficient statistics (row count, feature/target sums,
+X'X and X'y), so training runs over the history in batches, new games are
+folded in without revisiting old ones, and a refit is a small linear solve.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from utils.store import atomic_write
+
+IMPACT_FEATURES = [
+    'possession_seconds', 'takeaways', 'giveaways', 'passes', 'pass_attempts', 'shots',
+    'shot_attempts', 'plus_minus', 'hits', 'interceptions', 'blocked_shots', 'goals', 'assists'
+]
+IMPACT_TARGETS = ['war', 'goals_above_replacement', 'total_offense', 'total_defense']
+KEY_COLUMNS = ['match_id', 'player_name']
+
+
+def row_keys(df):
+    """64-bit hash of each row's (match_id, player_name)"""
+    keys = df[KEY_COLUMNS].astype({'match_id': 'int64', 'player_name': str})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+class RidgeImpactModel:
+    """Multi-output ridge regression over standardized features, fit from sufficient statistics"""
+
+    def __init__(self, features=IMPACT_FEATURES, targets=IMPACT_TARGETS, alpha=10.0):
+        self.features = list(features)
+        self.targets = list(targets)
+        self.alpha = alpha
+        n_features, n_targets = len(self.features), len(self.targets)
+        self.n = 0
+        self.sum_x = np.zeros(n_features)
+        self.sum_y = np.zeros(n_targets)
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros((n_features, n_targets))
+        self.row_keys = np.array([], dtype=np.uint64)  # player-games already in the statistics
+        self.coef = None
+        self.intercept = None
+
+    def _matrix(self, df):
+        return df[self.features].to_numpy(dtype=np.float64, na_value=0.0)
+
+    def partial_fit(self, df):
+        """Accumulate player-games not seen yet that have every target; returns rows added
+
+        Keyed by player-game rather than game, so a game split across batches
+        (or whose advanced stats land one player at a time) is fully counted.
+        """
+        keys = row_keys(df)
+        # row_keys stays sorted, so membership is a binary search
+        position = np.searchsorted(self.row_keys, keys).clip(max=max(len(self.row_keys) - 1, 0))
+        seen = self.row_keys[position] == keys if len(self.row_keys) else np.zeros(len(keys), dtype=bool)
+        new = ~seen & df[self.targets].notna().all(axis=1).to_numpy()
+        rows = df[new]
+        if rows.empty:
+            return 0
+
+        x = self._matrix(rows)
+        y = rows[self.targets].to_numpy(dtype=np.float64)
+        self.n += len(rows)
+        self.sum_x += x.sum(axis=0)
+        self.sum_y += y.sum(axis=0)
+        self.xtx += x.T @ x
+        self.xty += x.T @ y
+        added = np.unique(keys[new])
+        self.row_keys = np.insert(self.row_keys, np.searchsorted(self.row_keys, added), added)
+        return len(rows)
+
+    def solve(self):
+        """Refit the coefficients from the accumulated statistics"""
+        if self.n < 2:
+            raise ValueError("Need at least two rows with advanced stats to fit the impact model")
+
+        mean_x = self.sum_x / self.n
+        mean_y = self.sum_y / self.n
+        cov_xx = self.xtx / self.n - np.outer(mean_x, mean_x)
+        cov_xy = self.xty / self.n - np.outer(mean_x, mean_y)
+
+        std = np.sqrt(np.clip(np.diag(cov_xx), 0, None))
+        std[std == 0] = 1.0
+        corr = cov_xx / np.outer(std, std)
+        beta = np.linalg.solve(corr + self.alpha / self.n * np.eye(len(std)), cov_xy / std[:, None])
+
+        self.coef = beta / std[:, None]
+        self.intercept = mean_y - mean_x @ self.coef
+        return self
+
+    def predict(self, df):
+        """Estimated targets as est_<target> columns, aligned with df"""
+        if self.coef is None:
+            self.solve()
+        estimates = self._matrix(df) @ self.coef + self.intercept
+        return pd.DataFrame(estimates, index=df.index, columns=[f'est_{t}' for t in self.targets])
+
+    def score(self, df):
+        """R^2 per target on the rows of df that have the target"""
+        estimates = self.predict(df)
+        scores = {}
+        for target in self.targets:
+            actual = df[target]
+            mask = actual.notna()
+            residual = ((actual[mask] - estimates.loc[mask, f'est_{target}']) ** 2).sum()
+            total = ((actual[mask] - actual[mask].mean()) ** 2).sum()
+            scores[target] = 1 - residual / total if total > 0 else np.nan
+        return scores
+
+    def save(self, path):
+        meta = {'features': self.features, 'targets': self.targets, 'alpha': self.alpha, 'n': self.n}
+
+        def write(tmp):
+            with open(tmp, 'wb') as f:
+                np.savez(f, meta=json.dumps(meta), sum_x=self.sum_x, sum_y=self.sum_y, xtx=self.xtx,
+                         xty=self.xty, row_keys=self.row_keys)
+        atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path):
+        """Stored model; one saved with per-game keys comes back empty, so it is retrained"""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            model = cls(meta['features'], meta['targets'], meta['alpha'])
+            if 'row_keys' not in data:
+                return model
+            model.n = meta['n']
+            model.sum_x, model.sum_y = data['sum_x'], data['sum_y']
+            model.xtx, model.xty = data['xtx'], data['xty']
+            model.row_keys = data['row_keys']
+        return model if model.n < 2 else model.solve()
+
+
+def impact_estimates(df, model):
+    """Per player-game estimates next to the scraped values (NaN until advanced stats land)"""
+    estimates = model.predict(df).round(2)
+    columns = df[['match_id', 'timestamp', 'player_name'] + model.targets].astype({'player_name': str})
+    return pd.concat([columns, estimates], axis=1)
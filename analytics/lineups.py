@@ -0,0 +1,102 @@
+"""
+Lineup combinations from a per-game player bitset index
+
+Each game gets a bitmask of the roster players who dressed. A combination
+"played together" in a game when (game_mask & combo_mask) == combo_mask, so
+the stats for every 2-6 player combination come from one boolean
+games x combinations matrix and a few matrix products.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+LINEUP_SIZES = range(2, 7)
+
+LINEUP_COLUMNS = [
+    'lineup', 'size', 'mask', 'games', 'wins', 'losses', 'win_pct', 'goal_diff', 'goal_diff_per_game',
+    'avg_war', 'exact_games', 'exact_wins', 'exact_win_pct'
+]
+
+
+def lineup_index(df, max_players=12):
+    """(roster, games): roster players in bit order and one row per game with its mask
+
+    The roster is the `max_players` players with the most games (bit i is
+    roster[i]); games carries mask, is_win, goal_diff and per-player WAR.
+    """
+    counts = df['player_name'].value_counts()
+    roster = counts[counts > 0].index[:max_players].astype(str).sort_values().tolist()
+    rows = df[df['player_name'].isin(roster)]
+    bit = rows['player_name'].astype(str).map({name: 1 << i for i, name in enumerate(roster)}).astype(np.int64)
+
+    # Distinct bits per game, so their sum is the OR
+    bits = pd.DataFrame({'match_id': rows['match_id'], 'bit': bit}).drop_duplicates()
+    grouped = rows.groupby('match_id')
+    games = pd.DataFrame({
+        'mask': bits.groupby('match_id')['bit'].sum(),
+        'is_win': grouped['is_win'].first(),
+        'goal_diff': grouped['score'].first() - grouped['opponent_score'].first(),
+    })
+    war = rows.pivot_table(index='match_id', columns=rows['player_name'].astype(str), values='war', aggfunc='mean')
+    games = games.join(war.reindex(columns=roster))
+    return roster, games
+
+
+def lineup_stats(roster, games, sizes=LINEUP_SIZES):
+    """Record, goal differential and WAR for every combination of `sizes` players
+
+    `games` is lineup_index() output. "games"/"wins" count every game where
+    the whole combination dressed; "exact_*" count games with exactly that
+    lineup. avg_war is the mean WAR of the combination's players in its games.
+    """
+    combos = [combo for size in sizes for combo in combinations(range(len(roster)), size)]
+    if not combos or games.empty:
+        return pd.DataFrame(columns=LINEUP_COLUMNS)
+
+    combo_masks = np.array([sum(1 << i for i in combo) for combo in combos], dtype=np.int64)
+    membership = np.zeros((len(combos), len(roster)))
+    for row, combo in enumerate(combos):
+        membership[row, list(combo)] = 1.0
+
+    game_masks = games['mask'].to_numpy(dtype=np.int64)
+    together = ((game_masks[:, None] & combo_masks[None, :]) == combo_masks[None, :]).astype(np.float64)
+    exact = (game_masks[:, None] == combo_masks[None, :]).astype(np.float64)
+    is_win = games['is_win'].to_numpy(dtype=np.float64)
+    goal_diff = games['goal_diff'].to_numpy(dtype=np.float64)
+
+    war = games[roster].to_numpy(dtype=np.float64)
+    war_sums = (together.T @ np.nan_to_num(war)) * membership
+    war_counts = (together.T @ (~np.isnan(war)).astype(np.float64)) * membership
+
+    n_games = together.sum(axis=0)
+    wins = together.T @ is_win
+    exact_games = exact.sum(axis=0)
+    exact_wins = exact.T @ is_win
+    total_goal_diff = together.T @ goal_diff
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats = pd.DataFrame({
+            'lineup': [' + '.join(roster[i] for i in combo) for combo in combos],
+            'size': [len(combo) for combo in combos],
+            'mask': combo_masks,
+            'games': n_games.astype(int),
+            'wins': wins.astype(int),
+            'losses': (n_games - wins).astype(int),
+            'win_pct': np.round(wins / n_games * 100, 1),
+            'goal_diff': total_goal_diff.astype(int),
+            'goal_diff_per_game': np.round(total_goal_diff / n_games, 2),
+            'avg_war': np.round(war_sums.sum(axis=1) / war_counts.sum(axis=1), 1),
+            'exact_games': exact_games.astype(int),
+            'exact_wins': exact_wins.astype(int),
+            'exact_win_pct': np.round(exact_wins / exact_games * 100, 1),
+        })
+    return stats[stats['games'] > 0].reset_index(drop=True)
+
+
+def best_lineups(stats, size=None, min_games=1, sort_by='win_pct', limit=10):
+    """Top combinations by `sort_by`, ties broken by goal differential per game"""
+    rows = stats[stats['games'] >= min_games]
+    if size is not None:
+        rows = rows[rows['size'] == size]
+    return rows.sort_values([sort_by, 'goal_diff_per_game'], ascending=False).head(limit)
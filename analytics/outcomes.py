@@ -0,0 +1,59 @@
+"""
+Canonical game outcome columns, computed once in the merge step
+
+EA result codes: 1 win, 2 loss, 5 overtime win, 6 overtime loss, 10 loss by
+disconnect. Bit 0x4000 marks a game the opponent did not finish (16385 is a
+win by disconnect).
+"""
+import numpy as np
+import pandas as pd
+
+RESULT_WIN = 1
+RESULT_LOSS = 2
+RESULT_OT_WIN = 5
+RESULT_OT_LOSS = 6
+RESULT_DNF_LOSS = 10
+RESULT_DNF_FLAG = 0x4000
+RESULT_DNF_WIN = RESULT_DNF_FLAG | RESULT_WIN
+
+OUTCOMES = ['W', 'L', 'OTL']
+OUTCOME_COLORS = {'W': 'green', 'L': 'red', 'OTL': 'orange'}
+
+# is_loss covers every game that is not a win; is_ot_loss is the overtime subset
+OUTCOME_COLUMNS = ['outcome', 'is_win', 'is_loss', 'is_ot_loss', 'is_dnf']
+
+
+def add_outcome_columns(df):
+    """Return a copy of `df` with the outcome columns derived from score and result code
+
+    The score decides wins; the result code only breaks a level score and
+    flags overtime losses and disconnects.
+    """
+    result = df['result'].astype('float64').fillna(0).astype(np.int64)
+    base_result = result & ~RESULT_DNF_FLAG
+    score = df['score']
+    opponent_score = df['opponent_score']
+
+    is_win = (score > opponent_score) | ((score == opponent_score) & base_result.isin([RESULT_WIN, RESULT_OT_WIN]))
+    is_ot_loss = ~is_win & (base_result == RESULT_OT_LOSS)
+    is_dnf = ((result & RESULT_DNF_FLAG) != 0) | (base_result == RESULT_DNF_LOSS)
+
+    return df.assign(
+        outcome=np.select([is_win, is_ot_loss], ['W', 'OTL'], 'L'),
+        is_win=is_win,
+        is_loss=~is_win,
+        is_ot_loss=is_ot_loss,
+        is_dnf=is_dnf,
+    )
+
+
+def ensure_outcome_columns(df):
+    """Add the outcome columns only if `df` predates them (e.g. an older merged_stats.csv)"""
+    if all(column in df.columns for column in OUTCOME_COLUMNS):
+        return df
+    return add_outcome_columns(df)
+
+
+def outcome_colors(outcomes):
+    """Marker colors for a column of outcomes"""
+    return pd.Series(outcomes).map(OUTCOME_COLORS).fillna('gray').tolist()
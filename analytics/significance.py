@@ -0,0 +1,177 @@
+"""
+Permutation and bootstrap tests for which stats separate wins from losses
+
+Every numeric stat is reduced to one team value per game, then all stats are
+tested at once: label permutations and bootstrap resamples are count/weight
+matrices multiplied against the (games x stats) matrix, processed in batches
+to bound memory.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns that identify a game/player, or restate the score and so separate
+# wins from losses by construction
+NON_STAT_COLUMNS = {
+    'match_id', 'timestamp', 'player_id', 'player_class', 'opponent_club_id', 'result',
+    'score', 'opponent_score', 'is_win', 'is_loss', 'is_ot_loss', 'is_dnf',
+    'goals', 'assists', 'points', 'gwg', 'ppg', 'shg', 'plus_minus', 'goalie_goals_against',
+    'goalie_gaa', 'goals_above_expected', 'goals_above_replacement'
+}
+
+# Per-player counts; a game's value is the team total. Every other stat (ratings,
+# percentages, time on ice) is averaged over the players in the game.
+COUNTING_COLUMNS = {
+    'goals', 'assists', 'points', 'gwg', 'ppg', 'shg', 'plus_minus', 'shots', 'shot_attempts', 'deflections',
+    'passes', 'pass_attempts', 'saucer_passes', 'possession_seconds', 'possession_minutes', 'faceoff_wins',
+    'faceoff_losses', 'hits', 'blocked_shots', 'interceptions', 'takeaways', 'giveaways', 'pk_clear_zone', 'pim',
+    'penalties_drawn', 'goalie_saves', 'goalie_shots_against', 'goalie_goals_against', 'goalie_shutout_periods',
+    'expected_goals',
+}
+
+STAT_LABELS = {
+    'pass_pct': 'Pass completion %',
+    'giveaways': 'Team giveaways',
+    'takeaways': 'Team takeaways',
+    'hits': 'Team hits',
+    'war': 'Team WAR %',
+    'shot_pct': 'Shooting %',
+    'total_offense': 'Total offense %',
+    'total_defense': 'Total defense %',
+    'efficiency': 'Efficiency %',
+    'interceptions': 'Team interceptions',
+    'possession_minutes': 'Possession minutes',
+    'possession_seconds': 'Possession seconds',
+    'shots': 'Team shots',
+    'shot_attempts': 'Team shot attempts',
+    'passes': 'Team passes',
+    'pass_attempts': 'Team pass attempts',
+    'blocked_shots': 'Team blocked shots',
+    'faceoff_wins': 'Team faceoff wins',
+    'faceoff_losses': 'Team faceoff losses',
+    'deflections': 'Team deflections',
+    'pim': 'Team PIM',
+    'penalties_drawn': 'Team penalties drawn',
+    'expected_goals': 'Team xG',
+}
+
+BATCH_SIZE = 250
+
+
+def game_level_stats(df):
+    """One row per game: team totals for counting stats, team averages otherwise; plus is_win"""
+    columns = [c for c in df.select_dtypes('number').columns if c not in NON_STAT_COLUMNS]
+    grouped = df.groupby('match_id')
+    sums = [c for c in columns if c in COUNTING_COLUMNS]
+    means = [c for c in columns if c not in COUNTING_COLUMNS]
+    games = pd.concat([grouped[sums].sum(), grouped[means].mean(), grouped['is_win'].first()], axis=1)
+    return games[columns + ['is_win']]
+
+
+def data_version(games):
+    """Content hash of the game-level table, used as the cache key for results"""
+    return format(int(pd.util.hash_pandas_object(games, index=True).sum()) & (2**64 - 1), 'x')
+
+
+def _permutation_diffs(values, is_win, resamples, rng):
+    """Win-minus-loss mean differences under `resamples` random relabelings"""
+    n_games = len(is_win)
+    n_wins = int(is_win.sum())
+    total = values.sum(axis=0)
+    diffs = []
+    for start in range(0, resamples, BATCH_SIZE):
+        batch = min(BATCH_SIZE, resamples - start)
+        labels = rng.permuted(np.broadcast_to(is_win, (batch, n_games)), axis=1).astype(values.dtype)
+        win_sums = labels @ values
+        diffs.append(win_sums / n_wins - (total - win_sums) / (n_games - n_wins))
+    return np.vstack(diffs)
+
+
+def _bootstrap_means(values, resamples, rng):
+    """Means of `resamples` bootstrap resamples (drawn as per-row counts)"""
+    n_rows = len(values)
+    means = []
+    for start in range(0, resamples, BATCH_SIZE):
+        batch = min(BATCH_SIZE, resamples - start)
+        picks = rng.integers(0, n_rows, (batch, n_rows)) + np.arange(batch)[:, None] * n_rows
+        counts = np.bincount(picks.ravel(), minlength=batch * n_rows).reshape(batch, n_rows)
+        means.append(counts.astype(values.dtype) @ values / n_rows)
+    return np.vstack(means)
+
+
+def _benjamini_hochberg(p_values):
+    """False discovery rate adjusted p-values"""
+    order = np.argsort(p_values)
+    ranked = p_values[order] * len(p_values) / np.arange(1, len(p_values) + 1)
+    adjusted = np.minimum.accumulate(ranked[::-1])[::-1].clip(max=1.0)
+    result = np.empty_like(adjusted)
+    result[order] = adjusted
+    return result
+
+
+def win_loss_significance(games, resamples=2000, confidence=0.95, seed=0):
+    """Rank stats by how clearly they differ between wins and losses
+
+    `games` is game_level_stats() output. Returns one row per stat with the
+    mean in wins and losses, the difference with a bootstrap confidence
+    interval, a standardized effect size, the two-sided permutation p-value
+    and its FDR-adjusted q-value, sorted by q-value then effect size. Empty
+    until there are at least two wins and two losses.
+    """
+    is_win = games['is_win'].to_numpy(dtype=bool)
+    stats = games.drop(columns='is_win')
+    if is_win.sum() < 2 or (~is_win).sum() < 2 or stats.empty:
+        return pd.DataFrame(columns=['stat', 'label', 'mean_wins', 'mean_losses', 'diff', 'ci_low',
+                                     'ci_high', 'effect_size', 'p_value', 'q_value'])
+
+    # Missing values count as the stat's average, so they do not move either mean
+    values = stats.fillna(stats.mean()).fillna(0).to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    wins, losses = values[is_win], values[~is_win]
+    mean_wins, mean_losses = wins.mean(axis=0), losses.mean(axis=0)
+    observed = mean_wins - mean_losses
+
+    null_diffs = _permutation_diffs(values, is_win, resamples, rng)
+    exceed = (np.abs(null_diffs) >= np.abs(observed) - 1e-12).sum(axis=0)
+    p_values = (exceed + 1) / (resamples + 1)
+
+    boot_diffs = _bootstrap_means(wins, resamples, rng) - _bootstrap_means(losses, resamples, rng)
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(boot_diffs, [tail, 100 - tail], axis=0)
+
+    pooled_sd = np.sqrt((wins.var(axis=0, ddof=1) + losses.var(axis=0, ddof=1)) / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effect_size = np.where(pooled_sd > 0, observed / pooled_sd, 0.0)
+
+    result = pd.DataFrame({
+        'stat': stats.columns,
+        'label': [STAT_LABELS.get(c, c.replace('_', ' ').capitalize()) for c in stats.columns],
+        'mean_wins': mean_wins,
+        'mean_losses': mean_losses,
+        'diff': observed,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'effect_size': effect_size,
+        'p_value': p_values,
+        'q_value': _benjamini_hochberg(p_values),
+    })
+    result['abs_effect'] = result['effect_size'].abs()
+    result = result.sort_values(['q_value', 'abs_effect'], ascending=[True, False])
+    result = result.drop(columns='abs_effect').reset_index(drop=True)
+    result.attrs['confidence'] = confidence
+    return result
+
+
+def insight_sentences(significance, alpha=0.05, limit=5):
+    """Plain-language lines for the stats that pass the FDR threshold"""
+    confidence = int(round(significance.attrs.get('confidence', 0.95) * 100))
+    lines = []
+    for row in significance[significance['q_value'] < alpha].head(limit).itertuples():
+        direction = 'higher' if row.diff > 0 else 'lower'
+        p_value = 'p<0.001' if row.p_value < 0.001 else f"p={row.p_value:.3f}"
+        lines.append(
+            f"{row.label} is {abs(row.diff):.1f} {direction} in wins "
+            f"({row.mean_wins:.1f} vs {row.mean_losses:.1f}; "
+            f"{confidence}% CI {row.ci_low:+.1f} to {row.ci_high:+.1f}, {p_value})"
+        )
+    return lines
@@ -0,0 +1,137 @@
+"""
+Declarative row rules for the stats tables
+
+Each rule is a vectorized check over the whole frame, so a run is one
+rows x rules boolean table (True = the row breaks the rule). Missing values
+only fail the required-column rules: advanced stats arrive after the basic
+ones, and goalie columns are empty for skaters in some exports.
+"""
+import pandas as pd
+
+KEY_COLUMNS = ['match_id', 'player_name']
+
+REQUIRED_COLUMNS = [
+    'match_id', 'player_name', 'timestamp', 'result', 'score', 'opponent_score', 'toi_seconds',
+    'goals', 'assists', 'points',
+]
+
+# Inclusive (min, max); None leaves that side open
+RANGES = {
+    'score': (0, 99),
+    'opponent_score': (0, 99),
+    'toi_seconds': (0, 4 * 3600),
+    'goals': (0, None),
+    'assists': (0, None),
+    'points': (0, None),
+    'gwg': (0, 1),
+    'ppg': (0, None),
+    'shg': (0, None),
+    'plus_minus': (-99, 99),
+    'shots': (0, None),
+    'shot_attempts': (0, None),
+    'shot_pct': (0, 100),
+    'shot_on_net_pct': (0, None),
+    'deflections': (0, None),
+    'passes': (0, None),
+    'pass_attempts': (0, None),
+    'pass_pct': (0, 100),
+    'saucer_passes': (0, None),
+    'possession_seconds': (0, 4 * 3600),
+    'faceoff_wins': (0, None),
+    'faceoff_losses': (0, None),
+    'faceoff_pct': (0, 100),
+    'hits': (0, None),
+    'blocked_shots': (0, None),
+    'interceptions': (0, None),
+    'takeaways': (0, None),
+    'giveaways': (0, None),
+    'pk_clear_zone': (0, None),
+    'pim': (0, None),
+    'penalties_drawn': (0, None),
+    'rating_offense': (0, 100),
+    'rating_defense': (0, 100),
+    'rating_teamplay': (0, 100),
+    'goalie_saves': (0, None),
+    'goalie_shots_against': (0, None),
+    'goalie_goals_against': (0, None),
+    'goalie_save_pct': (0, 100),
+    'war': (0, 100),
+    'total_offense': (0, 100),
+    'total_defense': (0, 100),
+    'efficiency': (0, 100),
+    'expected_goals': (0, None),
+}
+
+# name -> (columns, check); check returns True where the row is consistent
+INVARIANTS = {
+    'points_equal_goals_plus_assists': (
+        ['points', 'goals', 'assists'], lambda df: df['points'] == df['goals'] + df['assists']),
+    'toi_positive': (['toi_seconds'], lambda df: df['toi_seconds'] > 0),
+    # Deflections count as shots without a shot attempt
+    'shots_within_attempts': (
+        ['shots', 'shot_attempts', 'deflections'],
+        lambda df: df['shots'] <= df['shot_attempts'] + df['deflections']),
+    'passes_within_attempts': (['passes', 'pass_attempts'], lambda df: df['passes'] <= df['pass_attempts']),
+    'special_goals_within_goals': (
+        ['ppg', 'shg', 'gwg', 'goals'], lambda df: (df['ppg'] + df['shg'] <= df['goals']) & (df['gwg'] <= df['goals'])),
+    'saves_within_shots_against': (
+        ['goalie_saves', 'goalie_shots_against'], lambda df: df['goalie_saves'] <= df['goalie_shots_against']),
+    'goals_against_within_shots_against': (
+        ['goalie_goals_against', 'goalie_shots_against'],
+        lambda df: df['goalie_goals_against'] <= df['goalie_shots_against']),
+}
+
+
+def rule_failures(df):
+    """Boolean frame aligned with `df`, one column per rule that applies to its columns"""
+    failures = {}
+    for column in REQUIRED_COLUMNS:
+        if column in df.columns:
+            failures[f'missing_{column}'] = df[column].isna()
+
+    for column, (low, high) in RANGES.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        outside = pd.Series(False, index=df.index)
+        if low is not None:
+            outside |= values < low
+        if high is not None:
+            outside |= values > high
+        failures[f'range_{column}'] = outside
+
+    for name, (columns, check) in INVARIANTS.items():
+        if all(column in df.columns for column in columns):
+            # Rows missing an input are skipped here (the required-column rules cover those that matter)
+            present = df[columns].notna().all(axis=1)
+            failures[name] = present & ~check(df)
+
+    if all(column in df.columns for column in KEY_COLUMNS):
+        failures['duplicate_key'] = df.duplicated(KEY_COLUMNS, keep=False)
+    return pd.DataFrame(failures, index=df.index)
+
+
+def key_index(df, columns=KEY_COLUMNS):
+    """(match_id, player_name, ...) MultiIndex for membership tests between tables"""
+    return pd.MultiIndex.from_frame(df[columns].astype({'player_name': str}))
+
+
+def has_key(df, keys, columns=KEY_COLUMNS):
+    """Mask of `df` rows whose key is in `keys` (a key_index)"""
+    return pd.Series(key_index(df, columns).isin(keys), index=df.index)
+
+
+def orphan_rows(child, parent):
+    """Mask of `child` rows whose key has no row in `parent` (e.g. advanced stats without basic stats)"""
+    return ~has_key(child, key_index(parent))
+
+
+def row_hashes(df):
+    """64-bit content hash per row, to tell rows already validated from new or changed ones"""
+    return pd.util.hash_pandas_object(df, index=False)
+
+
+def failed_rule_names(failures):
+    """Semicolon-joined names of the rules each row fails ('' if none)"""
+    names = failures.columns.to_numpy()
+    return pd.Series([';'.join(names[row]) for row in failures.to_numpy()], index=failures.index)
@@ -0,0 +1,89 @@
+"""
+Expected goals from shot-location zones
+
+Zone conversion rates come from the career zone shots/goals in
+shot_locations.csv with beta-binomial shrinkage: each team zone rate is pulled
+toward the team's overall conversion, and each player's zone rate toward the
+team zone rate, by `prior_strength` pseudo-shots. A player's expected goals
+per shot is their (equally shrunk) zone shot mix times those rates, applied to
+the per-game shot counts from the API.
+"""
+import numpy as np
+import pandas as pd
+
+ZONES = list(range(1, 17))
+
+# Player name used for the team-level rates (players without shot data)
+TEAM_PLAYER = 'TEAM'
+
+
+def _zone_counts(shot_df, kind):
+    return shot_df[[f'{kind}_zone_{z}' for z in ZONES]].to_numpy(dtype=np.float64)
+
+
+def _shrink(successes, trials, prior, prior_strength):
+    return (successes + prior_strength * prior) / (trials + prior_strength)
+
+
+def zone_model(shot_df, prior_strength=20.0):
+    """Shrunk zone conversion rates and shot mix per player, plus a TEAM row
+
+    Returns (rates, mix): frames indexed by player_name with one column per zone.
+    """
+    shots = _zone_counts(shot_df, 'shots')
+    goals = _zone_counts(shot_df, 'goals')
+
+    team_shots, team_goals = shots.sum(axis=0), goals.sum(axis=0)
+    overall = team_goals.sum() / max(team_shots.sum(), 1.0)
+    team_rate = _shrink(team_goals, team_shots, overall, prior_strength)
+    team_mix = (team_shots + 1.0) / (team_shots.sum() + len(ZONES))
+
+    player_rate = _shrink(goals, shots, team_rate, prior_strength)
+    player_mix = _shrink(shots, shots.sum(axis=1, keepdims=True), team_mix, prior_strength)
+
+    index = pd.Index(list(shot_df['player_name']) + [TEAM_PLAYER], name='player_name')
+    rates = pd.DataFrame(np.vstack([player_rate, team_rate]), index=index, columns=ZONES)
+    mix = pd.DataFrame(np.vstack([player_mix, team_mix]), index=index, columns=ZONES)
+    return rates, mix
+
+
+def xg_per_shot(shot_df, prior_strength=20.0):
+    """Expected goals per shot for each player (and TEAM)"""
+    rates, mix = zone_model(shot_df, prior_strength)
+    return (rates * mix).sum(axis=1).rename('xg_per_shot')
+
+
+def expected_goals(df, shot_df, prior_strength=20.0):
+    """Per player-game model xG next to the scraped ChelStats xG"""
+    per_shot = xg_per_shot(shot_df, prior_strength)
+    rate = df['player_name'].astype(str).map(per_shot).fillna(per_shot[TEAM_PLAYER])
+    return pd.DataFrame({
+        'match_id': df['match_id'],
+        'timestamp': df['timestamp'],
+        'player_name': df['player_name'].astype(str),
+        'shots': df['shots'],
+        'goals': df['goals'],
+        'xg_per_shot': rate.round(4),
+        'model_xg': (df['shots'] * rate).round(3),
+        'scraped_xg': df['expected_goals'] if 'expected_goals' in df.columns else np.nan,
+    }).reset_index(drop=True)
+
+
+def compare_xg(xg):
+    """Per-player model vs scraped xG: totals, mean absolute error and correlation per game"""
+    scraped = xg.dropna(subset=['scraped_xg'])
+    error = (scraped['model_xg'] - scraped['scraped_xg']).abs()
+
+    totals = xg.groupby('player_name').agg(
+        games=('match_id', 'nunique'),
+        goals=('goals', 'sum'),
+        shots=('shots', 'sum'),
+        model_xg=('model_xg', 'sum'),
+    )
+    totals['scraped_xg'] = scraped.groupby('player_name')['scraped_xg'].sum()
+    totals['mae_per_game'] = error.groupby(scraped['player_name']).mean()
+    totals['correlation'] = scraped.groupby('player_name')[['model_xg', 'scraped_xg']].apply(
+        lambda g: g['model_xg'].corr(g['scraped_xg']) if len(g) > 2 else np.nan
+    )
+    totals['goals_above_model_xg'] = totals['goals'] - totals['model_xg']
+    return totals.round(3).reset_index()
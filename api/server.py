@@ -0,0 +1,357 @@
+"""
+Read-only JSON API over the stats tables
+
+Usage:
+    python api/server.py --port 8780
+
+Endpoints (GET):
+    /api/games                          one row per game, newest first (?outcome=W)
+    /api/games/<match_id>               every player row of one game
+    /api/players                        players with games played
+    /api/players/<name>/games           a player's game log, newest first
+    /api/players/<name>/shot-zones      a player's shot locations
+    /api/aggregates                     season aggregates (?split=all|wins|losses)
+    /api/shot-zones                     shot locations for every player
+
+List endpoints are paginated with ?page= and ?per_page= (up to
+API_MAX_PAGE_SIZE). The tables are merged_stats.csv (pipeline/merge.py) and
+shot_locations.csv (scrapers/heatmap_scraper.py) as of the last committed
+pipeline run (utils/store.py), reloaded when a run commits new versions. Responses carry an ETag (If-None-Match gets a 304), are gzipped when
+the client accepts it, and the last API_CACHE_SIZE rendered responses are
+kept in an LRU keyed by data version, path and query.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlparse
+import sys
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import (
+    DB_MERGED_STATS, DB_SHOT_LOCATIONS, MANIFEST_FILE, API_HOST, API_PORT, API_CACHE_SIZE, API_PAGE_SIZE, API_MAX_PAGE_SIZE,
+    API_GZIP_MIN_BYTES
+)
+from analytics.aggregations import PLAYER_GAME_LOG_COLUMNS, compute_player_aggregates
+from analytics.categories import read_merged_stats
+from utils.helpers import setup_logging
+from utils.metrics import API_REQUESTS, API_CACHE_LOOKUPS
+from utils.store import committed_path
+
+logger = setup_logging(__name__)
+
+GAME_COLUMNS = ['match_id', 'timestamp', 'game_date', 'result', 'outcome', 'score', 'opponent_score',
+                'opponent_club_id']
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _stamp(path):
+    try:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except FileNotFoundError:
+        return None
+
+
+class StatsStore:
+    """The API's tables, rebuilt from the CSVs whenever a new version of one is committed"""
+
+    def __init__(self, merged_path=DB_MERGED_STATS, shots_path=DB_SHOT_LOCATIONS, manifest_path=MANIFEST_FILE):
+        self.tables = {'merged': Path(merged_path), 'shots': Path(shots_path)}
+        self.manifest_path = Path(manifest_path)
+        self.paths = dict(self.tables)
+        self._manifest_stamp = None
+        self._lock = threading.Lock()
+        self._version = None
+        self._tables = {}
+
+    def version(self):
+        """(mtime, size) of each source file; changes whenever a new version of one is committed"""
+        # Snapshot files are immutable, so the paths only change with the manifest
+        manifest_stamp = _stamp(self.manifest_path)
+        if manifest_stamp != self._manifest_stamp:
+            self.paths = {name: committed_path(path) for name, path in self.tables.items()}
+            self._manifest_stamp = manifest_stamp
+        return tuple(_stamp(path) for path in self.paths.values())
+
+    def snapshot(self):
+        """(version, tables) for one request; tables are never mutated, so readers need no lock"""
+        version = self.version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._tables = self._load()
+                    self._version = version
+                    logger.info(f"Loaded {len(self._tables.get('merged', []))} merged rows")
+        return self._version, self._tables
+
+    def _load(self):
+        tables = {}
+        paths = dict(self.paths)
+        if paths['merged'].exists():
+            merged = read_merged_stats(paths['merged'])
+            tables['merged'] = merged.sort_values(['timestamp', 'match_id'], ascending=False)
+            players = merged.groupby('match_id', observed=True).agg(
+                players=('player_name', 'size'), goals=('goals', 'sum'))
+            games = merged.drop_duplicates('match_id')[GAME_COLUMNS].set_index('match_id').join(players)
+            tables['games'] = games.reset_index().sort_values(['timestamp', 'match_id'], ascending=False)
+            tables['aggregates'] = compute_player_aggregates(merged)
+        if paths['shots'].exists():
+            tables['shots'] = pd.read_csv(paths['shots'])
+        return tables
+
+
+def _table(tables, name):
+    if name not in tables:
+        raise NotFound(f"{name} table has not been built yet")
+    return tables[name]
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+def _int_param(query, name, default, low, high):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be between {low} and {high}")
+    return value
+
+
+def paginate(df, query):
+    """One page of `df` with the paging fields clients need to walk the rest"""
+    per_page = _int_param(query, 'per_page', API_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+    total = len(df)
+    pages = max(1, -(-total // per_page))
+    page = _int_param(query, 'page', 1, 1, pages)
+    start = (page - 1) * per_page
+    return {'items': _records(df.iloc[start:start + per_page]), 'page': page, 'per_page': per_page,
+            'pages': pages, 'total': total}
+
+
+def _player_rows(df, name):
+    rows = df[df['player_name'] == name]
+    if rows.empty:
+        raise NotFound(f"Unknown player {name!r}")
+    return rows
+
+
+def games(tables, query):
+    df = _table(tables, 'games')
+    if 'outcome' in query:
+        df = df[df['outcome'] == query['outcome']]
+    return paginate(df, query)
+
+
+def game(tables, query, match_id):
+    rows = _table(tables, 'merged')
+    rows = rows[rows['match_id'] == int(match_id)]
+    if rows.empty:
+        raise NotFound(f"Unknown game {match_id}")
+    return {'match_id': int(match_id), 'players': _records(rows.drop(columns='game_date'))}
+
+
+def players(tables, query):
+    counts = _table(tables, 'merged').groupby('player_name', observed=True).size()
+    return {'items': [{'player_name': name, 'games': int(count)} for name, count in counts.items()]}
+
+
+def player_games(tables, query, name):
+    return paginate(_player_rows(_table(tables, 'merged'), name)[PLAYER_GAME_LOG_COLUMNS], query)
+
+
+def player_shot_zones(tables, query, name):
+    return _records(_player_rows(_table(tables, 'shots'), name))[0]
+
+
+def aggregates(tables, query):
+    df = _table(tables, 'aggregates')
+    split = query.get('split', 'all')
+    if split not in ('all', 'wins', 'losses'):
+        raise BadRequest("split must be all, wins or losses")
+    return paginate(df[df['split'] == split], query)
+
+
+def shot_zones(tables, query):
+    return paginate(_table(tables, 'shots'), query)
+
+
+ROUTES = [
+    (re.compile(r'/api/games'), games),
+    (re.compile(r'/api/games/(\d+)'), game),
+    (re.compile(r'/api/players'), players),
+    (re.compile(r'/api/players/([^/]+)/games'), player_games),
+    (re.compile(r'/api/players/([^/]+)/shot-zones'), player_shot_zones),
+    (re.compile(r'/api/aggregates'), aggregates),
+    (re.compile(r'/api/shot-zones'), shot_zones),
+]
+
+
+class Response:
+    """Rendered JSON body with its ETag and (when worth it) a gzipped copy"""
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.body = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.gzipped = gzip.compress(self.body, compresslevel=6) if len(self.body) >= API_GZIP_MIN_BYTES else None
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered responses"""
+
+    def __init__(self, size=API_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+def route(path):
+    for pattern, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if match:
+            return handler, [unquote(group) for group in match.groups()]
+    raise NotFound(f"No endpoint at {path}")
+
+
+class StatsAPI:
+    """Routes a GET to its handler, through the response cache"""
+
+    def __init__(self, store, cache_size=API_CACHE_SIZE):
+        self.store = store
+        self.cache = ResponseCache(cache_size)
+
+    def get(self, path, query_string):
+        """(endpoint, Response) for a request"""
+        path = path.rstrip('/') or '/'
+        try:
+            handler, args = route(path)
+        except NotFound as e:
+            return 'unknown', Response(404, {'error': str(e)})
+
+        query = dict(parse_qsl(query_string))
+        version, tables = self.store.snapshot()
+        key = (version, path, tuple(sorted(query.items())))
+        response = self.cache.get(key)
+        API_CACHE_LOOKUPS.inc(result='hit' if response is not None else 'miss')
+        if response is None:
+            try:
+                response = Response(200, handler(tables, query, *args))
+            except NotFound as e:
+                response = Response(404, {'error': str(e)})
+            except BadRequest as e:
+                response = Response(400, {'error': str(e)})
+            except Exception as e:
+                logger.error(f"Error serving {path}: {e}", exc_info=True)
+                return handler.__name__, Response(500, {'error': 'internal error'})
+            self.cache.put(key, response)
+        return handler.__name__, response
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # Headers and body leave in one send (flushed after each request); with Nagle on, a separate
+    # body write waits for the client's delayed ACK, ~40 ms per request
+    wbufsize = 256 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        endpoint, response = self.server.api.get(parsed.path, parsed.query)
+
+        if response.status == 200 and response.etag in self.headers.get('If-None-Match', ''):
+            API_REQUESTS.inc(endpoint=endpoint, status=304)
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = response.body
+        gzipped = response.gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = response.gzipped
+        API_REQUESTS.inc(endpoint=endpoint, status=response.status)
+        self.send_response(response.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')  # revalidate with the ETag
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(store=None, host=API_HOST, port=API_PORT, cache_size=API_CACHE_SIZE):
+    """Build (but do not start) the API server"""
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    server.api = StatsAPI(store or StatsStore(), cache_size)
+    return server
+
+
+def start_server(store=None, **kwargs):
+    """Start the API server on a daemon thread; returns (server, base_url)"""
+    server = create_server(store, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, name='api-server', daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON API over the stats tables")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--cache-size', type=int, default=API_CACHE_SIZE)
+    args = parser.parse_args()
+
+    server = create_server(host=args.host, port=args.port, cache_size=args.cache_size)
+    logger.info(f"Serving the stats API on http://{args.host}:{args.port}/api/games")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
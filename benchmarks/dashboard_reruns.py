@@ -0,0 +1,121 @@
+"""
+Latency of dashboard interactions: a fragment widget against a sidebar filter
+
+Usage:
+    python benchmarks/dashboard_reruns.py --repeat 10
+
+Runs dashboard.py under streamlit's AppTest against the data in data/ and
+alternately changes the player detail selectbox (inside an st.fragment, so
+in the browser only that fragment reruns) and the sidebar result filter
+(reruns the whole script), printing the median wall time of each. AppTest
+itself always reruns the whole script, so for a fragment widget the rerun
+request is given the fragment's id, as the frontend sends it, and the page
+keeps the elements outside the fragment. That reaches into AppTest
+internals (_fragment_storage, _tree) and may need updating with streamlit.
+Needs streamlit and plotly installed.
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import BASE_DIR
+
+PLAYER_SELECTBOX = "Select Player for Detailed View"
+RESULT_FILTER = "Game Result Filter"
+
+
+def fragment_id(app, function_name):
+    """Id of the registered fragment wrapping `function_name`, or None when it is not a fragment"""
+    for fid, fragment in app._fragment_storage._fragments.items():
+        pending = [cell.cell_contents for cell in fragment.__closure__ or ()]
+        while pending:
+            value = pending.pop()
+            if getattr(value, '__name__', None) == function_name:
+                return fid
+            if isinstance(value, functools.partial):
+                pending.append(value.func)
+            elif callable(value) and getattr(value, '__closure__', None):
+                pending.extend(cell.cell_contents for cell in value.__closure__)
+    return None
+
+
+def measure(repeat):
+    from streamlit.runtime.scriptrunner import RerunData
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    # Reruns requested while `fragments` is set run only those fragments
+    fragments = []
+    local_script_runner.RerunData = lambda **kwargs: RerunData(fragment_id_queue=list(fragments), **kwargs)
+
+    os.chdir(BASE_DIR)  # the dashboard reads data/ relative to the working directory
+    app = AppTest.from_file(str(BASE_DIR / 'dashboard.py'), default_timeout=600)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    if app.exception:
+        sys.exit(f"dashboard.py failed: {app.exception}")
+
+    def widget(elements, label):
+        return next(element for element in elements if element.label == label)
+
+    detail = fragment_id(app, 'render_player_detail')
+    interactions = [
+        ('player_selectbox', lambda: widget(app.selectbox, PLAYER_SELECTBOX), [detail] if detail else []),
+        ('sidebar_filter', lambda: widget(app.radio, RESULT_FILTER), []),
+    ]
+    timings = {name: [] for name, _, _ in interactions}
+    sections = {}
+    for i in range(repeat):
+        for name, find, fragment_ids in interactions:
+            element = find()
+            element.set_value(element.options[(i + 1) % len(element.options)])
+            rendered = len(app.session_state['section_timings']) if 'section_timings' in app.session_state else 0
+            page = app._tree
+            fragments[:] = fragment_ids
+            start = time.perf_counter()
+            app.run()
+            timings[name].append(time.perf_counter() - start)
+            fragments.clear()
+            if app.exception:
+                sys.exit(f"dashboard.py failed after changing {name}: {app.exception}")
+            if fragment_ids:
+                # The run returns only the fragment's elements; the rest of the page stays as it was
+                page._runner = app
+                app._tree = page
+            if 'section_timings' in app.session_state:
+                sections[name] = len(app.session_state['section_timings']) - rendered
+    return {'first_run_s': first, 'fragment': detail is not None, 'sections': sections,
+            'median_ms': {name: statistics.median(values) * 1000 for name, values in timings.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10, help="Changes of each widget")
+    parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+    report = measure(args.repeat)
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"first run: {report['first_run_s']:.2f} s")
+    for name, median_ms in report['median_ms'].items():
+        rendered = report['sections'].get(name)
+        print(f"{name:<20} median {median_ms:>7.0f} ms"
+              + (f"  ({rendered} timed sections rendered)" if rendered is not None else ''))
+    if not report['fragment']:
+        print(f"'{PLAYER_SELECTBOX}' is not in a fragment: changing it reran the whole script")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Load test for the stats API (api/server.py) on synthetic data
+
+Usage:
+    python benchmarks/load_api.py --games 1000 --clients 8 --seconds 10
+    python benchmarks/load_api.py --target-rps 800 --no-keepalive
+
+The server runs in its own process on a synthetic workspace; client threads
+request a mix of hot list and player queries (with gzip, and a share of
+If-None-Match revalidations) for a fixed time. Prints requests/s and latency
+percentiles, and exits non-zero when the rate is below the target.
+"""
+import argparse
+import http.client
+import multiprocessing
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import API_LOAD_TARGET_RPS, PLAYER_NAMES
+from benchmarks.run import Workspace
+
+REVALIDATE_SHARE = 0.3  # requests sent with the ETag of an earlier response
+
+
+def request_mix(n_pages):
+    paths = ['/api/games', '/api/players', '/api/aggregates', '/api/aggregates?split=wins', '/api/shot-zones']
+    paths += [f'/api/games?page={page}' for page in range(2, min(n_pages, 10) + 1)]
+    for name in PLAYER_NAMES:
+        paths += [f'/api/players/{name}/games', f'/api/players/{name}/shot-zones']
+    return paths
+
+
+def serve(root, n_games, port, ready):
+    from api.server import StatsStore, create_server
+    from scrapers.heatmap_scraper import scrape_career_shot_data
+
+    ws = Workspace(root, n_games)
+    with ws.patch_paths():
+        scrape_career_shot_data()
+    server = create_server(StatsStore(ws.merged_stats, ws.shot_locations), port=port)
+    ready.set()
+    server.serve_forever()
+
+
+def client(port, paths, deadline, keepalive, latencies, statuses, seed):
+    rng = random.Random(seed)
+    etags = {}
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        headers = {'Accept-Encoding': 'gzip'}
+        if path in etags and rng.random() < REVALIDATE_SHARE:
+            headers['If-None-Match'] = etags[path]
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+        if not keepalive:
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8781)
+    parser.add_argument('--target-rps', type=float, default=API_LOAD_TARGET_RPS)
+    parser.add_argument('--no-keepalive', action='store_true', help="New connection per request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve, args=(root, args.games, args.port, ready), daemon=True)
+        server.start()
+        if not ready.wait(120):
+            sys.exit("API server did not start")
+
+        try:
+            paths = request_mix(args.games // 50)
+            # Warm-up pass: load the tables and render each response once
+            client(args.port, paths, time.perf_counter() + 1, True, [], {}, seed=-1)
+
+            latencies, statuses = [], {}
+            deadline = time.perf_counter() + args.seconds
+            threads = [threading.Thread(target=client, args=(args.port, paths, deadline, not args.no_keepalive,
+                                                             latencies, statuses, i))
+                       for i in range(args.clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+
+    rps = len(latencies) / elapsed
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} requests in {elapsed:.1f}s with {args.clients} clients: {rps:.0f} req/s")
+    print(f"latency p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, "
+          f"p99 {quantiles[98] * 1000:.1f} ms")
+    print("statuses: " + ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    if rps < args.target_rps:
+        print(f"FAIL: below the {args.target_rps:.0f} req/s target")
+        sys.exit(1)
+    print(f"OK: at or above the {args.target_rps:.0f} req/s target")
+
+
+if __name__ == "__main__":
+    main()
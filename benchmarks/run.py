@@ -0,0 +1,494 @@
+"""
+Timed benchmarks for the pipeline and dashboard aggregations
+
+Usage:
+    python benchmarks/run.py --games 1000 10000 100000
+    python benchmarks/run.py --games 1000 --only merge_stats validate_data
+
+Each run appends one entry per scale to benchmarks/history.json (commit,
+timings) and prints the change against the previous entry at that scale.
+"""
+import argparse
+import importlib
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import BASE_DIR, CLUB_ID
+from benchmarks import synthetic
+
+HISTORY_FILE = BASE_DIR / "benchmarks" / "history.json"
+NEW_GAMES_PER_RUN = 25  # roughly one poll's worth of new games
+REPARSE_PAGE_GAMES = 200  # games whose match pages are archived for reparse_archive
+PARSE_PAGES = 500  # advanced-stats pages per parse_pages_* run
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark; the function receives a Workspace and returns
+    either a callable to time or a (setup, callable) pair. A callable with an
+    `items` attribute also reports throughput (items per second)."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+class Workspace:
+    """Synthetic tables written to a temporary data directory"""
+
+    def __init__(self, root, n_games, seed=0):
+        self.root = Path(root)
+        self.n_games = n_games
+        self.raw_dir = self.root / "raw"
+        self.processed_dir = self.root / "processed"
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.processed_dir.mkdir(parents=True, exist_ok=True)
+
+        self.basic_stats = self.raw_dir / "basic_stats.csv"
+        self.advanced_stats = self.raw_dir / "advanced_stats.csv"
+        self.merged_stats = self.processed_dir / "merged_stats.csv"
+        self.proclubs_members = self.raw_dir / "proclubs_members_stats.json"
+        self.shot_locations = self.processed_dir / "shot_locations.csv"
+        self.quarantine = self.processed_dir / "quarantine.csv"
+        self.validated_rows = self.processed_dir / "validated_rows.csv"
+        self.archive_dir = self.root / "archive"
+
+        self.player_games = synthetic.generate_player_games(n_games, seed)
+        new_match_ids = self.player_games['match_id'].unique()[-NEW_GAMES_PER_RUN:]
+        is_new = self.player_games['match_id'].isin(new_match_ids)
+        self.existing_games = self.player_games[~is_new]
+        self.new_games = self.player_games[is_new]
+
+        # Tables as they look just before a poll that finds new games
+        self.basic_existing = self.raw_dir / "basic_stats.existing.csv"
+        self.advanced_existing = self.raw_dir / "advanced_stats.existing.csv"
+        synthetic.basic_stats_frame(self.existing_games).to_csv(self.basic_existing, index=False)
+        synthetic.advanced_stats_frame(self.existing_games).to_csv(self.advanced_existing, index=False)
+
+        # Tables as they look after the poll
+        synthetic.basic_stats_frame(self.player_games).to_csv(self.basic_stats, index=False)
+        synthetic.advanced_stats_frame(self.player_games).to_csv(self.advanced_stats, index=False)
+        synthetic.merged_stats_frame(self.player_games).to_csv(self.merged_stats, index=False)
+        with open(self.proclubs_members, 'w') as f:
+            json.dump(synthetic.members_payload(self.player_games, seed), f)
+
+    def patch_paths(self):
+        """Point every module's database paths at this workspace"""
+        stack = ExitStack()
+        targets = {
+            'scrapers.api_scraper': {'DB_BASIC_STATS': self.basic_stats},
+            'scrapers.ui_scraper': {'DB_ADVANCED_STATS': self.advanced_stats},
+            'scrapers.heatmap_scraper': {'DB_PROCLUBS_MEMBERS': self.proclubs_members,
+                                         'DB_SHOT_LOCATIONS': self.shot_locations},
+            'pipeline.merge': {'DB_BASIC_STATS': self.basic_stats, 'DB_ADVANCED_STATS': self.advanced_stats,
+                               'DB_MERGED_STATS': self.merged_stats},
+            'pipeline.validate': {'DB_BASIC_STATS': self.basic_stats, 'DB_ADVANCED_STATS': self.advanced_stats,
+                                  'DB_MERGED_STATS': self.merged_stats, 'DB_QUARANTINE': self.quarantine,
+                                  'DB_VALIDATED_ROWS': self.validated_rows},
+            'pipeline.reparse': {'ARCHIVE_DIR': self.archive_dir, 'DB_BASIC_STATS': self.basic_stats,
+                                 'DB_ADVANCED_STATS': self.advanced_stats},
+            'pipeline.aggregate': {'DB_MERGED_STATS': self.merged_stats,
+                                   'DB_PLAYER_AGGREGATES': self.processed_dir / "player_aggregates.csv",
+                                   'DB_PLAYER_SPLITS': self.processed_dir / "player_splits.csv",
+                                   'PLAYER_GAME_LOGS_DIR': self.processed_dir / "player_game_logs"},
+        }
+        for module_name, attributes in targets.items():
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue  # Benchmarks that need it report the missing dependency
+            stack.enter_context(mock.patch.multiple(module, **attributes))
+        return stack
+
+    def restore(self, source, target):
+        target.write_bytes(source.read_bytes())
+
+
+@benchmark('extract_player_game_stats')
+def bench_extract(ws):
+    from scrapers.api_scraper import APIBasicStatsScraper
+    scraper = APIBasicStatsScraper()
+    games = synthetic.club_payload(ws.player_games)['recentGames']['RegularSeason']
+
+    def run():
+        for game in games:
+            scraper.extract_player_game_stats(game, CLUB_ID)
+    return run
+
+
+@benchmark('startup_no_new_games')
+def bench_startup(ws):
+    from benchmarks.startup import quiet_poll_command, warm_up
+    # A fresh interpreter running the whole quiet run_pipeline() each time, after the base snapshot exists
+    warm_up(ws)
+    command, env = quiet_poll_command(ws)
+    return lambda: subprocess.run(command, cwd=BASE_DIR, env=env, check=True, capture_output=True)
+
+
+@benchmark('api_save')
+def bench_api_save(ws):
+    from scrapers.api_scraper import APIBasicStatsScraper
+    scraper = APIBasicStatsScraper()
+    records = synthetic.basic_stats_records(ws.new_games)
+    return (lambda: ws.restore(ws.basic_existing, ws.basic_stats)), (lambda: scraper.save(records))
+
+
+@benchmark('ui_save')
+def bench_ui_save(ws):
+    from scrapers.ui_scraper import UIAdvancedStatsScraper
+    scraper = UIAdvancedStatsScraper()
+    records = synthetic.advanced_stats_frame(ws.new_games).drop(columns='scraped_at').to_dict('records')
+    return (lambda: ws.restore(ws.advanced_existing, ws.advanced_stats)), (lambda: scraper.save(records))
+
+
+@benchmark('merge_stats')
+def bench_merge(ws):
+    from pipeline.merge import merge_stats
+    return merge_stats
+
+
+@benchmark('validate_data')
+def bench_validate(ws):
+    from pipeline.validate import validate_data
+    return (lambda: ws.validated_rows.unlink(missing_ok=True)), validate_data
+
+
+def validated_ledger(ws):
+    """validated_rows.csv as it looks after validating everything before the new games"""
+    from pipeline.validate import validate_data
+    merged = ws.merged_stats.read_bytes()
+    synthetic.merged_stats_frame(ws.existing_games).to_csv(ws.merged_stats, index=False)
+    ws.validated_rows.unlink(missing_ok=True)
+    validate_data()
+    ws.merged_stats.write_bytes(merged)
+    return ws.validated_rows.read_bytes()
+
+
+def check_skips_validated(ws, ledger, setup, run):
+    """One untimed pass; fail unless it validated only the new games' rows, not the ones in `ledger`"""
+    setup()
+    run()
+    added = ws.validated_rows.read_bytes().count(b'\n') - ledger.count(b'\n')
+    if added > len(ws.new_games):
+        raise RuntimeError(f"Validation re-checked rows already in the ledger: {added} rows validated, "
+                           f"{len(ws.new_games)} new")
+
+
+@benchmark('validate_incremental')
+def bench_validate_incremental(ws):
+    from pipeline.validate import validate_data
+    ledger = validated_ledger(ws)
+    setup = lambda: ws.validated_rows.write_bytes(ledger)
+    check_skips_validated(ws, ledger, setup, validate_data)
+    return setup, validate_data
+
+
+@benchmark('reparse_archive')
+def bench_reparse(ws):
+    from utils.archive import PayloadArchive
+    from pipeline.reparse import reparse_archive
+    # Every game payload, plus match pages for the most recent REPARSE_PAGE_GAMES games
+    archive = PayloadArchive(ws.archive_dir)
+    for game in synthetic.iter_club_games(ws.player_games):
+        archive.put('club_game', json.dumps(game, sort_keys=True).encode('utf-8'), game['matchId'])
+    recent = ws.player_games[ws.player_games['match_id'].isin(
+        ws.player_games['match_id'].unique()[-REPARSE_PAGE_GAMES:])]
+    for page, row in zip(synthetic.advanced_stats_pages(recent), recent.to_dict('records')):
+        archive.put('advanced_html', page.encode('utf-8'), row['match_id'], row['player_name'])
+    basic, advanced = ws.basic_stats.read_bytes(), ws.advanced_stats.read_bytes()
+
+    def setup():
+        ws.basic_stats.write_bytes(basic)
+        ws.advanced_stats.write_bytes(advanced)
+    return setup, reparse_archive
+
+
+def bench_parse_pages(backend):
+    def bench(ws):
+        from scrapers.parsers import parse_advanced_stats
+        pages = synthetic.advanced_stats_pages(ws.player_games.head(PARSE_PAGES))
+
+        def run():
+            for page in pages:
+                parse_advanced_stats(page, backend)
+        # Optional backends report ImportError here, before timing
+        parse_advanced_stats(pages[0], backend)
+        run.items = len(pages)
+        return run
+    return bench
+
+
+for _backend in ('html.parser', 'lxml', 'selectolax'):
+    benchmark(f'parse_pages_{_backend}')(bench_parse_pages(_backend))
+
+
+def bench_save_merge_validate(held):
+    def bench(ws):
+        from scrapers.api_scraper import APIBasicStatsScraper
+        from pipeline.merge import merge_stats
+        from pipeline.validate import validate_data
+        from utils import store
+        records = synthetic.basic_stats_records(ws.new_games)
+        ledger = validated_ledger(ws)
+
+        def setup():
+            ws.restore(ws.basic_existing, ws.basic_stats)
+            ws.validated_rows.write_bytes(ledger)
+
+        def run():
+            # As in a pipeline run: with held tables, only the commit writes basic and merged stats
+            with mock.patch.object(store, '_held', {} if held else None):
+                APIBasicStatsScraper().save(records)
+                merge_stats()
+                validate_data()
+                if held:
+                    store._write_held()
+        check_skips_validated(ws, ledger, setup, run)
+        return setup, run
+    return bench
+
+
+benchmark('save_merge_validate')(bench_save_merge_validate(held=False))
+benchmark('save_merge_validate_held')(bench_save_merge_validate(held=True))
+
+
+@benchmark('build_player_aggregates')
+def bench_player_aggregates(ws):
+    from pipeline.aggregate import build_player_aggregates
+    return build_player_aggregates
+
+
+@benchmark('form_full')
+def bench_form_full(ws):
+    from analytics.form import form_inputs, compute_form
+    inputs = form_inputs(synthetic.merged_stats_frame(ws.player_games))
+    return lambda: compute_form(inputs)
+
+
+@benchmark('form_incremental')
+def bench_form_incremental(ws):
+    from analytics.form import form_inputs, compute_form, update_form
+    history = compute_form(form_inputs(synthetic.merged_stats_frame(ws.existing_games)))
+    inputs = form_inputs(synthetic.merged_stats_frame(ws.player_games))
+    return lambda: update_form(history, inputs)
+
+
+@benchmark('scrape_career_shot_data')
+def bench_shot_data(ws):
+    from scrapers.heatmap_scraper import scrape_career_shot_data
+    return scrape_career_shot_data
+
+
+@benchmark('expected_goals')
+def bench_expected_goals(ws):
+    from scrapers.heatmap_scraper import scrape_career_shot_data
+    from analytics.xg import expected_goals, compare_xg
+    shot_df = scrape_career_shot_data()
+    df = synthetic.merged_stats_frame(ws.player_games)
+
+    def run():
+        compare_xg(expected_goals(df, shot_df))
+    return run
+
+
+@benchmark('impact_full_fit')
+def bench_impact_full(ws):
+    from analytics.impact import RidgeImpactModel
+    df = synthetic.merged_stats_frame(ws.player_games)
+
+    def run():
+        model = RidgeImpactModel()
+        model.partial_fit(df)
+        model.solve().predict(df)
+    return run
+
+
+@benchmark('impact_incremental_fit')
+def bench_impact_incremental(ws):
+    from analytics.impact import RidgeImpactModel
+    model = RidgeImpactModel()
+    model.partial_fit(synthetic.merged_stats_frame(ws.existing_games))
+    base = (model.n, model.sum_x.copy(), model.sum_y.copy(), model.xtx.copy(), model.xty.copy(), model.row_keys)
+    new_games = synthetic.merged_stats_frame(ws.new_games)
+
+    def setup():
+        model.n, model.sum_x, model.sum_y, model.xtx, model.xty, model.row_keys = (
+            base[0], base[1].copy(), base[2].copy(), base[3].copy(), base[4].copy(), base[5])
+
+    def run():
+        model.partial_fit(new_games)
+        model.solve().predict(new_games)
+    return setup, run
+
+
+@benchmark('lineup_stats')
+def bench_lineups(ws):
+    from analytics.lineups import lineup_index, lineup_stats
+    df = synthetic.merged_stats_frame(ws.player_games)
+    return lambda: lineup_stats(*lineup_index(df))
+
+
+@benchmark('best_lineups_query')
+def bench_best_lineups(ws):
+    from analytics.lineups import lineup_index, lineup_stats, best_lineups
+    stats = lineup_stats(*lineup_index(synthetic.merged_stats_frame(ws.player_games)))
+    return lambda: best_lineups(stats, size=3, min_games=5, sort_by='goal_diff_per_game')
+
+
+@benchmark('dashboard_aggregations')
+def bench_dashboard(ws):
+    from analytics import aggregations
+    from analytics.categories import read_merged_stats
+    df = read_merged_stats(ws.merged_stats)
+
+    def run():
+        aggregations.get_team_record(df)
+        wins_df, losses_df = aggregations.split_wins_losses(df)
+        aggregations.team_split_metrics(wins_df)
+        aggregations.team_split_metrics(losses_df)
+        aggregations.get_game_trends(df)
+        player_aggregates = aggregations.compute_player_aggregates(df)
+        aggregations.player_stats_from_aggregates(player_aggregates)
+        aggregations.player_win_loss_comparison(player_aggregates)
+        aggregations.build_game_log(df)
+        for totals in player_aggregates[player_aggregates['split'] == 'all'].to_dict('records'):
+            aggregations.season_totals(totals)
+    return run
+
+
+@benchmark('key_insights')
+def bench_key_insights(ws):
+    from analytics.significance import game_level_stats, win_loss_significance
+    df = synthetic.merged_stats_frame(ws.player_games)
+
+    def run():
+        win_loss_significance(game_level_stats(df))
+    return run
+
+
+def time_benchmark(fn, ws, repeat):
+    """Return timings (seconds) for `repeat` runs, excluding setup"""
+    prepared = fn(ws)
+    setup, run = prepared if isinstance(prepared, tuple) else (None, prepared)
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings, getattr(run, 'items', None)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=BASE_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def load_history(path):
+    if Path(path).exists():
+        with open(path) as f:
+            return json.load(f)
+    return []
+
+
+def previous_entry(history, n_games):
+    for entry in reversed(history):
+        if entry['games'] == n_games:
+            return entry
+    return None
+
+
+def run_scale(n_games, names, repeat, seed):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='nhl26-bench-') as tmp:
+        print(f"\nGenerating {n_games} synthetic games...")
+        ws = Workspace(tmp, n_games, seed)
+        print(f"  {len(ws.player_games)} player-game rows")
+        for name in names:
+            try:
+                with ws.patch_paths():
+                    timings, items = time_benchmark(BENCHMARKS[name], ws, repeat)
+            except ImportError as e:
+                print(f"  {name:<28} skipped ({e})")
+                continue
+            results[name] = {
+                'min_s': round(min(timings), 6),
+                'median_s': round(statistics.median(timings), 6),
+                'repeat': repeat,
+            }
+            if items:
+                results[name]['items_per_s'] = round(items / statistics.median(timings), 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NHL 26 stats pipeline on synthetic data")
+    parser.add_argument('--games', type=int, nargs='+', default=[1000], help="Scales to run (number of games)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run a subset of benchmarks")
+    parser.add_argument('--history', type=Path, default=HISTORY_FILE)
+    parser.add_argument('--no-save', action='store_true', help="Do not append results to the history file")
+    args = parser.parse_args()
+
+    # Benchmarks time the work, not the log I/O
+    logging.disable(logging.WARNING)
+
+    names = args.only or list(BENCHMARKS)
+    history = load_history(args.history)
+    commit, dirty = git_commit()
+
+    for n_games in args.games:
+        results = run_scale(n_games, names, args.repeat, args.seed)
+        previous = previous_entry(history, n_games)
+
+        print(f"\n{'benchmark':<28} {'median (s)':>12} {'min (s)':>12} {'vs prev':>10} {'items/s':>10}")
+        for name, timing in results.items():
+            change = ''
+            if previous and name in previous['results']:
+                before = previous['results'][name]['median_s']
+                change = f"{(timing['median_s'] - before) / before * 100:+.1f}%" if before else ''
+            per_second = f"{timing['items_per_s']:.0f}" if 'items_per_s' in timing else ''
+            print(f"{name:<28} {timing['median_s']:>12.4f} {timing['min_s']:>12.4f} {change:>10} {per_second:>10}")
+
+        history.append({
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'games': n_games,
+            'results': results,
+        })
+
+    if not args.no_save:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2)
+        print(f"\nAppended results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Cost of a pipeline run that finds no new games
+
+Usage:
+    python benchmarks/startup.py --games 1000
+    python benchmarks/run.py --only startup_no_new_games   # tracked in history.json
+
+Runs pipeline/orchestrator.py's run_pipeline() in a fresh interpreter under
+`python -X importtime`, against a synthetic workspace (NHL26_DATA_DIR) whose
+tables already hold every game the club payload lists. That is the whole
+quiet poll: the new-games check, the snapshot begin/commit, and Steps 7-8
+(shot locations and xG). The Pro Clubs capture is stubbed, since it drives
+a real browser against the EA site; its Playwright start-up is not in these
+numbers. A first, untimed run commits the workspace's base snapshot so the
+timed run sees the steady state.
+
+Prints the wall time, the slowest imports and the heavy modules the run
+loaded, and exits non-zero if it loaded one that only the new-games steps
+need (the UI scraper, the HTML parsers, merge/validate/derived tables).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import BASE_DIR
+
+# Loaded by Step 8 (shot locations, xG) on every poll
+EXPECTED_MODULES = ['pandas', 'numpy']
+# Only the steps that run when there are new games should load these
+DEFERRED_MODULES = ['playwright', 'bs4', 'lxml', 'scrapers.ui_scraper', 'scrapers.parsers', 'pipeline.merge',
+                    'pipeline.validate', 'pipeline.aggregate', 'pipeline.form', 'pipeline.impact',
+                    'pipeline.lineups', 'pipeline.publish']
+
+
+def quiet_poll(club_payload):
+    """Child process: one run_pipeline() with the API response read from `club_payload`"""
+    import asyncio
+    import logging
+    logging.disable(logging.WARNING)
+
+    from pipeline import orchestrator
+    from scrapers import ea_proclubs_scraper
+    from config.config import DATA_DIR, RUN_MARKER_FILE
+
+    payload = json.loads(Path(club_payload).read_text())
+    orchestrator.APIBasicStatsScraper.fetch_club_data = lambda self: payload
+
+    async def capture():
+        return True  # the workspace already has the members payload
+    ea_proclubs_scraper.capture_proclubs_api_data = capture
+
+    found = []
+    find_new_games = orchestrator.find_new_games
+    orchestrator.find_new_games = lambda scraper: found.append(find_new_games(scraper)) or found[-1]
+    orchestrator.METRICS_PORT = None
+    orchestrator.METRICS_TEXTFILE = DATA_DIR / 'pipeline.prom'
+
+    asyncio.run(orchestrator.run_pipeline())
+    if found != [[]]:
+        sys.exit(f"Expected one check finding no new games, got {found}")
+    if RUN_MARKER_FILE.exists():
+        sys.exit("The run did not commit")
+    print(json.dumps({'loaded': [name for name in EXPECTED_MODULES + DEFERRED_MODULES if name in sys.modules],
+                      'modules': len(sys.modules)}))
+
+
+def quiet_poll_command(ws, importtime=False):
+    """(command, environment) for the child process, with the club payload written into workspace `ws`"""
+    from benchmarks import synthetic
+
+    payload = ws.root / 'club_payload.json'
+    if not payload.exists():
+        payload.write_text(json.dumps(synthetic.club_payload(ws.player_games)))
+    command = ([sys.executable] + (['-X', 'importtime'] if importtime else []) +
+               [str(Path(__file__).resolve()), '--child', str(payload)])
+    return command, {**os.environ, 'NHL26_DATA_DIR': str(ws.root)}
+
+
+def warm_up(ws):
+    """Untimed first run: commits the workspace tables as the base snapshot"""
+    command, env = quiet_poll_command(ws)
+    subprocess.run(command, cwd=BASE_DIR, env=env, check=True, capture_output=True)
+
+
+def parse_importtime(stderr):
+    """(module, self µs, cumulative µs, depth) for each `-X importtime` line"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def profile(ws):
+    warm_up(ws)
+    command, env = quiet_poll_command(ws, importtime=True)
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"Quiet poll failed:\n{result.stderr[-2000:]}")
+    imports = parse_importtime(result.stderr)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['wall_s'] = wall
+    report['import_s'] = sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1e6
+    report['slowest'] = sorted(imports, key=lambda entry: entry[2], reverse=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list")
+    parser.add_argument('--child', metavar='PAYLOAD', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        quiet_poll(args.child)
+        return
+
+    from benchmarks.run import Workspace
+
+    with tempfile.TemporaryDirectory(prefix='nhl26-startup-') as root:
+        report = profile(Workspace(root, args.games))
+
+    print(f"quiet run: {report['wall_s'] * 1000:.0f} ms wall, {report['import_s'] * 1000:.0f} ms importing "
+          f"{report['modules']} modules (Pro Clubs capture stubbed)")
+    print(f"\n{'module':<48} {'self (ms)':>10} {'cumulative (ms)':>16}")
+    for name, self_us, cumulative_us, depth in report['slowest'][:args.top]:
+        print(f"{'  ' * depth + name:<48} {self_us / 1000:>10.1f} {cumulative_us / 1000:>16.1f}")
+
+    expected = [name for name in report['loaded'] if name in EXPECTED_MODULES]
+    deferred = [name for name in report['loaded'] if name in DEFERRED_MODULES]
+    print(f"\nloaded for Steps 7-8: {', '.join(expected) or 'nothing heavy'}")
+    if deferred:
+        print(f"FAIL: the quiet run loaded {', '.join(deferred)}")
+        sys.exit(1)
+    print("OK: none of the new-games modules loaded")
+
+
+if __name__ == "__main__":
+    main()
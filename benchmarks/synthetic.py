@@ -0,0 +1,326 @@
+"""
+Synthetic ChelStats / Pro Clubs data at configurable scale
+"""
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import CLUB_ID, PLAYER_NAMES
+from analytics.outcomes import (
+    RESULT_WIN, RESULT_LOSS, RESULT_OT_WIN, RESULT_OT_LOSS, RESULT_DNF_LOSS, RESULT_DNF_WIN, add_outcome_columns
+)
+
+FIRST_MATCH_ID = 2124574950033
+FIRST_TIMESTAMP = 1759977365
+SCRAPE_DELAY_SECONDS = 3600  # synthetic rows are "scraped" this long after the game
+POSITIONS = ['center', 'leftWing', 'rightWing', 'defenseMen']
+PLAYER_CLASSES = [1, 2, 4, 12, 14, 15]
+
+# Column order of basic_stats.csv (as produced by extract_player_game_stats)
+BASIC_COLUMNS = [
+    'match_id', 'timestamp', 'scraped_at', 'player_name', 'player_id', 'position', 'player_class',
+    'result', 'score', 'opponent_score', 'opponent_club_id', 'toi_seconds', 'toi_minutes',
+    'rating_offense', 'rating_defense', 'rating_teamplay', 'goals', 'assists', 'points', 'gwg',
+    'ppg', 'shg', 'plus_minus', 'shots', 'shot_attempts', 'shot_pct', 'shot_on_net_pct',
+    'deflections', 'passes', 'pass_attempts', 'pass_pct', 'saucer_passes', 'possession_seconds',
+    'possession_minutes', 'faceoff_wins', 'faceoff_losses', 'faceoff_pct', 'hits', 'blocked_shots',
+    'interceptions', 'takeaways', 'giveaways', 'pk_clear_zone', 'pim', 'penalties_drawn',
+    'goalie_saves', 'goalie_shots_against', 'goalie_goals_against', 'goalie_save_pct', 'goalie_gaa',
+    'goalie_shutout_periods',
+]
+
+# API player field -> basic_stats column
+API_FIELDS = {
+    'playername': 'player_name',
+    'position': 'position',
+    'class': 'player_class',
+    'result': 'result',
+    'score': 'score',
+    'opponentScore': 'opponent_score',
+    'opponentClubId': 'opponent_club_id',
+    'toiseconds': 'toi_seconds',
+    'ratingOffense': 'rating_offense',
+    'ratingDefense': 'rating_defense',
+    'ratingTeamplay': 'rating_teamplay',
+    'skgoals': 'goals',
+    'skassists': 'assists',
+    'skgwg': 'gwg',
+    'skppg': 'ppg',
+    'skshg': 'shg',
+    'skplusmin': 'plus_minus',
+    'skshots': 'shots',
+    'skshotattempts': 'shot_attempts',
+    'skshotpct': 'shot_pct',
+    'skshotonnetpct': 'shot_on_net_pct',
+    'skdeflections': 'deflections',
+    'skpasses': 'passes',
+    'skpassattempts': 'pass_attempts',
+    'skpasspct': 'pass_pct',
+    'sksaucerpasses': 'saucer_passes',
+    'skpossession': 'possession_seconds',
+    'skfow': 'faceoff_wins',
+    'skfol': 'faceoff_losses',
+    'skfopct': 'faceoff_pct',
+    'skhits': 'hits',
+    'skbs': 'blocked_shots',
+    'skinterceptions': 'interceptions',
+    'sktakeaways': 'takeaways',
+    'skgiveaways': 'giveaways',
+    'skpkclearzone': 'pk_clear_zone',
+    'skpim': 'pim',
+    'skpenaltiesdrawn': 'penalties_drawn',
+    'glsaves': 'goalie_saves',
+    'glshots': 'goalie_shots_against',
+    'glga': 'goalie_goals_against',
+    'glsavepct': 'goalie_save_pct',
+    'glgaa': 'goalie_gaa',
+    'glsoperiods': 'goalie_shutout_periods',
+}
+
+# UI label -> advanced_stats column
+ADVANCED_LABELS = {
+    'WAR': 'war',
+    'TO': 'total_offense',
+    'TD': 'total_defense',
+    'Eff': 'efficiency',
+    'xG': 'expected_goals',
+    'GAE': 'goals_above_expected',
+    'GAR': 'goals_above_replacement',
+}
+
+# Relative share of shots per ice zone (zones 7, 9-11 are the slot/circles)
+ZONE_SHOT_WEIGHTS = np.array([1, 1, 1, 6, 5, 5, 14, 3, 10, 12, 10, 3, 6, 8, 6, 1], dtype=float)
+ZONE_CONVERSION = np.array([.02, .02, .02, .30, .15, .15, .22, .04, .10, .12, .10, .04, .05, .04, .05, .01])
+
+
+def _pct(numerator, denominator, decimals=2):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, np.round(numerator / np.maximum(denominator, 1) * 100, decimals), 0.0)
+
+
+def generate_player_games(n_games, seed=0, players=PLAYER_NAMES):
+    """One row per player per game with basic and advanced stat columns (numeric)"""
+    rng = np.random.default_rng(seed)
+    n_roster = len(players)
+
+    # Game-level outcome
+    score = rng.poisson(3.2, n_games)
+    opponent_score = rng.poisson(3.0, n_games)
+    tied = score == opponent_score
+    overtime_winner = rng.random(n_games) < 0.5
+    score = score + (tied & overtime_winner)
+    opponent_score = opponent_score + (tied & ~overtime_winner)
+    won = score > opponent_score
+    result = np.where(won, np.where(tied, RESULT_OT_WIN, RESULT_WIN), np.where(tied, RESULT_OT_LOSS, RESULT_LOSS))
+    disconnect = rng.random(n_games) < 0.03
+    result = np.where(disconnect, np.where(won, RESULT_DNF_WIN, RESULT_DNF_LOSS), result)
+
+    match_ids = FIRST_MATCH_ID + np.arange(n_games, dtype=np.int64) * 7919
+    timestamps = FIRST_TIMESTAMP + np.cumsum(rng.integers(600, 86400, n_games))
+    opponent_club_ids = rng.integers(1000, 99999, n_games)
+
+    # Pick 4-6 of the roster per game
+    players_in_game = rng.integers(4, n_roster + 1, n_games)
+    order = rng.random((n_games, n_roster)).argsort(axis=1)
+    game_idx, slot = np.nonzero(np.arange(n_roster) < players_in_game[:, None])
+    player_idx = order[game_idx, slot]
+    n = len(game_idx)
+
+    # Each player mostly plays a preferred position/build
+    favourite_position = rng.integers(0, len(POSITIONS), n_roster)
+    favourite_class = rng.integers(0, len(PLAYER_CLASSES), n_roster)
+    position_idx = np.where(rng.random(n) < 0.8, favourite_position[player_idx], rng.integers(0, len(POSITIONS), n))
+    class_idx = np.where(rng.random(n) < 0.8, favourite_class[player_idx], rng.integers(0, len(PLAYER_CLASSES), n))
+    is_center = position_idx == 0
+
+    row_won = won[game_idx]
+    goals = rng.poisson(np.where(row_won, 0.7, 0.4))
+    assists = rng.poisson(np.where(row_won, 0.9, 0.5))
+    shots = goals + rng.poisson(1.6, n)
+    shot_attempts = shots + rng.poisson(1.2, n)
+    passes = rng.poisson(20, n)
+    pass_attempts = passes + rng.poisson(5, n)
+    faceoff_wins = np.where(is_center, rng.poisson(6, n), 0)
+    faceoff_losses = np.where(is_center, rng.poisson(6, n), 0)
+    toi_seconds = rng.integers(3300, 3900, n)
+    possession_seconds = rng.poisson(300, n)
+
+    frame = pd.DataFrame({
+        'match_id': match_ids[game_idx],
+        'timestamp': timestamps[game_idx],
+        'player_name': np.asarray(players)[player_idx],
+        'player_id': 444935924 + player_idx * 1009,
+        'position': np.asarray(POSITIONS)[position_idx],
+        'player_class': np.asarray(PLAYER_CLASSES)[class_idx],
+        'result': result[game_idx],
+        'score': score[game_idx],
+        'opponent_score': opponent_score[game_idx],
+        'opponent_club_id': opponent_club_ids[game_idx],
+        'toi_seconds': toi_seconds,
+        'rating_offense': rng.integers(8, 21, n) * 5.0,
+        'rating_defense': rng.integers(8, 21, n) * 5.0,
+        'rating_teamplay': rng.integers(8, 21, n) * 5.0,
+        'goals': goals,
+        'assists': assists,
+        'gwg': (row_won & (goals > 0) & (rng.random(n) < 0.3)).astype(int),
+        'ppg': (goals > 0) & (rng.random(n) < 0.1),
+        'shg': np.zeros(n, dtype=int),
+        'plus_minus': rng.integers(-2, 3, n) + np.where(row_won, 1, -1),
+        'shots': shots,
+        'shot_attempts': shot_attempts,
+        'shot_pct': _pct(goals, shots),
+        'shot_on_net_pct': _pct(shots, shot_attempts),
+        'deflections': rng.poisson(0.2, n),
+        'passes': passes,
+        'pass_attempts': pass_attempts,
+        'pass_pct': _pct(passes, pass_attempts),
+        'saucer_passes': rng.poisson(1, n),
+        'possession_seconds': possession_seconds,
+        'faceoff_wins': faceoff_wins,
+        'faceoff_losses': faceoff_losses,
+        'faceoff_pct': _pct(faceoff_wins, faceoff_wins + faceoff_losses),
+        'hits': rng.poisson(3, n),
+        'blocked_shots': rng.poisson(1, n),
+        'interceptions': rng.poisson(3, n),
+        'takeaways': rng.poisson(np.where(row_won, 3.5, 2.5)),
+        'giveaways': rng.poisson(np.where(row_won, 4.0, 5.5)),
+        'pk_clear_zone': rng.poisson(0.3, n),
+        'pim': rng.poisson(0.3, n) * 2,
+        'penalties_drawn': rng.poisson(0.3, n),
+        'goalie_saves': np.zeros(n, dtype=int),
+        'goalie_shots_against': np.zeros(n, dtype=int),
+        'goalie_goals_against': np.zeros(n, dtype=int),
+        'goalie_save_pct': np.zeros(n),
+        'goalie_gaa': np.zeros(n),
+        'goalie_shutout_periods': np.zeros(n, dtype=int),
+    })
+    frame['ppg'] = frame['ppg'].astype(int)
+
+    # Advanced stats loosely track the basic line
+    expected_goals = np.round(shots * rng.uniform(0.05, 0.2, n), 2)
+    frame['war'] = np.clip(np.round(rng.normal(np.where(row_won, 65, 40), 25)), 0, 100)
+    frame['total_offense'] = np.clip(np.round(rng.normal(50, 25, n)), 0, 100)
+    frame['total_defense'] = np.clip(np.round(rng.normal(50, 30, n)), 0, 100)
+    frame['efficiency'] = np.clip(np.round(rng.normal(30, 15, n)), 0, 100)
+    frame['expected_goals'] = expected_goals
+    frame['goals_above_expected'] = np.round(goals - expected_goals, 2)
+    frame['goals_above_replacement'] = np.round(rng.normal(0, 0.8, n), 2)
+
+    return frame
+
+
+def _scraped_at(timestamps):
+    """ISO scrape times derived from the game timestamps, so regenerated rows hash the same"""
+    return pd.to_datetime(timestamps + SCRAPE_DELAY_SECONDS, unit='s').dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def basic_stats_frame(player_games):
+    """basic_stats.csv-shaped frame for generated rows"""
+    df = player_games.copy()
+    df['scraped_at'] = _scraped_at(df['timestamp'])
+    df['points'] = df['goals'] + df['assists']
+    df['toi_minutes'] = (df['toi_seconds'] / 60).round(2)
+    df['possession_minutes'] = (df['possession_seconds'] / 60).round(2)
+    return df[BASIC_COLUMNS]
+
+
+def advanced_stats_frame(player_games):
+    """advanced_stats.csv-shaped frame for generated rows"""
+    df = player_games[list(ADVANCED_LABELS.values()) + ['player_name', 'match_id']].copy()
+    df['scraped_at'] = _scraped_at(player_games['timestamp'])
+    return df
+
+
+def merged_stats_frame(player_games):
+    """merged_stats.csv-shaped frame for generated rows"""
+    df = basic_stats_frame(player_games)
+    advanced = player_games[list(ADVANCED_LABELS.values())]
+    return add_outcome_columns(pd.concat([df.reset_index(drop=True), advanced.reset_index(drop=True)], axis=1))
+
+
+def basic_stats_records(player_games):
+    """List of dicts as returned by APIBasicStatsScraper.scrape()"""
+    return basic_stats_frame(player_games).to_dict('records')
+
+
+def iter_club_games(player_games, club_id=CLUB_ID):
+    """Yield ChelStats recentGames entries (stats as strings, like the API)"""
+    for match_id, game in player_games.groupby('match_id', sort=False):
+        first = game.iloc[0]
+        club_players = {}
+        for row in game.to_dict('records'):
+            club_players[str(row['player_id'])] = {key: str(row[column]) for key, column in API_FIELDS.items()}
+        yield {
+            'matchId': str(match_id),
+            'timestamp': int(first['timestamp']),
+            'players': {club_id: club_players},
+        }
+
+
+def club_payload(player_games, club_id=CLUB_ID):
+    """Full /clubs/stats response for generated rows"""
+    return {'recentGames': {'RegularSeason': list(iter_club_games(player_games, club_id))}}
+
+
+def advanced_stats_html(values, filler_blocks=40, seed=0):
+    """Match page with the advanced-stats panel for one player
+
+    `values` maps column names (war, total_offense, ...) to numbers. Filler
+    markup approximates the size of the real page around the panel.
+    """
+    rng = np.random.default_rng(seed)
+    filler = ''.join(
+        f'<div class="css-{rng.integers(1e6):x}"><span class="css-1q2w3e">Row {i}</span>'
+        f'<span class="css-4r5t6y">{rng.integers(100)}</span><svg width="12" height="12"><path d="M0 0L12 12"/></svg></div>'
+        for i in range(filler_blocks)
+    )
+    panel = ''.join(
+        f'<div class="css-1lekzkb"><p class="css-9y6e4h">{label}</p>'
+        f'<p class="css-1xpcq1e">{values.get(column, 0)}{"%" if column in ("war", "total_offense", "total_defense", "efficiency") else ""}</p></div>'
+        for label, column in ADVANCED_LABELS.items()
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>ChelStats</title>'
+        '<script src="/_next/static/chunks/main.js"></script></head><body>'
+        f'<header class="css-header"><nav>{filler[:len(filler) // 4]}</nav></header>'
+        f'<main><section class="css-summary">{filler}</section>'
+        f'<section class="css-advanced" id="advanced-stats"><div class="css-panel">{panel}</div></section></main>'
+        '<footer>ChelStats</footer></body></html>'
+    )
+
+
+def advanced_stats_pages(player_games, filler_blocks=40):
+    """One page per generated row, in row order"""
+    columns = list(ADVANCED_LABELS.values())
+    return [advanced_stats_html(values, filler_blocks, seed=i)
+            for i, values in enumerate(player_games[columns].to_dict('records'))]
+
+
+def members_payload(player_games, seed=0):
+    """Pro Clubs members/stats response with per-zone shot and goal counts"""
+    rng = np.random.default_rng(seed)
+    members = []
+    zone_probs = ZONE_SHOT_WEIGHTS / ZONE_SHOT_WEIGHTS.sum()
+    for player_name, games in player_games.groupby('player_name'):
+        games_played = games['match_id'].nunique()
+        total_shots = int(games['shots'].sum())
+        zone_shots = rng.multinomial(total_shots, rng.dirichlet(zone_probs * 50))
+        zone_goals = rng.binomial(zone_shots, ZONE_CONVERSION)
+        net_shots = rng.multinomial(total_shots, [0.2] * 5)
+        net_goals = rng.multinomial(int(zone_goals.sum()), [0.2] * 5)
+        member = {
+            'name': player_name,
+            'gp': str(games_played),
+            'favoritePosition': games['position'].mode().iloc[0],
+        }
+        for i in range(16):
+            member[f'GoalsLocationOnIce{i + 1}'] = str(zone_goals[i])
+            member[f'ShotsLocationOnIce{i + 1}'] = str(zone_shots[i])
+        for i in range(5):
+            member[f'GoalsLocationOnNet{i + 1}'] = str(net_goals[i])
+            member[f'ShotsLocationOnNet{i + 1}'] = str(net_shots[i])
+        members.append(member)
+    return {'members': members}
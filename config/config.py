@@ -6,14 +6,13 @@ from pathlib import Path
 
 # Project paths
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.environ.get("NHL26_DATA_DIR", BASE_DIR / "data"))  # override to run against another data set
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+MODELS_DIR = DATA_DIR / "models"
+ARCHIVE_DIR = DATA_DIR / "archive"
 LOGS_DIR = BASE_DIR / "logs"
-
-# Ensure directories exist
-for dir_path in [RAW_DATA_DIR, PROCESSED_DATA_DIR, LOGS_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
+# Directories are created by whatever first writes to them (utils/store.py, utils/archive.py, the log handler)
 
 # Team configuration
 TEAM_NAME = "Dutchess Dairyboys"
@@ -24,24 +23,119 @@ CLUB_ID = "58805"
 # Player names
 PLAYER_NAMES = ['MrBazzzz', 'Mcapp_1', 'TwoInchTommy565', 'NYKings06', 'Slick__AV', 'Matty__Ice__4']
 
+# Site base URLs (point both at replay/server.py to run the pipeline offline)
+CHELSTATS_BASE_URL = os.environ.get("NHL26_CHELSTATS_URL", "https://chelstats.app").rstrip("/")
+PROCLUBS_BASE_URL = os.environ.get("NHL26_PROCLUBS_URL", "https://proclubs.ea.com").rstrip("/")
+
 # API endpoints
-API_BASE_URL = "https://chelstats.app/api"
+API_BASE_URL = f"{CHELSTATS_BASE_URL}/api"
 CLUB_STATS_URL = f"{API_BASE_URL}/clubs/stats?teamname={TEAM_NAME_ENCODED}&console={CONSOLE}&strict=false"
+PROCLUBS_MEMBERS_URL = f"{PROCLUBS_BASE_URL}/api/nhl/members/stats?platform={CONSOLE}&clubId={CLUB_ID}"
 
 # Game URLs
 def get_game_url(match_id):
-    return f"https://chelstats.app/clubs/recent-games?teamname={TEAM_NAME_ENCODED}&console={CONSOLE}&gameType=RegularSeason&matchId={match_id}"
+    return f"{CHELSTATS_BASE_URL}/clubs/recent-games?teamname={TEAM_NAME_ENCODED}&console={CONSOLE}&gameType=RegularSeason&matchId={match_id}"
 
 # Database files
 DB_BASIC_STATS = RAW_DATA_DIR / "basic_stats.csv"
 DB_ADVANCED_STATS = RAW_DATA_DIR / "advanced_stats.csv"
 DB_MERGED_STATS = PROCESSED_DATA_DIR / "merged_stats.csv"
+DB_PROCLUBS_MEMBERS = RAW_DATA_DIR / "proclubs_members_stats.json"
+DB_SHOT_LOCATIONS = PROCESSED_DATA_DIR / "shot_locations.csv"
+DB_PLAYER_AGGREGATES = PROCESSED_DATA_DIR / "player_aggregates.csv"
+DB_PLAYER_SPLITS = PROCESSED_DATA_DIR / "player_splits.csv"
+PLAYER_GAME_LOGS_DIR = PROCESSED_DATA_DIR / "player_game_logs"
+PLAYER_GAME_LOGS = [PLAYER_GAME_LOGS_DIR / f"{player_name}.csv" for player_name in PLAYER_NAMES]
+DB_FORM = PROCESSED_DATA_DIR / "form.csv"
+DB_EXPECTED_GOALS = PROCESSED_DATA_DIR / "expected_goals.csv"
+DB_IMPACT_ESTIMATES = PROCESSED_DATA_DIR / "impact_estimates.csv"
+DB_LINEUPS = PROCESSED_DATA_DIR / "lineups.csv"
+DB_QUARANTINE = PROCESSED_DATA_DIR / "quarantine.csv"
+DB_VALIDATED_ROWS = PROCESSED_DATA_DIR / "validated_rows.csv"
+CHANGELOG_DB = PROCESSED_DATA_DIR / "changes.db"  # change log of merged stats rows (utils/changelog.py)
+CHANGELOG_BATCH = 1000  # changes per read by default
+IMPACT_MODEL_FILE = MODELS_DIR / "impact_model.npz"
+
+# Run snapshots (utils/store.py): tables committed together by each pipeline run
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+MANIFEST_FILE = DATA_DIR / "manifest.json"  # the last committed run
+RUN_MARKER_FILE = DATA_DIR / ".run_in_progress"  # present while a run has uncommitted writes
+SNAPSHOT_KEEP = 5  # runs that can be rolled back to
+SNAPSHOT_TABLES = [
+    DB_BASIC_STATS, DB_ADVANCED_STATS, DB_PROCLUBS_MEMBERS, DB_MERGED_STATS, DB_QUARANTINE, DB_VALIDATED_ROWS,
+    DB_SHOT_LOCATIONS, DB_PLAYER_AGGREGATES, DB_PLAYER_SPLITS, DB_FORM, DB_EXPECTED_GOALS, DB_IMPACT_ESTIMATES,
+    DB_LINEUPS, IMPACT_MODEL_FILE, *PLAYER_GAME_LOGS,
+]
 
 # Scraper settings
 SCRAPER_TIMEOUT = 30000  # milliseconds
 WAIT_AFTER_CLICK = 4000  # milliseconds
 HEADLESS_MODE = True  # Set to False for debugging
+PANEL_FINGERPRINT_FILE = RAW_DATA_DIR / "panel_fingerprint.json"  # stats panel markup seen on the last run
+
+# Lean UI scraping: abort these requests, smaller viewport, one browser context per run, no networkidle wait
+LEAN_BROWSER = True
+LEAN_VIEWPORT = {"width": 1024, "height": 768}
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+BLOCKED_HOSTS = (  # third-party analytics and ads (subdomains included)
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "adservice.google.com", "amazon-adsystem.com", "facebook.net", "hotjar.com",
+    "scorecardresearch.com", "quantserve.com", "clarity.ms", "adnxs.com", "criteo.com", "taboola.com",
+)
+
+# Politeness (utils/ratelimit.py): requests/s, burst and concurrent requests per host
+HOST_RATE_LIMITS = {
+    "chelstats.app": {"rate": 2.0, "burst": 4, "concurrency": 2},
+    "proclubs.ea.com": {"rate": 0.5, "burst": 2, "concurrency": 1},
+}
+DEFAULT_RATE_LIMIT = {"rate": 2.0, "burst": 4, "concurrency": 2}
+RATE_LIMIT_MIN_RATE = 0.05  # requests/s floor after backing off
+RATE_LIMIT_BACKOFF = 0.5  # rate multiplier on a 429, 5xx or timeout
+RATE_LIMIT_RECOVERY = 0.1  # requests/s added back per success, up to the host's rate
+HTTP_TIMEOUT = 30  # seconds
+HTTP_MAX_RETRIES = 4
+HTTP_RETRY_BASE = 1.0  # seconds; retry n waits up to HTTP_RETRY_BASE * 2**n (jittered)
+HTTP_RETRY_MAX = 60.0  # seconds
+
+# Raw payload archive re-parse
+REPARSE_WORKERS = os.cpu_count() or 1  # processes used by pipeline/reparse.py
+PARSER_BACKEND = "lxml"  # advanced-stats page parser: "lxml", "selectolax" or "html.parser"
+
+# Form (rolling / exponentially weighted averages and streaks)
+FORM_WINDOW = 5  # games
+FORM_EWM_ALPHA = 0.3  # weight of the latest game
+
+# Expected goals model
+XG_PRIOR_STRENGTH = 20.0  # pseudo-shots pulling zone rates toward the team rate
+
+# Impact model (ridge estimate of WAR/GAR/TO%/TD% from basic stats)
+IMPACT_ALPHA = 10.0  # ridge penalty on standardized features
+IMPACT_BATCH_ROWS = 50000  # merged_stats rows read per training batch
+
+# Lineups
+LINEUP_MAX_PLAYERS = 12  # most-played players given a bit in the lineup index
+
+# Key Insights significance tests
+INSIGHT_RESAMPLES = 2000  # permutations and bootstrap resamples
+INSIGHT_CONFIDENCE = 0.95
+INSIGHT_ALPHA = 0.05  # false discovery rate
 
 # Logging
 LOG_FILE = LOGS_DIR / "pipeline.log"
-LOG_LEVEL = "INFO"
\ No newline at end of file
+LOG_LEVEL = "INFO"
+LOG_LEVELS = {}  # Per-module overrides, e.g. {"scrapers.ui_scraper": "WARNING"}
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Read-only JSON API (api/server.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8780
+API_CACHE_SIZE = 256  # rendered responses kept in the LRU
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+API_GZIP_MIN_BYTES = 1024  # smaller bodies are sent uncompressed
+API_LOAD_TARGET_RPS = 1000  # benchmarks/load_api.py passes at or above this
+
+# Metrics
+METRICS_PORT = 9108  # Set to None to disable the /metrics endpoint
+METRICS_TEXTFILE = LOGS_DIR / "pipeline.prom"
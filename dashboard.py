@@ -9,35 +9,175 @@ import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
 
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from analytics.aggregations import (
+    get_team_record, split_wins_losses, team_split_metrics,
+    get_game_trends, compute_player_aggregates, player_stats_from_aggregates,
+    player_win_loss_comparison, build_game_log, season_totals, player_game_logs, compute_player_splits
+)
+from analytics.categories import read_merged_stats, position_label
+from analytics.outcomes import ensure_outcome_columns, outcome_colors
+from analytics.significance import game_level_stats, data_version, win_loss_significance, insight_sentences
+from analytics.xg import expected_goals, compare_xg
+from utils.store import committed_path
+from analytics.impact import RidgeImpactModel, impact_estimates
+from analytics.lineups import lineup_index, lineup_stats, best_lineups
+from analytics.form import FORM_COLUMNS, TEAM_ENTITY, form_inputs, compute_form, current_form
+from config.config import (
+    FORM_WINDOW, FORM_EWM_ALPHA, XG_PRIOR_STRENGTH, IMPACT_ALPHA, LINEUP_MAX_PLAYERS, INSIGHT_RESAMPLES, INSIGHT_CONFIDENCE, INSIGHT_ALPHA
+)
+
 st.set_page_config(page_title="Dutchess DairyBoys Analytics", layout="wide")
 
 # Load data
 @st.cache_data
 def load_data():
-    df = pd.read_csv('data/processed/merged_stats.csv')
-    df['scraped_at'] = pd.to_datetime(df['scraped_at'])
-    df['game_date'] = pd.to_datetime(df['timestamp'], unit='s')
-    return df
+    return read_merged_stats(committed_path('data/processed/merged_stats.csv'))
 
 df = load_data()
 
-# Helper functions
-def get_team_record(data):
-    """Calculate team record based on score comparison"""
-    games = data.groupby('match_id').agg({
-        'score': 'first',
-        'opponent_score': 'first'
-    })
-    wins = (games['score'] > games['opponent_score']).sum()
-    losses = (games['score'] < games['opponent_score']).sum()
-    return f"{wins}-{losses}"
-
-def get_result_emoji(score, opponent_score):
-    """Return W or L based on score comparison"""
-    if score > opponent_score:
-        return "W"
+# Precomputed by pipeline/aggregate.py; recomputed here if missing or older than the merged stats
+def is_fresh(path):
+    merged = committed_path('data/processed/merged_stats.csv')
+    return path.exists() and path.stat().st_mtime >= merged.stat().st_mtime
+
+@st.cache_data
+def load_player_aggregates():
+    path = committed_path('data/processed/player_aggregates.csv')
+    if is_fresh(path):
+        return pd.read_csv(path)
+    return compute_player_aggregates(load_data())
+
+@st.cache_data
+def load_player_game_log(player_name):
+    path = committed_path(Path('data/processed/player_game_logs') / f"{player_name}.csv")
+    if is_fresh(path):
+        games = pd.read_csv(path)
     else:
-        return "L"
+        games = player_game_logs(load_data())[player_name]
+    games = ensure_outcome_columns(games)
+    games['game_date'] = pd.to_datetime(games['timestamp'], unit='s')
+    return games
+
+@st.cache_data
+def load_form():
+    path = committed_path('data/processed/form.csv')
+    if is_fresh(path):
+        form = pd.read_csv(path)
+    else:
+        form = compute_form(form_inputs(load_data()), FORM_WINDOW, FORM_EWM_ALPHA)
+    form['game_date'] = pd.to_datetime(form['timestamp'], unit='s')
+    return form
+
+# Cached inputs for each section, keyed only by the widgets that affect them
+@st.cache_data
+def load_kpis(result_filter, selected_players):
+    data = load_data()
+    filtered_df = data[data['player_name'].isin(selected_players)]
+    
+    if result_filter == "Wins Only":
+        filtered_df = filtered_df[filtered_df['is_win']]
+    elif result_filter == "Losses Only":
+        filtered_df = filtered_df[filtered_df['is_loss']]
+    
+    return {
+        'record': get_team_record(data),
+        'goals_for': int(filtered_df.groupby('match_id')['goals'].sum().sum()),
+        'goals_against': int(filtered_df.groupby('match_id')['opponent_score'].first().sum()),
+        'avg_war': filtered_df['war'].mean(),
+        'games_played': filtered_df['match_id'].nunique(),
+    }
+
+@st.cache_data
+def load_team_split_metrics():
+    """(win_metrics, loss_metrics), or None until there are both wins and losses"""
+    wins_df, losses_df = split_wins_losses(load_data())
+    if len(wins_df) == 0 or len(losses_df) == 0:
+        return None
+    return team_split_metrics(wins_df), team_split_metrics(losses_df)
+
+@st.cache_data
+def load_game_level_stats():
+    return game_level_stats(load_data())
+
+# Keyed by the data version; the leading underscore keeps Streamlit from hashing the frame itself
+@st.cache_data
+def load_significance(_games, version):
+    return win_loss_significance(_games, INSIGHT_RESAMPLES, INSIGHT_CONFIDENCE)
+
+@st.cache_data
+def load_game_trends():
+    game_trends = get_game_trends(load_data())
+    return game_trends, outcome_colors(game_trends['outcome'])
+
+@st.cache_data
+def load_player_stats(split, selected_players):
+    return player_stats_from_aggregates(load_player_aggregates(), split, list(selected_players))
+
+@st.cache_data
+def load_game_log():
+    return build_game_log(load_data())
+
+@st.cache_data
+def load_shot_data():
+    try:
+        return pd.read_csv(committed_path('data/processed/shot_locations.csv'))
+    except:
+        return pd.DataFrame()
+
+MAX_TIMINGS = 500
+
+@st.cache_data
+def load_expected_goals():
+    path = committed_path('data/processed/expected_goals.csv')
+    shot_path = committed_path('data/processed/shot_locations.csv')
+    if is_fresh(path) and (not shot_path.exists() or path.stat().st_mtime >= shot_path.stat().st_mtime):
+        return pd.read_csv(path)
+    shot_df = load_shot_data()
+    if shot_df.empty:
+        return pd.DataFrame()
+    return expected_goals(load_data(), shot_df, XG_PRIOR_STRENGTH)
+
+@st.cache_data
+def load_impact_estimates():
+    path = committed_path('data/processed/impact_estimates.csv')
+    if is_fresh(path):
+        return pd.read_csv(path)
+    data = load_data()
+    model = RidgeImpactModel(alpha=IMPACT_ALPHA)
+    if model.partial_fit(data) < 2:
+        return pd.DataFrame()
+    return impact_estimates(data, model.solve())
+
+@st.cache_data
+def load_lineups():
+    path = committed_path('data/processed/lineups.csv')
+    if is_fresh(path):
+        return pd.read_csv(path)
+    return lineup_stats(*lineup_index(load_data(), LINEUP_MAX_PLAYERS))
+
+@st.cache_data
+def load_player_splits():
+    path = committed_path('data/processed/player_splits.csv')
+    if is_fresh(path):
+        return pd.read_csv(path, dtype={'split_value': str})
+    return compute_player_splits(load_data())
+
+# Render time per section, kept across reruns so fragment and full reruns can be compared
+@contextmanager
+def timed_section(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings = st.session_state.setdefault('section_timings', [])
+        timings.append({'Section': name, 'ms': elapsed_ms})
+        del timings[:-MAX_TIMINGS]
+        st.caption(f"Rendered in {elapsed_ms:.0f} ms")
 
 # Sidebar
 st.sidebar.title("Filters")
@@ -54,874 +194,977 @@ selected_players = st.sidebar.multiselect(
     default=df['player_name'].unique()
 )
 
-# Apply filters
-filtered_df = df[df['player_name'].isin(selected_players)].copy()
-
-# Create win/loss indicator based on score comparison
-filtered_df['is_win'] = filtered_df['score'] > filtered_df['opponent_score']
-
-if result_filter == "Wins Only":
-    filtered_df = filtered_df[filtered_df['is_win'] == True]
-elif result_filter == "Losses Only":
-    filtered_df = filtered_df[filtered_df['is_win'] == False]
-
-# Main header
-st.title("Dutchess Dairyboys - Season Analytics")
-st.markdown(f"*Last updated: {df['scraped_at'].max().strftime('%Y-%m-%d %H:%M')}*")
-
-# Top metrics row
-col1, col2, col3, col4, col5 = st.columns(5)
-
-with col1:
-    st.metric("Record", get_team_record(df))
-
-with col2:
-    total_gf = filtered_df.groupby('match_id')['goals'].sum().sum()
-    st.metric("Goals For", int(total_gf))
-
-with col3:
-    total_ga = filtered_df.groupby('match_id')['opponent_score'].first().sum()
-    st.metric("Goals Against", int(total_ga))
-
-with col4:
-    avg_war = filtered_df['war'].mean()
-    st.metric("Avg WAR", f"{avg_war:.1f}%")
+with st.sidebar.expander("Render timings"):
+    timings = pd.DataFrame(st.session_state.get('section_timings', []), columns=['Section', 'ms'])
+    if timings.empty:
+        st.write("No renders recorded yet")
+    else:
+        st.dataframe(
+            timings.groupby('Section')['ms'].agg(['count', 'median', 'max']).round(1),
+            use_container_width=True
+        )
 
-with col5:
-    games_played = filtered_df['match_id'].nunique()
-    st.metric("Games Played", games_played)
 
-st.markdown("---")
+def render_kpis(result_filter, selected_players):
+    kpis = load_kpis(result_filter, tuple(selected_players))
+    
+    # Top metrics row
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Record", kpis['record'])
+    
+    with col2:
+        st.metric("Goals For", kpis['goals_for'])
+    
+    with col3:
+        st.metric("Goals Against", kpis['goals_against'])
+    
+    with col4:
+        st.metric("Avg WAR", f"{kpis['avg_war']:.1f}%")
+    
+    with col5:
+        st.metric("Games Played", kpis['games_played'])
 
-# Win/Loss Comparison Section
-st.header("Team Performance: Wins vs Losses")
 
-# Calculate wins and losses based on score comparison
-game_results = df.groupby('match_id').agg({
-    'score': 'first',
-    'opponent_score': 'first'
-})
-win_match_ids = game_results[game_results['score'] >= game_results['opponent_score']].index
-loss_match_ids = game_results[game_results['score'] < game_results['opponent_score']].index
+def show_split_metrics(metrics):
+    st.metric('Avg Pass %', f"{metrics['pass_pct']:.1f}%")
+    st.metric('Team Giveaways/Game', f"{metrics['giveaways_per_game']:.1f}")
+    st.metric('Team Hits/Game', f"{metrics['hits_per_game']:.1f}")
+    st.metric('Avg Team WAR', f"{metrics['team_war']:.1f}%")
+    st.metric('Avg Shot %', f"{metrics['shot_pct']:.1f}%")
+    st.metric('Avg TO%', f"{metrics['total_offense']:.1f}%")
+    st.metric('Avg TD%', f"{metrics['total_defense']:.1f}%")
 
-wins_df = df[df['match_id'].isin(win_match_ids)]
-losses_df = df[df['match_id'].isin(loss_match_ids)]
 
-if len(wins_df) > 0 and len(losses_df) > 0:
+def render_team_wins_losses():
+    # Win/Loss Comparison Section
+    st.header("Team Performance: Wins vs Losses")
+    
+    split_metrics = load_team_split_metrics()
+    if split_metrics is None:
+        st.info("Need both wins and losses to show comparison")
+        return
+    
+    win_metrics, loss_metrics = split_metrics
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("When We Win")
-        win_metrics = {
-            'Avg Pass %': f"{wins_df['pass_pct'].mean():.1f}%",
-            'Team Giveaways/Game': f"{wins_df.groupby('match_id')['giveaways'].sum().mean():.1f}",
-            'Team Hits/Game': f"{wins_df.groupby('match_id')['hits'].sum().mean():.1f}",
-            'Avg Team WAR': f"{wins_df.groupby('match_id')['war'].mean().mean():.1f}%",
-            'Avg Shot %': f"{wins_df['shot_pct'].mean():.1f}%",
-            'Avg TO%': f"{wins_df['total_offense'].mean():.1f}%",
-            'Avg TD%': f"{wins_df['total_defense'].mean():.1f}%"
-        }
-        
-        for metric, value in win_metrics.items():
-            st.metric(metric, value)
+        show_split_metrics(win_metrics)
     
     with col2:
         st.subheader("When We Lose")
-        loss_metrics = {
-            'Avg Pass %': f"{losses_df['pass_pct'].mean():.1f}%",
-            'Team Giveaways/Game': f"{losses_df.groupby('match_id')['giveaways'].sum().mean():.1f}",
-            'Team Hits/Game': f"{losses_df.groupby('match_id')['hits'].sum().mean():.1f}",
-            'Avg Team WAR': f"{losses_df.groupby('match_id')['war'].mean().mean():.1f}%",
-            'Avg Shot %': f"{losses_df['shot_pct'].mean():.1f}%",
-            'Avg TO%': f"{losses_df['total_offense'].mean():.1f}%",
-            'Avg TD%': f"{losses_df['total_defense'].mean():.1f}%"
-        }
-        
-        for metric, value in loss_metrics.items():
-            st.metric(metric, value)
+        show_split_metrics(loss_metrics)
     
     # Key Insights
     st.subheader("Key Insights")
     
-    pass_diff = wins_df['pass_pct'].mean() - losses_df['pass_pct'].mean()
-    give_diff = wins_df.groupby('match_id')['giveaways'].sum().mean() - losses_df.groupby('match_id')['giveaways'].sum().mean()
-    hits_diff = wins_df.groupby('match_id')['hits'].sum().mean() - losses_df.groupby('match_id')['hits'].sum().mean()
-    war_diff = wins_df.groupby('match_id')['war'].mean().mean() - losses_df.groupby('match_id')['war'].mean().mean()
-    
-    insights = []
-    if abs(pass_diff) > 2:
-        insights.append(f"Pass completion is {abs(pass_diff):.1f}% {'higher' if pass_diff > 0 else 'lower'} in wins")
-    if abs(give_diff) > 2:
-        insights.append(f"Team giveaways are {abs(give_diff):.1f} {'lower' if give_diff < 0 else 'higher'} per game in wins")
-    if abs(hits_diff) > 2:
-        insights.append(f"Team hits are {abs(hits_diff):.1f} {'higher' if hits_diff > 0 else 'lower'} per game in wins")
-    if abs(war_diff) > 5:
-        insights.append(f"Team WAR is {abs(war_diff):.1f}% {'higher' if war_diff > 0 else 'lower'} in wins")
+    games = load_game_level_stats()
+    significance = load_significance(games, data_version(games))
+    insights = insight_sentences(significance, INSIGHT_ALPHA)
     
     if insights:
         for insight in insights:
             st.write(f"- {insight}")
     else:
-        st.write("- Not enough data yet to identify clear patterns")
-else:
-    st.info("Need both wins and losses to show comparison")
-
-st.markdown("---")
-
-# Team Trends Over Time
-st.header("Team Trends Over Time")
-
-game_trends = df.groupby(['match_id', 'game_date', 'result']).agg({
-    'war': 'mean',
-    'pass_pct': 'mean',
-    'giveaways': 'sum',
-    'total_offense': 'mean',
-    'total_defense': 'mean'
-}).reset_index().sort_values('game_date')
-
-# Create color mapping for wins/losses
-colors = ['green' if r == 1 else 'red' if r == 2 else 'orange' for r in game_trends['result']]
-
-col1, col2 = st.columns(2)
-
-with col1:
-    fig_war_trend = go.Figure()
-    fig_war_trend.add_trace(go.Scatter(
-        x=game_trends['game_date'],
-        y=game_trends['war'],
-        mode='lines+markers',
-        name='Avg Team WAR',
-        marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
-        line=dict(color='gray', width=1)
-    ))
-    fig_war_trend.update_layout(
-        title='Team WAR Over Time',
-        xaxis_title='Game Date',
-        yaxis_title='Avg WAR %',
-        hovermode='x unified'
-    )
-    st.plotly_chart(fig_war_trend, use_container_width=True)
-
-with col2:
-    fig_give_trend = go.Figure()
-    fig_give_trend.add_trace(go.Scatter(
-        x=game_trends['game_date'],
-        y=game_trends['giveaways'],
-        mode='lines+markers',
-        name='Team Giveaways',
-        marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
-        line=dict(color='gray', width=1)
-    ))
-    fig_give_trend.update_layout(
-        title='Team Giveaways Over Time',
-        xaxis_title='Game Date',
-        yaxis_title='Total Giveaways',
-        hovermode='x unified'
-    )
-    st.plotly_chart(fig_give_trend, use_container_width=True)
-
-st.markdown("---")
-
-# Player Performance Comparison
-st.header("Player Performance Comparison")
-
-# Aggregate player stats with efficiency metrics
-player_stats = filtered_df.groupby('player_name').agg({
-    'goals': 'sum',
-    'assists': 'sum',
-    'points': 'sum',
-    'war': 'mean',
-    'total_offense': 'mean',
-    'total_defense': 'mean',
-    'efficiency': 'mean',
-    'shots': 'sum',
-    'shot_pct': 'mean',
-    'pass_pct': 'mean',
-    'passes': 'sum',
-    'hits': 'sum',
-    'giveaways': 'sum',
-    'takeaways': 'sum',
-    'interceptions': 'sum',
-    'possession_minutes': 'sum',
-    'match_id': 'count'
-}).round(2)
-
-player_stats.columns = ['Goals', 'Assists', 'Points', 'Avg WAR', 'Avg TO%', 'Avg TD%', 
-                        'Avg Efficiency', 'Shots', 'Shot%', 'Pass%', 'Passes', 'Hits', 
-                        'Giveaways', 'Takeaways', 'Ints', 'Poss Min', 'Games']
-
-# Calculate per-game metrics
-player_stats['Goals/Game'] = (player_stats['Goals'] / player_stats['Games']).round(2)
-player_stats['Shots/Game'] = (player_stats['Shots'] / player_stats['Games']).round(1)
-player_stats['Pass Attempts/Game'] = (player_stats['Passes'] / player_stats['Games']).round(1)
-player_stats['Takeaways/Game'] = (player_stats['Takeaways'] / player_stats['Games']).round(2)
-player_stats['Giveaways/Min'] = (player_stats['Giveaways'] / player_stats['Poss Min']).round(3)
-player_stats['Points/Game'] = (player_stats['Points'] / player_stats['Games']).round(2)
-player_stats['Hits/Game'] = (player_stats['Hits'] / player_stats['Games']).round(2)
-player_stats['Avg T.O.P (min)'] = (player_stats['Poss Min'] / player_stats['Games']).round(2)
-player_stats['Ints/Game'] = (player_stats['Ints'] / player_stats['Games']).round(2)
-
-player_stats = player_stats.sort_values('player_name', ascending=False)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("Offensive Stats")
-    st.dataframe(
-        player_stats[['Games', 'Goals', 'Goals/Game', 'Assists', 'Pass%', 'Pass Attempts/Game', 'Points', 'Points/Game', 
-                      'Shots', 'Shots/Game', 'Shot%']], 
-        use_container_width=True
-    )
-
-with col2:
-    st.subheader("Defensive and Advanced Analytics")
-    st.dataframe(
-        player_stats[['Games', 'Avg T.O.P (min)', 'Avg WAR', 'Avg TO%', 'Avg TD%', 'Avg Efficiency', 
-                      'Giveaways/Min', 'Takeaways', 'Takeaways/Game', 'Ints', 'Ints/Game', 'Hits/Game']], 
-        use_container_width=True
-    )
-
-# Player comparison charts
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    fig_war = px.bar(
-        player_stats.reset_index(),
-        x='player_name',
-        y='Avg WAR',
-        title='Average WAR by Player',
-        labels={'player_name': 'Player', 'Avg WAR': 'WAR (%)'},
-        color='Avg WAR',
-        color_continuous_scale='RdYlGn'
-    )
-    fig_war.update_layout(showlegend=False)
-    st.plotly_chart(fig_war, use_container_width=True)
-
-with col2:
-    # Offense vs Defense scatter
-    fig_scatter = px.scatter(
-        player_stats.reset_index(),
-        x='Avg TO%',
-        y='Avg TD%',
-        size='Avg WAR',
-        color='Avg WAR',
-        text='player_name',
-        title='Offensive vs Defensive Contribution',
-        labels={'Avg TO%': 'Total Offense %', 'Avg TD%': 'Total Defense %'},
-        color_continuous_scale='RdYlGn'
-    )
-    fig_scatter.update_traces(textposition='top center')
-    fig_scatter.update_layout(showlegend=False)
-    st.plotly_chart(fig_scatter, use_container_width=True)
-
-with col3:
-    fig_give = px.bar(
-        player_stats.reset_index(),
-        x='player_name',
-        y='Giveaways/Min',
-        title='Giveaways per Minute of Possession',
-        labels={'player_name': 'Player', 'Giveaways/Min': 'Giveaways/Min'},
-        color='Giveaways/Min',
-        color_continuous_scale='RdYlGn_r'
-    )
-    fig_give.update_layout(showlegend=False)
-    st.plotly_chart(fig_give, use_container_width=True)
-
-st.markdown("---")
-
-# Player Performance in Wins vs Losses
-st.header("Player Performance: Wins vs Losses")
-
-if len(wins_df) > 0 and len(losses_df) > 0:
-    player_wins = wins_df.groupby('player_name').agg({
-        'war': 'mean',
-        'total_offense': 'mean',
-        'total_defense': 'mean',
-        'pass_pct': 'mean',
-        'giveaways': 'mean',
-        'points': 'mean'
-    }).round(1)
-    
-    player_losses = losses_df.groupby('player_name').agg({
-        'war': 'mean',
-        'total_offense': 'mean',
-        'total_defense': 'mean',
-        'pass_pct': 'mean',
-        'giveaways': 'mean',
-        'points': 'mean'
-    }).round(1)
-    
-    comparison_df = pd.DataFrame({
-        'Player': player_wins.index,
-        'WAR (Wins)': player_wins['war'].values,
-        'WAR (Losses)': player_losses.reindex(player_wins.index, fill_value=0)['war'].values,
-        'Pass% (Wins)': player_wins['pass_pct'].values,
-        'Pass% (Losses)': player_losses.reindex(player_wins.index, fill_value=0)['pass_pct'].values,
-        'Giveaways (Wins)': player_wins['giveaways'].values,
-        'Giveaways (Losses)': player_losses.reindex(player_wins.index, fill_value=0)['giveaways'].values
-    })
-    
-    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
-else:
-    st.info("Need both wins and losses to show player comparison")
+        st.write("- No stat separates wins from losses beyond noise yet")
+    
+    with st.expander("All stats (permutation test, bootstrap CI)"):
+        st.dataframe(
+            significance.drop(columns='stat').round(3),
+            use_container_width=True,
+            hide_index=True
+        )
 
-st.markdown("---")
 
-# Game Log
-st.header("Game Log")
-
-game_log = []
-for match_id in df['match_id'].unique():
-    game_data = df[df['match_id'] == match_id].iloc[0]
-    team_goals = df[df['match_id'] == match_id]['goals'].sum()
-    team_giveaways = df[df['match_id'] == match_id]['giveaways'].sum()
-    
-    game_log.append({
-        'Date': game_data['game_date'].strftime('%Y-%m-%d'),
-        'Result': get_result_emoji(game_data['score'], game_data['opponent_score']),
-        'Score': f"{int(game_data['score'])}-{int(game_data['opponent_score'])}",
-        'Goals': int(team_goals),
-        'Shots': int(df[df['match_id'] == match_id]['shots'].sum()),
-        'Pass%': f"{df[df['match_id'] == match_id]['pass_pct'].mean():.1f}%",
-        'Giveaways': int(team_giveaways),
-        'Avg WAR': f"{df[df['match_id'] == match_id]['war'].mean():.1f}%",
-        'Match ID': match_id
-    })
-
-game_log_df = pd.DataFrame(game_log).sort_values('Date', ascending=False)
-st.dataframe(game_log_df, use_container_width=True, hide_index=True)
+def render_trends():
+    # Team Trends Over Time
+    st.header("Team Trends Over Time")
+    
+    game_trends, colors = load_game_trends()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_war_trend = go.Figure()
+        fig_war_trend.add_trace(go.Scatter(
+            x=game_trends['game_date'],
+            y=game_trends['war'],
+            mode='lines+markers',
+            name='Avg Team WAR',
+            marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
+            line=dict(color='gray', width=1)
+        ))
+        fig_war_trend.update_layout(
+            title='Team WAR Over Time',
+            xaxis_title='Game Date',
+            yaxis_title='Avg WAR %',
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_war_trend, use_container_width=True)
+    
+    with col2:
+        fig_give_trend = go.Figure()
+        fig_give_trend.add_trace(go.Scatter(
+            x=game_trends['game_date'],
+            y=game_trends['giveaways'],
+            mode='lines+markers',
+            name='Team Giveaways',
+            marker=dict(size=12, color=colors, line=dict(width=2, color='white')),
+            line=dict(color='gray', width=1)
+        ))
+        fig_give_trend.update_layout(
+            title='Team Giveaways Over Time',
+            xaxis_title='Game Date',
+            yaxis_title='Total Giveaways',
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_give_trend, use_container_width=True)
+
+
+# The stat selectbox only reruns this fragment
+@st.fragment
+def render_form(selected_players):
+    # Form: rolling and exponentially weighted averages, streaks
+    st.header("Form")
+    
+    stat = st.selectbox("Stat", FORM_COLUMNS, key='form_stat')
+    
+    with timed_section('Form'):
+        form = load_form()
+        form = form[form['entity'].isin(list(selected_players) + [TEAM_ENTITY])]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig_rolling = px.line(
+                form,
+                x='game_date',
+                y=f'{stat}_rolling',
+                color='entity',
+                title=f'{stat} - {FORM_WINDOW}-Game Rolling Average',
+                labels={'game_date': 'Game Date', f'{stat}_rolling': stat, 'entity': 'Player'}
+            )
+            st.plotly_chart(fig_rolling, use_container_width=True)
+        
+        with col2:
+            fig_ewm = px.line(
+                form,
+                x='game_date',
+                y=f'{stat}_ewm',
+                color='entity',
+                title=f'{stat} - Weighted Form (alpha {FORM_EWM_ALPHA})',
+                labels={'game_date': 'Game Date', f'{stat}_ewm': stat, 'entity': 'Player'}
+            )
+            st.plotly_chart(fig_ewm, use_container_width=True)
+        
+        latest = current_form(form)
+        current_df = pd.DataFrame({
+            'Player': latest.index,
+            f'Last {FORM_WINDOW}': latest[f'{stat}_rolling'].round(2).values,
+            'Weighted': latest[f'{stat}_ewm'].round(2).values,
+            'Streak': [f"{'W' if s > 0 else 'L'}{abs(s)}" for s in latest['streak']],
+        })
+        st.dataframe(current_df, use_container_width=True, hide_index=True)
+
+
+def render_comparison(result_filter, selected_players):
+    # Player Performance Comparison
+    st.header("Player Performance Comparison")
+    
+    # Aggregate player stats with efficiency metrics
+    split = {"All Games": "all", "Wins Only": "wins", "Losses Only": "losses"}[result_filter]
+    player_stats = load_player_stats(split, tuple(selected_players))
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Offensive Stats")
+        st.dataframe(
+            player_stats[['Games', 'Goals', 'Goals/Game', 'Assists', 'Pass%', 'Pass Attempts/Game', 'Points', 'Points/Game', 
+                          'Shots', 'Shots/Game', 'Shot%']], 
+            use_container_width=True
+        )
+    
+    with col2:
+        st.subheader("Defensive and Advanced Analytics")
+        st.dataframe(
+            player_stats[['Games', 'Avg T.O.P (min)', 'Avg WAR', 'Avg TO%', 'Avg TD%', 'Avg Efficiency', 
+                          'Giveaways/Min', 'Takeaways', 'Takeaways/Game', 'Ints', 'Ints/Game', 'Hits/Game']], 
+            use_container_width=True
+        )
+    
+    # Player comparison charts
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        fig_war = px.bar(
+            player_stats.reset_index(),
+            x='player_name',
+            y='Avg WAR',
+            title='Average WAR by Player',
+            labels={'player_name': 'Player', 'Avg WAR': 'WAR (%)'},
+            color='Avg WAR',
+            color_continuous_scale='RdYlGn'
+        )
+        fig_war.update_layout(showlegend=False)
+        st.plotly_chart(fig_war, use_container_width=True)
+    
+    with col2:
+        # Offense vs Defense scatter
+        fig_scatter = px.scatter(
+            player_stats.reset_index(),
+            x='Avg TO%',
+            y='Avg TD%',
+            size='Avg WAR',
+            color='Avg WAR',
+            text='player_name',
+            title='Offensive vs Defensive Contribution',
+            labels={'Avg TO%': 'Total Offense %', 'Avg TD%': 'Total Defense %'},
+            color_continuous_scale='RdYlGn'
+        )
+        fig_scatter.update_traces(textposition='top center')
+        fig_scatter.update_layout(showlegend=False)
+        st.plotly_chart(fig_scatter, use_container_width=True)
+    
+    with col3:
+        fig_give = px.bar(
+            player_stats.reset_index(),
+            x='player_name',
+            y='Giveaways/Min',
+            title='Giveaways per Minute of Possession',
+            labels={'player_name': 'Player', 'Giveaways/Min': 'Giveaways/Min'},
+            color='Giveaways/Min',
+            color_continuous_scale='RdYlGn_r'
+        )
+        fig_give.update_layout(showlegend=False)
+        st.plotly_chart(fig_give, use_container_width=True)
+
+
+# The lineup controls only rerun this fragment
+@st.fragment
+def render_best_lineups():
+    # Best Lineups
+    st.header("Best Lineups")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        size = st.selectbox("Players", ["Any", 2, 3, 4, 5, 6], key='lineup_size')
+    with col2:
+        min_games = st.selectbox("Minimum games together", [1, 3, 5, 10, 20], index=1, key='lineup_min_games')
+    with col3:
+        sort_label = st.selectbox("Rank by", ["Win %", "Goal Diff/Game", "Avg WAR"], key='lineup_sort')
+    
+    with timed_section('Best lineups'):
+        sort_by = {"Win %": 'win_pct', "Goal Diff/Game": 'goal_diff_per_game', "Avg WAR": 'avg_war'}[sort_label]
+        lineups = best_lineups(load_lineups(), None if size == "Any" else size, min_games, sort_by)
+        
+        if lineups.empty:
+            st.info("No lineup has played that many games together yet")
+            return
+        
+        lineups_df = lineups[['lineup', 'games', 'wins', 'losses', 'win_pct', 'goal_diff_per_game', 'avg_war',
+                              'exact_games', 'exact_win_pct']].copy()
+        lineups_df.columns = ['Lineup', 'Games', 'W', 'L', 'Win%', 'Goal Diff/Game', 'Avg WAR',
+                              'Exact Lineup Games', 'Exact Lineup Win%']
+        st.dataframe(lineups_df, use_container_width=True, hide_index=True)
+
+
+# The split selector only reruns this fragment
+@st.fragment
+def render_build_splits(selected_players):
+    # Performance by position / player class
+    st.header("Performance by Build")
+    
+    split_label = st.radio("Split by", ["Position", "Player Class"], horizontal=True, key='build_split')
+    
+    with timed_section('Performance by build'):
+        split_type = {"Position": 'position', "Player Class": 'player_class'}[split_label]
+        splits = load_player_splits()
+        splits = splits[(splits['split_type'] == split_type) & splits['player_name'].isin(selected_players)].copy()
+        
+        if splits.empty:
+            st.info("No games recorded for the selected players")
+            return
+        
+        if split_type == 'position':
+            splits['split_value'] = splits['split_value'].map(position_label)
+        else:
+            splits['split_value'] = 'Class ' + splits['split_value']
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            splits_df = splits[['player_name', 'split_value', 'games', 'win_pct', 'points_per_game', 'goals_per_game',
+                                'war', 'total_offense', 'total_defense']].copy()
+            splits_df.columns = ['Player', split_label, 'Games', 'Win%', 'Points/Game', 'Goals/Game', 'Avg WAR',
+                                 'Avg TO%', 'Avg TD%']
+            st.dataframe(splits_df, use_container_width=True, hide_index=True)
+        
+        with col2:
+            fig_splits = px.bar(
+                splits,
+                x='player_name',
+                y='war',
+                color='split_value',
+                barmode='group',
+                title=f'Average WAR by {split_label}',
+                labels={'player_name': 'Player', 'war': 'WAR (%)', 'split_value': split_label}
+            )
+            st.plotly_chart(fig_splits, use_container_width=True)
+
+
+def render_player_wins_losses():
+    # Player Performance in Wins vs Losses
+    st.header("Player Performance: Wins vs Losses")
+    
+    if load_team_split_metrics() is not None:
+        comparison_df = player_win_loss_comparison(load_player_aggregates())
+        
+        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("Need both wins and losses to show player comparison")
 
-st.markdown("---")
 
-# Individual Player Details
-st.header("Individual Player Performance")
-
-selected_player_detail = st.selectbox("Select Player for Detailed View", df['player_name'].unique())
-
-player_df = df[df['player_name'] == selected_player_detail].sort_values('game_date')
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader(f"{selected_player_detail} - Game by Game")
-    player_game_log = player_df[[
-        'game_date', 'goals', 'assists', 'points', 'score', 'opponent_score', 'result',
-        'plus_minus', 'shots', 'pass_pct', 'giveaways', 'war', 'efficiency'
-    ]].copy()
-    player_game_log['game_date'] = player_game_log['game_date'].dt.strftime('%Y-%m-%d')
-    player_game_log['result'] = player_game_log.apply(lambda row: get_result_emoji(row['score'], row['opponent_score']), axis=1)
-    player_game_log.columns = ['Date', 'G', 'A', 'P', 'Score', 'Op Score', 'Result', '+/-', 'Shots', 'Pass%', 'Gives', 'WAR%', 'Eff%']
-    st.dataframe(player_game_log, use_container_width=True, hide_index=True)
-
-with col2:
-    st.subheader(f"{selected_player_detail} - Season Totals")
-    
-    totals = {
-        'Games Played': str(len(player_df)),
-        'Goals': str(int(player_df['goals'].sum())),
-        'Assists': str(int(player_df['assists'].sum())),
-        'Points': str(int(player_df['points'].sum())),
-        'Points/Game': f"{player_df['points'].mean():.2f}",
-        'Plus/Minus': str(int(player_df['plus_minus'].sum())),
-        'Avg WAR': f"{player_df['war'].mean():.1f}%",
-        'Avg TO%': f"{player_df['total_offense'].mean():.1f}%",
-        'Avg TD%': f"{player_df['total_defense'].mean():.1f}%",
-        'Avg Efficiency': f"{player_df['efficiency'].mean():.1f}%",
-        'Shot%': f"{player_df['shot_pct'].mean():.1f}%",
-        'Pass%': f"{player_df['pass_pct'].mean():.1f}%",
-        'Total Shots': str(int(player_df['shots'].sum())),
-        'Total Hits': str(int(player_df['hits'].sum())),
-        'Takeaways': str(int(player_df['takeaways'].sum())),
-        'Giveaways': str(int(player_df['giveaways'].sum())),
-        'Giveaways/Min': f"{(player_df['giveaways'].sum() / player_df['possession_minutes'].sum()):.3f}"
-    }
+def render_game_log():
+    # Game Log
+    st.header("Game Log")
     
-    totals_df = pd.DataFrame(list(totals.items()), columns=['Stat', 'Value'])
-    st.dataframe(totals_df, use_container_width=True, hide_index=True)
-
-# Performance metrics chart for selected player
-fig_player = go.Figure()
-
-# Color markers by win/loss
-player_colors = ['green' if r == 1 else 'red' if r == 2 else 'orange' for r in player_df['result']]
-
-fig_player.add_trace(go.Scatter(
-    x=player_df['game_date'],
-    y=player_df['points'],
-    mode='lines+markers',
-    name='Points',
-    line=dict(color='blue', width=2),
-    marker=dict(size=10, color=player_colors, line=dict(width=2, color='white'))
-))
-
-fig_player.add_trace(go.Scatter(
-    x=player_df['game_date'],
-    y=player_df['war'],
-    mode='lines+markers',
-    name='WAR %',
-    yaxis='y2',
-    line=dict(color='green', width=2),
-    marker=dict(size=10, color=player_colors, line=dict(width=2, color='white'))
-))
-
-fig_player.update_layout(
-    title=f'{selected_player_detail} - Points & WAR Over Time (Green=Win, Red=Loss)',
-    xaxis_title='Game Date',
-    yaxis_title='Points',
-    yaxis2=dict(
-        title='WAR %',
-        overlaying='y',
-        side='right'
-    ),
-    hovermode='x unified'
-)
+    st.dataframe(load_game_log(), use_container_width=True, hide_index=True)
 
-st.plotly_chart(fig_player, use_container_width=True)
 
-st.markdown("---")
+# The player selectbox only reruns this fragment
+@st.fragment
+def render_player_detail():
+    # Individual Player Details
+    st.header("Individual Player Performance")
+    
+    selected_player_detail = st.selectbox("Select Player for Detailed View", df['player_name'].unique())
+    
+    with timed_section('Player detail'):
+        player_df = load_player_game_log(selected_player_detail)
+        player_aggregates = load_player_aggregates()
+        player_totals = player_aggregates[
+            (player_aggregates['player_name'] == selected_player_detail) & (player_aggregates['split'] == 'all')
+        ].iloc[0]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader(f"{selected_player_detail} - Game by Game")
+            player_game_log = player_df[[
+                'game_date', 'goals', 'assists', 'points', 'score', 'opponent_score', 'outcome',
+                'plus_minus', 'shots', 'pass_pct', 'giveaways', 'war', 'efficiency'
+            ]].copy()
+            player_game_log['game_date'] = player_game_log['game_date'].dt.strftime('%Y-%m-%d')
+            player_game_log.columns = ['Date', 'G', 'A', 'P', 'Score', 'Op Score', 'Result', '+/-', 'Shots', 'Pass%', 'Gives', 'WAR%', 'Eff%']
+            st.dataframe(player_game_log, use_container_width=True, hide_index=True)
+        
+        with col2:
+            st.subheader(f"{selected_player_detail} - Season Totals")
+            
+            totals = season_totals(player_totals)
+            
+            totals_df = pd.DataFrame(list(totals.items()), columns=['Stat', 'Value'])
+            st.dataframe(totals_df, use_container_width=True, hide_index=True)
+        
+        # Performance metrics chart for selected player
+        fig_player = go.Figure()
+        
+        # Color markers by outcome
+        player_colors = outcome_colors(player_df['outcome'])
+        
+        fig_player.add_trace(go.Scatter(
+            x=player_df['game_date'],
+            y=player_df['points'],
+            mode='lines+markers',
+            name='Points',
+            line=dict(color='blue', width=2),
+            marker=dict(size=10, color=player_colors, line=dict(width=2, color='white'))
+        ))
+        
+        fig_player.add_trace(go.Scatter(
+            x=player_df['game_date'],
+            y=player_df['war'],
+            mode='lines+markers',
+            name='WAR %',
+            yaxis='y2',
+            line=dict(color='green', width=2),
+            marker=dict(size=10, color=player_colors, line=dict(width=2, color='white'))
+        ))
+        
+        fig_player.update_layout(
+            title=f'{selected_player_detail} - Points & WAR Over Time (Green=Win, Red=Loss, Orange=OT Loss)',
+            xaxis_title='Game Date',
+            yaxis_title='Points',
+            yaxis2=dict(
+                title='WAR %',
+                overlaying='y',
+                side='right'
+            ),
+            hovermode='x unified'
+        )
+        
+        st.plotly_chart(fig_player, use_container_width=True)
 
-# Heat Maps Section (replaces your current heat map section)
-st.header("The Danger Zones")
 
-# Load shot location data
-@st.cache_data
-def load_shot_data():
-    try:
-        return pd.read_csv('data/processed/shot_locations.csv')
-    except:
-        return pd.DataFrame()
+# The heat map selectbox only reruns this fragment
+@st.fragment
+def render_danger_zones():
+    # Heat Maps Section (replaces your current heat map section)
+    st.header("The Danger Zones")
+    
+    # Load shot location data
+    shot_df = load_shot_data()
+    
+    if not shot_df.empty:
+        selected_heatmap_player = st.selectbox(
+            "Select Player for Heat Map", 
+            shot_df['player_name'].unique(), 
+            key='heatmap'
+        )
+    
+        render_heatmap(shot_df, selected_heatmap_player)
+    else:
+        st.info("⚠️ Run the pipeline to generate shot location data: `python scrapers/heatmap_scraper.py`")
 
-shot_df = load_shot_data()
 
-if not shot_df.empty:
-    selected_heatmap_player = st.selectbox(
-        "Select Player for Heat Map", 
-        shot_df['player_name'].unique(), 
-        key='heatmap'
-    )
+def render_heatmap(shot_df, selected_heatmap_player):
+    with timed_section('Danger zones'):
+        player_shot_data = shot_df[shot_df['player_name'] == selected_heatmap_player].iloc[0]
+        games_played = int(player_shot_data['games_played'])
     
-    player_shot_data = shot_df[shot_df['player_name'] == selected_heatmap_player].iloc[0]
-    games_played = int(player_shot_data['games_played'])
+        # Show games played context
+        st.info(f"📊 Based on {games_played} career games played")
     
-    # Show games played context
-    st.info(f"📊 Based on {games_played} career games played")
+        # Define danger zones
+        HIGH_DANGER = [4, 7]
+        MID_DANGER = [5, 6, 9, 10, 11]
+        LOW_DANGER = [1, 2, 3, 8, 12, 13, 14, 15, 16]
     
-    # Define danger zones
-    HIGH_DANGER = [4, 7]
-    MID_DANGER = [5, 6, 9, 10, 11]
-    LOW_DANGER = [1, 2, 3, 8, 12, 13, 14, 15, 16]
+        # Create tabs
+        tab1, tab2 = st.tabs(["Career Totals", "Per Game Average"])
     
-    # Create tabs
-    tab1, tab2 = st.tabs(["Career Totals", "Per Game Average"])
-    
-    with tab1:
+        with tab1:
 
-        title_col1, title_col2 = st.columns([0.9, 1.0])
-        with title_col1:
-            st.subheader(f"{selected_heatmap_player} - Career Shot Analysis")
+            title_col1, title_col2 = st.columns([0.9, 1.0])
+            with title_col1:
+                st.subheader(f"{selected_heatmap_player} - Career Shot Analysis")
 
-        with title_col2:
-            st.subheader("Shooting Efficiency by Zone")
+            with title_col2:
+                st.subheader("Shooting Efficiency by Zone")
         
-        # Calculate totals
-        total_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in range(1, 17))
-        total_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in range(1, 17))
+            # Calculate totals
+            total_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in range(1, 17))
+            total_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in range(1, 17))
         
-        high_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in HIGH_DANGER)
-        mid_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in MID_DANGER)
-        low_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in LOW_DANGER)
+            high_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in HIGH_DANGER)
+            mid_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in MID_DANGER)
+            low_shots = sum(player_shot_data[f'shots_zone_{z}'] for z in LOW_DANGER)
         
-        high_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in HIGH_DANGER)
-        mid_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in MID_DANGER)
-        low_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in LOW_DANGER)
+            high_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in HIGH_DANGER)
+            mid_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in MID_DANGER)
+            low_goals = sum(player_shot_data[f'goals_zone_{z}'] for z in LOW_DANGER)
         
-        high_pct = (high_shots / total_shots * 100) if total_shots > 0 else 0
-        mid_pct = (mid_shots / total_shots * 100) if total_shots > 0 else 0
-        low_pct = (low_shots / total_shots * 100) if total_shots > 0 else 0
+            high_pct = (high_shots / total_shots * 100) if total_shots > 0 else 0
+            mid_pct = (mid_shots / total_shots * 100) if total_shots > 0 else 0
+            low_pct = (low_shots / total_shots * 100) if total_shots > 0 else 0
         
-        col1, col2 = st.columns([.9, 1.0])
+            col1, col2 = st.columns([.9, 1.0])
         
-        with col1:
-            # Left side - Danger level breakdown
-            subcol1, subcol2, subcol3, subcol4 = st.columns([1.5, 1, 0.6, 1])
+            with col1:
+                # Left side - Danger level breakdown
+                subcol1, subcol2, subcol3, subcol4 = st.columns([1.5, 1, 0.6, 1])
             
-            with subcol1:
-                st.markdown(f"""
-                <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px;'>
-                    <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>CHANCES</div>
-                    <div style='text-align: center; font-size: 72px; margin-top: -10px;'>{int(total_shots)}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                with subcol1:
+                    st.markdown(f"""
+                    <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px;'>
+                        <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>CHANCES</div>
+                        <div style='text-align: center; font-size: 72px; margin-top: -10px;'>{int(total_shots)}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px; margin-top: 20px;'>
-                    <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>GOALS SCORED</div>
-                    <div style='text-align: center; font-size: 48px; color: #8B0000; margin-top: -10px;'>{int(total_goals)}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px; margin-top: 20px;'>
+                        <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>GOALS SCORED</div>
+                        <div style='text-align: center; font-size: 48px; color: #8B0000; margin-top: -10px;'>{int(total_goals)}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with subcol2:
-                st.markdown(f"""
-                <div style='background-color: #2d5016; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>HIGH %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(high_shots)}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(high_goals/high_shots*100) if high_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                with subcol2:
+                    st.markdown(f"""
+                    <div style='background-color: #2d5016; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>HIGH %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(high_shots)}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(high_goals/high_shots*100) if high_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='background-color: #5a5a2d; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>MID %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(mid_shots)}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(mid_goals/mid_shots*100) if mid_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='background-color: #5a5a2d; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>MID %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(mid_shots)}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(mid_goals/mid_shots*100) if mid_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='background-color: #5a1616; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>LOW %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(low_shots)}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(low_goals/low_shots*100) if low_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='background-color: #5a1616; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>LOW %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{int(low_shots)}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(low_goals/low_shots*100) if low_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with subcol3:
-                st.markdown(f"""
-                <div style='height: 140px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{int(high_goals)}</div>
+                with subcol3:
+                    st.markdown(f"""
+                    <div style='height: 140px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{int(high_goals)}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='height: 170px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{int(mid_goals)}</div>
+                    st.markdown(f"""
+                    <div style='height: 170px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{int(mid_goals)}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='height: 180px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{int(low_goals)}</div>
+                    st.markdown(f"""
+                    <div style='height: 180px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{int(low_goals)}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
             
-            with subcol4:
-                # Pie chart
-                fig_pie = go.Figure(data=[go.Pie(
-                    labels=['High Danger', 'Mid Danger', 'Low Danger'],
-                    values=[high_shots, mid_shots, low_shots],
-                    marker=dict(colors=['#00ff00', '#ffff00', '#ff0000']),
-                    hole=0,
-                    textinfo='none',
-                    showlegend=False
-                )])
-                fig_pie.update_layout(
-                    height=300,
-                    margin=dict(l=0, r=0, t=0, b=0)
-                )
-                st.plotly_chart(fig_pie, use_container_width=True, key='pie_career')
+                with subcol4:
+                    # Pie chart
+                    fig_pie = go.Figure(data=[go.Pie(
+                        labels=['High Danger', 'Mid Danger', 'Low Danger'],
+                        values=[high_shots, mid_shots, low_shots],
+                        marker=dict(colors=['#00ff00', '#ffff00', '#ff0000']),
+                        hole=0,
+                        textinfo='none',
+                        showlegend=False
+                    )])
+                    fig_pie.update_layout(
+                        height=300,
+                        margin=dict(l=0, r=0, t=0, b=0)
+                    )
+                    st.plotly_chart(fig_pie, use_container_width=True, key='pie_career')
         
-        with col2:
-            # Right side - Rink layout with colored text overlay
-            # Load the rink image
-            try:
-                rink_img = Image.open('data/assets/rink_layout.png')
-            except:
-                st.error("Rink layout image not found. Please add rink_layout.png to data/assets/")
-                rink_img = None
+            with col2:
+                # Right side - Rink layout with colored text overlay
+                # Load the rink image
+                try:
+                    rink_img = Image.open('data/assets/rink_layout.png')
+                except:
+                    st.error("Rink layout image not found. Please add rink_layout.png to data/assets/")
+                    rink_img = None
             
-            if rink_img is not None:
-                # Create figure
-                fig, ax = plt.subplots(1, 1, figsize=(7, 8))
-                ax.imshow(rink_img, extent=[0, 100, 0, 120], aspect='auto')
-                ax.set_xlim(0, 100)
-                ax.set_ylim(0, 120)
-                ax.axis('off')
+                if rink_img is not None:
+                    # Create figure
+                    fig, ax = plt.subplots(1, 1, figsize=(7, 8))
+                    ax.imshow(rink_img, extent=[0, 100, 0, 120], aspect='auto')
+                    ax.set_xlim(0, 100)
+                    ax.set_ylim(0, 120)
+                    ax.axis('off')
                 
-                # Function to get text color based on efficiency
-                def get_text_color(efficiency):
-                    if efficiency >= 20:
-                        return '#00AA00'  # Green
-                    elif efficiency >= 10:
-                        return '#CCAA00'  # Yellow/Gold
-                    else:
-                        return '#CC0000'  # Red
+                    # Function to get text color based on efficiency
+                    def get_text_color(efficiency):
+                        if efficiency >= 20:
+                            return '#00AA00'  # Green
+                        elif efficiency >= 10:
+                            return '#CCAA00'  # Yellow/Gold
+                        else:
+                            return '#CC0000'  # Red
                 
-                # Define zone text positions (x, y coordinates)
-                zone_positions = {
-                    1: (17, 108),    # Behind net left
-                    2: (50, 108),    # Behind net center
-                    3: (83, 108),    # Behind net right
-                    4: (50, 97),     # Crease
-                    5: (28, 90),     # High slot left wing
-                    6: (72, 90),     # High slot right wing
-                    7: (50, 80),     # Prime slot (zone 7 - the hot zone)
-                    8: (7, 63),     # Left wing wide
-                    9: (30, 55),     # Left circle
-                    10: (50, 50),    # Center slot
-                    11: (70, 55),    # Right circle
-                    12: (92, 63),    # Right wing wide
-                    13: (20, 41),    # Left point
-                    14: (50, 38),    # Center point
-                    15: (80, 41),    # Right point
-                    16: (50, 12)     # Neutral zone
-                }
+                    # Define zone text positions (x, y coordinates)
+                    zone_positions = {
+                        1: (17, 108),    # Behind net left
+                        2: (50, 108),    # Behind net center
+                        3: (83, 108),    # Behind net right
+                        4: (50, 97),     # Crease
+                        5: (28, 90),     # High slot left wing
+                        6: (72, 90),     # High slot right wing
+                        7: (50, 80),     # Prime slot (zone 7 - the hot zone)
+                        8: (7, 63),     # Left wing wide
+                        9: (30, 55),     # Left circle
+                        10: (50, 50),    # Center slot
+                        11: (70, 55),    # Right circle
+                        12: (92, 63),    # Right wing wide
+                        13: (20, 41),    # Left point
+                        14: (50, 38),    # Center point
+                        15: (80, 41),    # Right point
+                        16: (50, 12)     # Neutral zone
+                    }
                 
-                # Add text for each zone
-                for zone_num, (x, y) in zone_positions.items():
-                    goals = player_shot_data[f'goals_zone_{zone_num}']
-                    shots = player_shot_data[f'shots_zone_{zone_num}']
+                    # Add text for each zone
+                    for zone_num, (x, y) in zone_positions.items():
+                        goals = player_shot_data[f'goals_zone_{zone_num}']
+                        shots = player_shot_data[f'shots_zone_{zone_num}']
                     
-                    if shots > 0:
-                        efficiency = (goals / shots) * 100
-                    else:
-                        efficiency = 0
+                        if shots > 0:
+                            efficiency = (goals / shots) * 100
+                        else:
+                            efficiency = 0
                     
-                    color = get_text_color(efficiency)
+                        color = get_text_color(efficiency)
                     
-                    # Add text with efficiency percentage and goals/shots
-                    ax.text(x, y, f"{efficiency:.1f}%\n{int(goals)}/{int(shots)}", 
-                        ha='center', va='center', 
-                        fontsize=11, 
-                        weight='bold',
-                        color=color,
-                        bbox=dict(boxstyle='round,pad=0.5', 
-                                    facecolor='white', 
-                                    edgecolor='black',
-                                    linewidth=1.5,
-                                    alpha=0.9))
+                        # Add text with efficiency percentage and goals/shots
+                        ax.text(x, y, f"{efficiency:.1f}%\n{int(goals)}/{int(shots)}", 
+                            ha='center', va='center', 
+                            fontsize=11, 
+                            weight='bold',
+                            color=color,
+                            bbox=dict(boxstyle='round,pad=0.5', 
+                                        facecolor='white', 
+                                        edgecolor='black',
+                                        linewidth=1.5,
+                                        alpha=0.9))
                 
-                plt.tight_layout()
-                st.pyplot(fig, use_container_width=True)
-                plt.close(fig)
+                    plt.tight_layout()
+                    st.pyplot(fig, use_container_width=True)
+                    plt.close(fig)
                 
-                # Legend
-                col_a, col_b, col_c = st.columns(3)
-                with col_a:
-                    st.markdown("🟢 **Green:** >20% (Excellent)")
-                with col_b:
-                    st.markdown("🟡 **Yellow:** 10-20% (Average)")
-                with col_c:
-                    st.markdown("🔴 **Red:** <10% (Poor)")
-            else:
-                st.warning("Please add the rink layout image to display zone efficiency")
+                    # Legend
+                    col_a, col_b, col_c = st.columns(3)
+                    with col_a:
+                        st.markdown("🟢 **Green:** >20% (Excellent)")
+                    with col_b:
+                        st.markdown("🟡 **Yellow:** 10-20% (Average)")
+                    with col_c:
+                        st.markdown("🔴 **Red:** <10% (Poor)")
+                else:
+                    st.warning("Please add the rink layout image to display zone efficiency")
     
-    with tab2:
+        with tab2:
         
-        title_col1, title_col2 = st.columns([0.9, 1.0])
-        with title_col1:
-            st.subheader(f"{selected_heatmap_player} - Career Shot Analysis")
+            title_col1, title_col2 = st.columns([0.9, 1.0])
+            with title_col1:
+                st.subheader(f"{selected_heatmap_player} - Career Shot Analysis")
 
-        with title_col2:
-            st.subheader("Shooting Efficiency by Zone")
+            with title_col2:
+                st.subheader("Shooting Efficiency by Zone")
         
-        # Calculate per-game averages
-        total_shots_pg = total_shots / games_played
-        total_goals_pg = total_goals / games_played
+            # Calculate per-game averages
+            total_shots_pg = total_shots / games_played
+            total_goals_pg = total_goals / games_played
         
-        high_shots_pg = high_shots / games_played
-        mid_shots_pg = mid_shots / games_played
-        low_shots_pg = low_shots / games_played
+            high_shots_pg = high_shots / games_played
+            mid_shots_pg = mid_shots / games_played
+            low_shots_pg = low_shots / games_played
         
-        high_goals_pg = high_goals / games_played
-        mid_goals_pg = mid_goals / games_played
-        low_goals_pg = low_goals / games_played
+            high_goals_pg = high_goals / games_played
+            mid_goals_pg = mid_goals / games_played
+            low_goals_pg = low_goals / games_played
         
-        col1, col2 = st.columns([.9, 1.0])
+            col1, col2 = st.columns([.9, 1.0])
         
-        with col1:
-            # Left side - Danger level breakdown (per game)
-            subcol1, subcol2, subcol3, subcol4 = st.columns([1.5, 1, 0.6, 1])
+            with col1:
+                # Left side - Danger level breakdown (per game)
+                subcol1, subcol2, subcol3, subcol4 = st.columns([1.5, 1, 0.6, 1])
             
-            with subcol1:
-                st.markdown(f"""
-                <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px;'>
-                    <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>CHANCES</div>
-                    <div style='text-align: center; font-size: 72px; margin-top: -10px;'>{total_shots_pg:.1f}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                with subcol1:
+                    st.markdown(f"""
+                    <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px;'>
+                        <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>CHANCES</div>
+                        <div style='text-align: center; font-size: 72px; margin-top: -10px;'>{total_shots_pg:.1f}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px; margin-top: 20px;'>
-                    <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>GOALS SCORED</div>
-                    <div style='text-align: center; font-size: 48px; color: #8B0000; margin-top: -10px;'>{total_goals_pg:.2f}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='border: 2px solid #444; padding: 20px; margin: 5px; border-radius: 5px; margin-top: 20px;'>
+                        <div style='font-weight: bold; font-size: 18px; margin-bottom: 10px;'>GOALS SCORED</div>
+                        <div style='text-align: center; font-size: 48px; color: #8B0000; margin-top: -10px;'>{total_goals_pg:.2f}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with subcol2:
-                st.markdown(f"""
-                <div style='background-color: #2d5016; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>HIGH %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{high_shots_pg:.1f}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(high_goals/high_shots*100) if high_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                with subcol2:
+                    st.markdown(f"""
+                    <div style='background-color: #2d5016; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>HIGH %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{high_shots_pg:.1f}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(high_goals/high_shots*100) if high_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='background-color: #5a5a2d; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>MID %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{mid_shots_pg:.1f}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(mid_goals/mid_shots*100) if mid_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='background-color: #5a5a2d; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>MID %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{mid_shots_pg:.1f}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(mid_goals/mid_shots*100) if mid_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='background-color: #5a1616; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
-                    <div style='color: white; font-weight: bold; margin-bottom: 5px;'>LOW %</div>
-                    <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{low_shots_pg:.1f}</div>
-                    <div style='color: #ccc; font-size: 11px;'>CONV %</div>
-                    <div style='color: white; font-size: 16px;'>{(low_goals/low_shots*100) if low_shots > 0 else 0:.1f}%</div>
-                </div>
-                """, unsafe_allow_html=True)
+                    st.markdown(f"""
+                    <div style='background-color: #5a1616; padding: 15px 10px; margin: 5px; border-radius: 5px;'>
+                        <div style='color: white; font-weight: bold; margin-bottom: 5px;'>LOW %</div>
+                        <div style='color: white; font-size: 32px; margin-bottom: 8px;'>{low_shots_pg:.1f}</div>
+                        <div style='color: #ccc; font-size: 11px;'>CONV %</div>
+                        <div style='color: white; font-size: 16px;'>{(low_goals/low_shots*100) if low_shots > 0 else 0:.1f}%</div>
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            with subcol3:
-                st.markdown(f"""
-                <div style='height: 140px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{high_goals_pg:.2f}</div>
+                with subcol3:
+                    st.markdown(f"""
+                    <div style='height: 140px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{high_goals_pg:.2f}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='height: 170px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{mid_goals_pg:.2f}</div>
+                    st.markdown(f"""
+                    <div style='height: 170px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{mid_goals_pg:.2f}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
                 
-                st.markdown(f"""
-                <div style='height: 180px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
-                    <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
-                        <div style='color: white; font-weight: bold;'>GOALS</div>
-                        <div style='color: white; font-size: 32px;'>{low_goals_pg:.2f}</div>
+                    st.markdown(f"""
+                    <div style='height: 180px; display: flex; align-items: center; justify-content: center; margin: 5px;'>
+                        <div style='background-color: #1a1a1a; padding: 10px; border-radius: 5px;'>
+                            <div style='color: white; font-weight: bold;'>GOALS</div>
+                            <div style='color: white; font-size: 32px;'>{low_goals_pg:.2f}</div>
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
                         
-            with subcol4:
-                # Pie chart (same distribution, just different scale)
-                fig_pie_pg = go.Figure(data=[go.Pie(
-                    labels=['High Danger', 'Mid Danger', 'Low Danger'],
-                    values=[high_shots, mid_shots, low_shots],
-                    marker=dict(colors=['#00ff00', '#ffff00', '#ff0000']),
-                    hole=0,
-                    textinfo='none',
-                    showlegend=False
-                )])
-                fig_pie_pg.update_layout(
-                    height=300,
-                    margin=dict(l=0, r=0, t=0, b=0)
-                )
-                st.plotly_chart(fig_pie_pg, use_container_width=True, key='pie_pergame')
+                with subcol4:
+                    # Pie chart (same distribution, just different scale)
+                    fig_pie_pg = go.Figure(data=[go.Pie(
+                        labels=['High Danger', 'Mid Danger', 'Low Danger'],
+                        values=[high_shots, mid_shots, low_shots],
+                        marker=dict(colors=['#00ff00', '#ffff00', '#ff0000']),
+                        hole=0,
+                        textinfo='none',
+                        showlegend=False
+                    )])
+                    fig_pie_pg.update_layout(
+                        height=300,
+                        margin=dict(l=0, r=0, t=0, b=0)
+                    )
+                    st.plotly_chart(fig_pie_pg, use_container_width=True, key='pie_pergame')
         
-        with col2:
-            # Right side - Rink layout with colored text overlay            
-            # Load the rink image
-            try:
-                rink_img = Image.open('data/assets/rink_layout.png')
-            except:
-                st.error("Rink layout image not found. Please add rink_layout.png to data/assets/")
-                rink_img = None
+            with col2:
+                # Right side - Rink layout with colored text overlay            
+                # Load the rink image
+                try:
+                    rink_img = Image.open('data/assets/rink_layout.png')
+                except:
+                    st.error("Rink layout image not found. Please add rink_layout.png to data/assets/")
+                    rink_img = None
             
-            if rink_img is not None:
-                # Create figure
-                fig, ax = plt.subplots(1, 1, figsize=(7, 8))
-                ax.imshow(rink_img, extent=[0, 100, 0, 120], aspect='auto')
-                ax.set_xlim(0, 100)
-                ax.set_ylim(0, 120)
-                ax.axis('off')
+                if rink_img is not None:
+                    # Create figure
+                    fig, ax = plt.subplots(1, 1, figsize=(7, 8))
+                    ax.imshow(rink_img, extent=[0, 100, 0, 120], aspect='auto')
+                    ax.set_xlim(0, 100)
+                    ax.set_ylim(0, 120)
+                    ax.axis('off')
                 
-                # Function to get text color based on efficiency
-                def get_text_color(efficiency):
-                    if efficiency >= 20:
-                        return '#00AA00'  # Green
-                    elif efficiency >= 10:
-                        return '#CCAA00'  # Yellow/Gold
-                    else:
-                        return '#CC0000'  # Red
+                    # Function to get text color based on efficiency
+                    def get_text_color(efficiency):
+                        if efficiency >= 20:
+                            return '#00AA00'  # Green
+                        elif efficiency >= 10:
+                            return '#CCAA00'  # Yellow/Gold
+                        else:
+                            return '#CC0000'  # Red
                 
-                # Define zone text positions (x, y coordinates
-                zone_positions = {
-                    1: (17, 108),    # Behind net left
-                    2: (50, 108),    # Behind net center
-                    3: (83, 108),    # Behind net right
-                    4: (50, 97),     # Crease
-                    5: (28, 90),     # High slot left wing
-                    6: (72, 90),     # High slot right wing
-                    7: (50, 80),     # Prime slot (zone 7 - the hot zone)
-                    8: (7, 63),     # Left wing wide
-                    9: (30, 55),     # Left circle
-                    10: (50, 50),    # Center slot
-                    11: (70, 55),    # Right circle
-                    12: (92, 63),    # Right wing wide
-                    13: (20, 41),    # Left point
-                    14: (50, 38),    # Center point
-                    15: (80, 41),    # Right point
-                    16: (50, 12)     # Neutral zone
-                }
+                    # Define zone text positions (x, y coordinates
+                    zone_positions = {
+                        1: (17, 108),    # Behind net left
+                        2: (50, 108),    # Behind net center
+                        3: (83, 108),    # Behind net right
+                        4: (50, 97),     # Crease
+                        5: (28, 90),     # High slot left wing
+                        6: (72, 90),     # High slot right wing
+                        7: (50, 80),     # Prime slot (zone 7 - the hot zone)
+                        8: (7, 63),     # Left wing wide
+                        9: (30, 55),     # Left circle
+                        10: (50, 50),    # Center slot
+                        11: (70, 55),    # Right circle
+                        12: (92, 63),    # Right wing wide
+                        13: (20, 41),    # Left point
+                        14: (50, 38),    # Center point
+                        15: (80, 41),    # Right point
+                        16: (50, 12)     # Neutral zone
+                    }
                 
-                # Add text for each zone
-                for zone_num, (x, y) in zone_positions.items():
-                    goals = player_shot_data[f'goals_zone_{zone_num}']
-                    shots = player_shot_data[f'shots_zone_{zone_num}']
-
-                    # Calculate per-game values
-                    goals_pg = goals / games_played
-                    shots_pg = shots / games_played
+                    # Add text for each zone
+                    for zone_num, (x, y) in zone_positions.items():
+                        goals = player_shot_data[f'goals_zone_{zone_num}']
+                        shots = player_shot_data[f'shots_zone_{zone_num}']
+
+                        # Calculate per-game values
+                        goals_pg = goals / games_played
+                        shots_pg = shots / games_played
                     
-                    if shots > 0:
-                        efficiency = (goals / shots) * 100
-                    else:
-                        efficiency = 0
+                        if shots > 0:
+                            efficiency = (goals / shots) * 100
+                        else:
+                            efficiency = 0
                     
-                    color = get_text_color(efficiency)
+                        color = get_text_color(efficiency)
                     
-                    # Add text with efficiency percentage and goals/shots
-                    ax.text(x, y, f"{efficiency:.1f}%\n{goals_pg:.2f}/{shots_pg:.1f}", 
-                        ha='center', va='center', 
-                        fontsize=11, 
-                        weight='bold',
-                        color=color,
-                        bbox=dict(boxstyle='round,pad=0.5', 
-                                    facecolor='white', 
-                                    edgecolor='black',
-                                    linewidth=1.5,
-                                    alpha=0.9))
+                        # Add text with efficiency percentage and goals/shots
+                        ax.text(x, y, f"{efficiency:.1f}%\n{goals_pg:.2f}/{shots_pg:.1f}", 
+                            ha='center', va='center', 
+                            fontsize=11, 
+                            weight='bold',
+                            color=color,
+                            bbox=dict(boxstyle='round,pad=0.5', 
+                                        facecolor='white', 
+                                        edgecolor='black',
+                                        linewidth=1.5,
+                                        alpha=0.9))
                 
-                plt.tight_layout()
-                st.pyplot(fig, use_container_width=True)
-                plt.close(fig)
+                    plt.tight_layout()
+                    st.pyplot(fig, use_container_width=True)
+                    plt.close(fig)
                 
-                # Legend
-                col_a, col_b, col_c = st.columns(3)
-                with col_a:
-                    st.markdown("🟢 **Green:** >20% (Excellent)")
-                with col_b:
-                    st.markdown("🟡 **Yellow:** 10-20% (Average)")
-                with col_c:
-                    st.markdown("🔴 **Red:** <10% (Poor)")
-            else:
-                st.warning("Please add the rink layout image to display zone efficiency")
-
-else:
-    st.info("⚠️ Run the pipeline to generate shot location data: `python scrapers/heatmap_scraper.py`")
+                    # Legend
+                    col_a, col_b, col_c = st.columns(3)
+                    with col_a:
+                        st.markdown("🟢 **Green:** >20% (Excellent)")
+                    with col_b:
+                        st.markdown("🟡 **Yellow:** 10-20% (Average)")
+                    with col_c:
+                        st.markdown("🔴 **Red:** <10% (Poor)")
+                else:
+                    st.warning("Please add the rink layout image to display zone efficiency")
+
+
+def render_estimated_impact(selected_players):
+    # Model estimates of the advanced stats, available as soon as the API stats are in
+    st.header("Estimated Impact")
+    
+    estimates = load_impact_estimates()
+    if estimates.empty:
+        st.info("Need games with advanced stats to train the impact model")
+        return
+    
+    estimates = estimates[estimates['player_name'].isin(selected_players)]
+    grouped = estimates.groupby('player_name')
+    impact_df = pd.DataFrame({
+        'Games': grouped.size(),
+        'Awaiting Advanced Stats': grouped['war'].apply(lambda s: s.isna().sum()),
+        'Avg WAR': grouped['war'].mean().round(1),
+        'Est. WAR': grouped['est_war'].mean().round(1),
+        'Avg TO%': grouped['total_offense'].mean().round(1),
+        'Est. TO%': grouped['est_total_offense'].mean().round(1),
+        'Avg TD%': grouped['total_defense'].mean().round(1),
+        'Est. TD%': grouped['est_total_defense'].mean().round(1),
+    }).rename_axis('Player').reset_index()
+    st.dataframe(impact_df, use_container_width=True, hide_index=True)
+    st.caption("Estimates come from a ridge regression on the basic API stats, trained on every game with advanced stats")
+
+
+def render_expected_goals():
+    # Expected goals from the shot-location model
+    st.header("Expected Goals")
+    
+    xg = load_expected_goals()
+    if xg.empty:
+        st.info("⚠️ Run the pipeline to generate shot location data: `python scrapers/heatmap_scraper.py`")
+        return
+    
+    comparison = compare_xg(xg)
+    comparison.columns = ['Player', 'Games', 'Goals', 'Shots', 'Model xG', 'ChelStats xG', 'MAE/Game', 'Correlation',
+                          'Goals - Model xG']
+    st.dataframe(comparison, use_container_width=True, hide_index=True)
+    
+    fig_xg = px.scatter(
+        xg.dropna(subset=['scraped_xg']),
+        x='scraped_xg',
+        y='model_xg',
+        color='player_name',
+        title='Model xG vs ChelStats xG per Game',
+        labels={'scraped_xg': 'ChelStats xG', 'model_xg': 'Model xG', 'player_name': 'Player'}
+    )
+    st.plotly_chart(fig_xg, use_container_width=True)
+
+
+# Main header
+st.title("Dutchess Dairyboys - Season Analytics")
+st.markdown(f"*Last updated: {df['scraped_at'].max().strftime('%Y-%m-%d %H:%M')}*")
+
+with timed_section('KPIs'):
+    render_kpis(result_filter, selected_players)
+
+st.markdown("---")
+
+with timed_section('Team wins vs losses'):
+    render_team_wins_losses()
+
+st.markdown("---")
+
+with timed_section('Trends'):
+    render_trends()
+
+st.markdown("---")
+
+render_form(tuple(selected_players))
+
+st.markdown("---")
+
+with timed_section('Player comparison'):
+    render_comparison(result_filter, selected_players)
+
+st.markdown("---")
+
+with timed_section('Estimated impact'):
+    render_estimated_impact(selected_players)
+
+st.markdown("---")
+
+with timed_section('Player wins vs losses'):
+    render_player_wins_losses()
+
+st.markdown("---")
+
+render_best_lineups()
+
+st.markdown("---")
+
+render_build_splits(tuple(selected_players))
+
+st.markdown("---")
+
+with timed_section('Game log'):
+    render_game_log()
+
+st.markdown("---")
+
+render_player_detail()
+
+st.markdown("---")
+
+render_danger_zones()
+
+st.markdown("---")
+
+with timed_section('Expected goals'):
+    render_expected_goals()
 
 st.markdown("---")
 st.caption("Data scraped from ChelStats | Advanced stats calculated by ChelStats analytics engine")
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Materialize per-player season aggregates and game logs
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_MERGED_STATS, DB_PLAYER_AGGREGATES, DB_PLAYER_SPLITS, PLAYER_GAME_LOGS_DIR
+from analytics.aggregations import compute_player_aggregates, compute_player_splits, player_game_logs
+from analytics.categories import read_merged_stats
+from utils.helpers import setup_logging
+from utils.metrics import STEP_SECONDS
+from utils.store import save_table, table_exists
+
+logger = setup_logging(__name__)
+
+
+def build_player_aggregates():
+    """Write all/wins/losses aggregates, position/class splits and one game log per player"""
+    with STEP_SECONDS.time(step='aggregate'):
+        return _build_player_aggregates()
+
+
+def _build_player_aggregates():
+    logger.info("Building player aggregates...")
+    
+    if not table_exists(DB_MERGED_STATS):
+        logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
+        return False
+    
+    df = read_merged_stats(DB_MERGED_STATS)
+    
+    aggregates = compute_player_aggregates(df)
+    save_table(aggregates, DB_PLAYER_AGGREGATES)
+    logger.info(f"Saved {len(aggregates)} aggregate rows to {DB_PLAYER_AGGREGATES}")
+    
+    splits = compute_player_splits(df)
+    save_table(splits, DB_PLAYER_SPLITS)
+    logger.info(f"Saved {len(splits)} position/class split rows to {DB_PLAYER_SPLITS}")
+    
+    logs = player_game_logs(df)
+    for player_name, games in logs.items():
+        save_table(games, PLAYER_GAME_LOGS_DIR / f"{player_name}.csv")
+    logger.info(f"Saved game logs for {len(logs)} players to {PLAYER_GAME_LOGS_DIR}")
+    
+    return True
+
+
+if __name__ == "__main__":
+    build_player_aggregates()
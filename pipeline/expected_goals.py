@@ -0,0 +1,53 @@
+"""
+Model expected goals for every player-game from the shot-location zones
+"""
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_MERGED_STATS, DB_SHOT_LOCATIONS, DB_EXPECTED_GOALS, XG_PRIOR_STRENGTH
+from analytics.categories import read_merged_stats
+from analytics.xg import expected_goals, compare_xg
+from utils.helpers import setup_logging
+from utils.metrics import STEP_SECONDS
+from utils.store import save_table, table_exists
+
+logger = setup_logging(__name__)
+
+
+def build_expected_goals():
+    """Write model xG per player-game and log how it compares with the scraped xG"""
+    with STEP_SECONDS.time(step='expected_goals'):
+        return _build_expected_goals()
+
+
+def _build_expected_goals():
+    logger.info("Building expected goals...")
+    
+    # merged_stats may only exist in memory until the run commits
+    for path in (DB_MERGED_STATS, DB_SHOT_LOCATIONS):
+        if not table_exists(path):
+            logger.error(f"Input file not found: {path}")
+            return False
+    
+    df = read_merged_stats(DB_MERGED_STATS)
+    shot_df = pd.read_csv(DB_SHOT_LOCATIONS)
+    
+    xg = expected_goals(df, shot_df, XG_PRIOR_STRENGTH)
+    save_table(xg, DB_EXPECTED_GOALS)
+    logger.info(f"Saved model xG for {len(xg)} player-games to {DB_EXPECTED_GOALS}")
+    
+    comparison = compare_xg(xg)
+    for row in comparison.itertuples():
+        logger.info(
+            f"{row.player_name}: model xG {row.model_xg:.1f}, scraped xG {row.scraped_xg:.1f}, "
+            f"MAE/game {row.mae_per_game:.2f}, r={row.correlation:.2f}"
+        )
+    
+    return True
+
+
+if __name__ == "__main__":
+    build_expected_goals()
@@ -0,0 +1,47 @@
+"""
+Maintain the rolling / EWM form and streak table
+"""
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_MERGED_STATS, DB_FORM, FORM_WINDOW, FORM_EWM_ALPHA
+from analytics.form import form_inputs, update_form
+from analytics.categories import read_merged_stats
+from utils.helpers import setup_logging
+from utils.metrics import STEP_SECONDS
+from utils.store import save_table, table_exists
+
+logger = setup_logging(__name__)
+
+
+def build_form(rebuild=False):
+    """Append form rows for new games (or rebuild the whole table)"""
+    with STEP_SECONDS.time(step='form'):
+        return _build_form(rebuild)
+
+
+def _build_form(rebuild):
+    logger.info("Updating form table...")
+    
+    if not table_exists(DB_MERGED_STATS):
+        logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
+        return False
+    
+    inputs = form_inputs(read_merged_stats(DB_MERGED_STATS))
+    history = None if rebuild or not DB_FORM.exists() else pd.read_csv(DB_FORM)
+    
+    form, new_rows = update_form(history, inputs, FORM_WINDOW, FORM_EWM_ALPHA)
+    if new_rows == 0:
+        logger.info("Form table is up to date")
+        return True
+    
+    save_table(form, DB_FORM)
+    logger.info(f"Added {new_rows} form rows ({len(form)} total) to {DB_FORM}")
+    return True
+
+
+if __name__ == "__main__":
+    build_form(rebuild='--rebuild' in sys.argv)
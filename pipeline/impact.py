@@ -0,0 +1,70 @@
+"""
+Train the impact model and estimate advanced stats for every player-game
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import (
+    DB_MERGED_STATS, DB_IMPACT_ESTIMATES, IMPACT_MODEL_FILE, IMPACT_ALPHA, IMPACT_BATCH_ROWS
+)
+from analytics.impact import IMPACT_FEATURES, IMPACT_TARGETS, RidgeImpactModel, impact_estimates
+from analytics.categories import read_merged_stats
+from utils.helpers import setup_logging
+from utils.schema import MERGED_SCHEMA, read_table
+from utils.metrics import STEP_SECONDS
+from utils.store import save_table, table_exists
+
+logger = setup_logging(__name__)
+
+
+def load_impact_model():
+    """Stored model, or an empty one if there is none (or its features changed)"""
+    if IMPACT_MODEL_FILE.exists():
+        model = RidgeImpactModel.load(IMPACT_MODEL_FILE)
+        if model.features == IMPACT_FEATURES and model.targets == IMPACT_TARGETS:
+            model.alpha = IMPACT_ALPHA  # Not part of the statistics, so it can change without retraining
+            return model
+        logger.info("Impact model features changed - retraining from scratch")
+    return RidgeImpactModel(alpha=IMPACT_ALPHA)
+
+
+def build_impact_model(rebuild=False):
+    """Fold new games into the model, refit and write estimates"""
+    with STEP_SECONDS.time(step='impact'):
+        return _build_impact_model(rebuild)
+
+
+def _build_impact_model(rebuild):
+    logger.info("Updating impact model...")
+    
+    if not table_exists(DB_MERGED_STATS):
+        logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
+        return False
+    
+    model = RidgeImpactModel(alpha=IMPACT_ALPHA) if rebuild else load_impact_model()
+    
+    # Batched pass over the history; rows from games already in the model are skipped
+    added = 0
+    for batch in read_table(DB_MERGED_STATS, MERGED_SCHEMA, chunksize=IMPACT_BATCH_ROWS):
+        added += model.partial_fit(batch)
+    logger.info(f"Added {added} player-games to the impact model ({model.n} total)")
+    
+    if model.n < 2:
+        logger.warning("Not enough player-games with advanced stats to fit the impact model")
+        return False
+    
+    model.solve()
+    model.save(IMPACT_MODEL_FILE)
+    
+    df = read_merged_stats(DB_MERGED_STATS)
+    save_table(impact_estimates(df, model), DB_IMPACT_ESTIMATES)
+    scores = ', '.join(f"{target} {r2:.2f}" for target, r2 in model.score(df).items())
+    logger.info(f"Saved impact estimates to {DB_IMPACT_ESTIMATES} (R^2: {scores})")
+    
+    return True
+
+
+if __name__ == "__main__":
+    build_impact_model(rebuild='--rebuild' in sys.argv)
@@ -0,0 +1,43 @@
+"""
+Materialize record, goal differential and WAR for every lineup combination
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_MERGED_STATS, DB_LINEUPS, LINEUP_MAX_PLAYERS
+from analytics.lineups import lineup_index, lineup_stats
+from analytics.categories import read_merged_stats
+from utils.helpers import setup_logging
+from utils.metrics import STEP_SECONDS
+from utils.store import save_table, table_exists
+
+logger = setup_logging(__name__)
+
+
+def build_lineups():
+    """Write stats for every 2-6 player combination"""
+    with STEP_SECONDS.time(step='lineups'):
+        return _build_lineups()
+
+
+def _build_lineups():
+    logger.info("Building lineup stats...")
+    
+    if not table_exists(DB_MERGED_STATS):
+        logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
+        return False
+    
+    df = read_merged_stats(DB_MERGED_STATS)
+    
+    roster, games = lineup_index(df, LINEUP_MAX_PLAYERS)
+    stats = lineup_stats(roster, games)
+    save_table(stats, DB_LINEUPS)
+    logger.info(f"Saved {len(stats)} lineup combinations over {len(games)} games to {DB_LINEUPS}")
+    
+    return True
+
+
+if __name__ == "__main__":
+    build_lineups()
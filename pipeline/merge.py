@@ -8,27 +8,38 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from config.config import DB_BASIC_STATS, DB_ADVANCED_STATS, DB_MERGED_STATS
+from analytics.outcomes import add_outcome_columns
+from analytics.validation import has_key
+from pipeline.validate import quarantined_keys
 from utils.helpers import setup_logging
+from utils.schema import BASIC_SCHEMA, ADVANCED_SCHEMA, read_table
+from utils.store import save_table, table_exists
+from utils.metrics import MERGED_RECORDS, STEP_SECONDS
 
 logger = setup_logging(__name__)
 
 
 def merge_stats():
     """Merge basic and advanced stats on match_id + player_name"""
+    with STEP_SECONDS.time(step='merge'):
+        return _merge_stats()
+
+
+def _merge_stats():
     logger.info("Starting merge process...")
     
     # Check if files exist
-    if not DB_BASIC_STATS.exists():
+    if not table_exists(DB_BASIC_STATS):
         logger.error(f"Basic stats file not found: {DB_BASIC_STATS}")
         return False
     
-    if not DB_ADVANCED_STATS.exists():
+    if not table_exists(DB_ADVANCED_STATS):
         logger.error(f"Advanced stats file not found: {DB_ADVANCED_STATS}")
         return False
     
     # Load data
-    df_basic = pd.read_csv(DB_BASIC_STATS)
-    df_advanced = pd.read_csv(DB_ADVANCED_STATS)
+    df_basic = read_table(DB_BASIC_STATS, BASIC_SCHEMA)
+    df_advanced = read_table(DB_ADVANCED_STATS, ADVANCED_SCHEMA)
     
     logger.info(f"Loaded {len(df_basic)} basic stat records")
     logger.info(f"Loaded {len(df_advanced)} advanced stat records")
@@ -44,12 +55,22 @@ def merge_stats():
     
     df_merged = df_merged[df_merged['player_name'].isin(['Mcapp_1', 'TwoInchTommy565', 'NYKings06', 'MrBazzzz', 'Slick__AV', 'Matty__Ice__4'])]
     
+    # Rows the validate step quarantined stay out until removed from quarantine.csv
+    quarantined = has_key(df_merged, quarantined_keys())
+    if quarantined.any():
+        logger.info(f"Leaving out {quarantined.sum()} quarantined records")
+        df_merged = df_merged[~quarantined]
+    
     # Drop duplicate scraped_at column
     if 'scraped_at_adv' in df_merged.columns:
         df_merged = df_merged.drop('scraped_at_adv', axis=1)
     
+    # Win / loss / OT loss / DNF, used by every downstream table and the dashboard
+    df_merged = add_outcome_columns(df_merged)
+    
     # Save merged data
-    df_merged.to_csv(DB_MERGED_STATS, index=False)
+    save_table(df_merged, DB_MERGED_STATS)
+    MERGED_RECORDS.set(len(df_merged))
     
     logger.info(f"Merged {len(df_merged)} records to {DB_MERGED_STATS}")
     logger.info(f"Advanced stats coverage: {df_merged['war'].notna().sum()}/{len(df_merged)} records")
@@ -1,5 +1,9 @@
 """
 Main pipeline orchestrator
+
+Scrapers and pipeline steps are imported where they run, so a poll that finds
+no new games never loads the UI scraper, the HTML parsers or the derived-table
+steps (benchmarks/startup.py times that path).
 """
 import asyncio
 import sys
@@ -9,18 +13,32 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from scrapers.api_scraper import APIBasicStatsScraper
-from scrapers.ui_scraper import UIAdvancedStatsScraper
-from scrapers.ea_proclubs_scraper import capture_proclubs_api_data
-from scrapers.heatmap_scraper import scrape_career_shot_data
-from pipeline.merge import merge_stats
-from pipeline.validate import validate_data
-from utils.helpers import setup_logging, get_existing_match_ids
+from utils.helpers import setup_logging, set_log_context, get_existing_match_ids
+from utils.metrics import GAMES_DISCOVERED, start_metrics_server, write_textfile
+from utils.store import RunTransaction
+from config.config import METRICS_PORT, METRICS_TEXTFILE
 
 logger = setup_logging(__name__)
 
 
+def find_new_games(api_scraper):
+    """Match IDs from the API that are not in the database yet (None if the API could not be reached)"""
+    club_data = api_scraper.fetch_club_data()
+    if not club_data:
+        logger.error("Failed to fetch club data.")
+        return None
+    
+    match_ids = api_scraper.get_match_ids(club_data)
+    existing_match_ids = get_existing_match_ids()
+    new_match_ids = [mid for mid in match_ids if mid not in existing_match_ids]
+    GAMES_DISCOVERED.inc(len(new_match_ids), status='new')
+    return new_match_ids
+
+
 async def run_pipeline():
     """Main pipeline execution"""
+    run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+    set_log_context(run_id=run_id, step='start')
     logger.info("="*70)
     logger.info("NHL 26 Stats Pipeline - Starting")
     logger.info(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -28,39 +46,57 @@ async def run_pipeline():
     
     new_games_processed = False
     
+    if METRICS_PORT:
+        try:
+            start_metrics_server(METRICS_PORT)
+            logger.info(f"Serving metrics on http://127.0.0.1:{METRICS_PORT}/metrics")
+        except OSError as e:
+            logger.warning(f"Could not start metrics server on port {METRICS_PORT}: {e}")
+    
+    # Tables written by this run are committed together at the end (or restored if it fails)
+    transaction = RunTransaction(run_id).begin()
+    
     try:
         # Step 1: Check for new games via API
+        set_log_context(step='check_new_games')
         logger.info("\n[Step 1] Checking for new games...")
         api_scraper = APIBasicStatsScraper()
-        club_data = api_scraper.fetch_club_data()
+        new_match_ids = find_new_games(api_scraper)
         
-        if not club_data:
-            logger.error("Failed to fetch club data.")
-        else:
-            match_ids = api_scraper.get_match_ids(club_data)
-            existing_match_ids = get_existing_match_ids()
-            new_match_ids = [mid for mid in match_ids if mid not in existing_match_ids]
-            
+        if new_match_ids is not None:
             if not new_match_ids:
                 logger.info("No new games found.")
             else:
                 new_games_processed = True
                 logger.info(f"Found {len(new_match_ids)} new games to scrape")
                 
+                from scrapers.ui_scraper import UIAdvancedStatsScraper
+                from pipeline.merge import merge_stats
+                from pipeline.validate import validate_data
+                from pipeline.aggregate import build_player_aggregates
+                from pipeline.form import build_form
+                from pipeline.impact import build_impact_model
+                from pipeline.lineups import build_lineups
+                
                 # Step 2: Scrape basic stats
+                set_log_context(step='basic_stats')
                 logger.info("\n[Step 2] Scraping basic stats...")
                 basic_data = api_scraper.scrape()
                 basic_count = api_scraper.save(basic_data)
                 logger.info(f"Saved {basic_count} basic stat records")
                 
                 # Step 3: Scrape advanced stats
+                set_log_context(step='advanced_stats')
                 logger.info("\n[Step 3] Scraping advanced stats...")
                 ui_scraper = UIAdvancedStatsScraper()
                 advanced_data = await ui_scraper.scrape(new_match_ids)
+                if ui_scraper.drift_error:
+                    logger.error(f"Advanced stats scraping aborted, the match page changed: {ui_scraper.drift_error}")
                 advanced_count = ui_scraper.save(advanced_data)
                 logger.info(f"Saved {advanced_count} advanced stat records")
                 
                 # Step 4: Merge data
+                set_log_context(step='merge')
                 logger.info("\n[Step 4] Merging datasets...")
                 merge_success = merge_stats()
                 
@@ -68,24 +104,55 @@ async def run_pipeline():
                     logger.error("Merge failed")
                 
                 # Step 5: Validate
+                set_log_context(step='validate')
                 logger.info("\n[Step 5] Validating data...")
                 validation_success = validate_data()
                 
                 if not validation_success:
                     logger.warning("Validation found issues (see above)")
+                
+                # Step 6: Derived tables for the dashboard
+                set_log_context(step='derived_tables')
+                logger.info("\n[Step 6] Building derived tables...")
+                if not build_player_aggregates():
+                    logger.error("Building player aggregates failed")
+                if not build_form():
+                    logger.error("Updating form table failed")
+                if not build_impact_model():
+                    logger.error("Updating impact model failed")
+                if not build_lineups():
+                    logger.error("Building lineup stats failed")
         
-        # Step 6: Always capture Pro Clubs shot location data (independent of new games)
-        logger.info("\n[Step 6] Capturing Pro Clubs shot location data...")
+        # Step 7: Always capture Pro Clubs shot location data (independent of new games)
+        set_log_context(step='proclubs_capture')
+        logger.info("\n[Step 7] Capturing Pro Clubs shot location data...")
+        from scrapers.ea_proclubs_scraper import capture_proclubs_api_data
         capture_success = await capture_proclubs_api_data()
         
         if capture_success:
-            # Step 7: Process shot location data
-            logger.info("\n[Step 7] Processing shot location data...")
+            # Step 8: Process shot location data
+            set_log_context(step='shot_locations')
+            logger.info("\n[Step 8] Processing shot location data...")
+            from scrapers.heatmap_scraper import scrape_career_shot_data
+            from pipeline.expected_goals import build_expected_goals
             shot_data = scrape_career_shot_data()
             logger.info(f"Collected shot location data for {len(shot_data)} players")
+            if not shot_data.empty and not build_expected_goals():
+                logger.error("Building expected goals failed")
         else:
             logger.warning("Failed to capture Pro Clubs data - skipping shot location processing")
 
+        set_log_context(step='commit')
+        transaction.commit()
+        
+        # Changes for downstream consumers, once committed (so quarantined rows and failed runs stay out)
+        if new_games_processed:
+            set_log_context(step='publish')
+            from pipeline.publish import publish_changes
+            if not publish_changes():
+                logger.error("Publishing changes failed")
+
+        set_log_context(step='finish')
         logger.info("\n" + "="*70)
         logger.info("Pipeline completed successfully")
         if new_games_processed:
@@ -96,6 +163,9 @@ async def run_pipeline():
         
     except Exception as e:
         logger.error(f"Pipeline failed with error: {e}", exc_info=True)
+        transaction.abort()
+    finally:
+        write_textfile(METRICS_TEXTFILE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""
+Publish merged stats changes to the change log (utils/changelog.py)
+
+Runs after validation, so quarantined rows never reach consumers (and rows
+quarantined after being published show up as deletes).
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_MERGED_STATS
+from analytics.validation import row_hashes
+from utils.changelog import ChangeLog
+from utils.helpers import setup_logging
+from utils.schema import MERGED_SCHEMA, read_table
+from utils.metrics import CHANGES_PUBLISHED, STEP_SECONDS
+
+logger = setup_logging(__name__)
+
+
+def publish_changes():
+    """Append inserted/updated/deleted merged rows to the change log"""
+    with STEP_SECONDS.time(step='publish'):
+        return _publish_changes()
+
+
+def _publish_changes():
+    if not DB_MERGED_STATS.exists():
+        logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
+        return False
+
+    df = read_table(DB_MERGED_STATS, MERGED_SCHEMA)
+    log = ChangeLog()
+    counts = log.publish(df, row_hashes(df))
+    for op, count in counts.items():
+        CHANGES_PUBLISHED.inc(count, op=op)
+    logger.info(f"Published {counts['insert']} inserts, {counts['update']} updates and {counts['delete']} deletes "
+                f"(change log at seq {log.latest_seq()})")
+    return True
+
+
+if __name__ == "__main__":
+    publish_changes()
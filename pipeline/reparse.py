@@ -0,0 +1,132 @@
+"""
+Rebuild the raw stats tables from the payload archive, without the network
+
+Usage:
+    python pipeline/reparse.py               # basic and advanced stats
+    python pipeline/reparse.py --only advanced --workers 4 --backend selectolax
+
+Archived API game payloads go back through extract_player_game_stats and
+archived match pages through parse_advanced_stats, fanned out over a process
+pool. Rebuilt rows replace the stored rows with the same key; rows scraped
+before the archive existed are kept.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import ARCHIVE_DIR, CLUB_ID, DB_BASIC_STATS, DB_ADVANCED_STATS, PARSER_BACKEND, REPARSE_WORKERS
+from scrapers.api_scraper import APIBasicStatsScraper
+from scrapers.parsers import PARSER_BACKENDS, check_panel, missing_labels, parse_advanced_stats
+from utils.archive import PayloadArchive, blob_path, read_blob
+from utils.helpers import setup_logging
+from utils.schema import BASIC_SCHEMA, ADVANCED_SCHEMA, apply_schema, read_table
+from utils.metrics import STEP_SECONDS
+from utils.store import write_csv
+
+logger = setup_logging(__name__)
+
+BASIC_KEY = ['match_id', 'player_id']
+ADVANCED_KEY = ['match_id', 'player_name']
+
+
+def _parse_club_game(task):
+    path, archived_at = task
+    game = json.loads(read_blob(path))
+    rows = APIBasicStatsScraper().extract_player_game_stats(game, CLUB_ID)
+    for row in rows:
+        row['scraped_at'] = archived_at
+    return rows
+
+
+def _parse_advanced_page(task, backend=PARSER_BACKEND):
+    path, match_id, player_name, archived_at = task
+    html = read_blob(path).decode('utf-8')
+    stats = parse_advanced_stats(html, backend)
+    if missing_labels(stats):
+        # Pages archived after a markup change: use whichever selectors still read them
+        selectors, _ = check_panel(html, backend)
+        if selectors is not None:
+            stats = parse_advanced_stats(html, backend, selectors)
+    stats['player_name'] = player_name
+    stats['match_id'] = match_id
+    stats['scraped_at'] = archived_at
+    return [stats]
+
+
+def parse_all(parse, tasks, workers):
+    """Flattened parse results for `tasks`, across `workers` processes"""
+    if workers <= 1 or len(tasks) < 2:
+        results = map(parse, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return [row for rows in results for row in rows]
+
+
+def _replace_rows(path, schema, rebuilt, key):
+    """Stored table with every row whose key was rebuilt replaced by the rebuilt row"""
+    rebuilt = apply_schema(pd.DataFrame(rebuilt), schema)
+    if not path.exists():
+        return rebuilt
+    existing = read_table(path, schema)
+    rebuilt_keys = pd.MultiIndex.from_frame(rebuilt[key].astype(str))
+    kept = existing[~pd.MultiIndex.from_frame(existing[key].astype(str)).isin(rebuilt_keys)]
+    return pd.concat([kept, rebuilt], ignore_index=True)
+
+
+def reparse_archive(only=('basic', 'advanced'), workers=REPARSE_WORKERS, backend=PARSER_BACKEND):
+    """Rebuild basic_stats.csv / advanced_stats.csv rows from the archive"""
+    with STEP_SECONDS.time(step='reparse'):
+        return _reparse_archive(only, workers, backend)
+
+
+def _reparse_archive(only, workers, backend):
+    archive = PayloadArchive(ARCHIVE_DIR)
+    tables = {
+        'basic': ('club_game', _parse_club_game, DB_BASIC_STATS, BASIC_SCHEMA, BASIC_KEY),
+        'advanced': ('advanced_html', partial(_parse_advanced_page, backend=backend), DB_ADVANCED_STATS,
+                     ADVANCED_SCHEMA, ADVANCED_KEY),
+    }
+
+    for name in only:
+        kind, parse, path, schema, key = tables[name]
+        entries = archive.index(kind, latest=True)
+        if entries.empty:
+            logger.warning(f"No archived {kind} payloads in {ARCHIVE_DIR}")
+            continue
+
+        paths = [blob_path(ARCHIVE_DIR, digest) for digest in entries['digest']]
+        if name == 'basic':
+            tasks = list(zip(paths, entries['archived_at']))
+        else:
+            tasks = list(zip(paths, entries['match_id'], entries['player_name'], entries['archived_at']))
+
+        start = time.perf_counter()
+        rows = parse_all(parse, tasks, workers)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Parsed {len(tasks)} archived {kind} payloads into {len(rows)} rows "
+                    f"with {workers} workers ({len(tasks) / max(elapsed, 1e-9):.0f}/s)")
+
+        if rows:
+            table = _replace_rows(path, schema, rows, key)
+            write_csv(table, path)
+            logger.info(f"Wrote {len(table)} records to {path}")
+
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=['basic', 'advanced'], default=['basic', 'advanced'])
+    parser.add_argument('--workers', type=int, default=REPARSE_WORKERS)
+    parser.add_argument('--backend', choices=sorted(PARSER_BACKENDS), default=PARSER_BACKEND)
+    args = parser.parse_args()
+    reparse_archive(args.only, args.workers, args.backend)
@@ -1,56 +1,127 @@
 """
 Data validation and quality checks
+
+Rows that break a rule in analytics/validation.py move from merged_stats.csv
+to quarantine.csv (with the names of the failed rules), and the merge step
+leaves quarantined keys out from then on; delete a quarantine row to let it
+back in. Only new or changed rows are checked: validated_rows.csv records a
+content hash of every passing row, so a row is checked again when, say, its
+advanced stats land.
 """
+from datetime import datetime
 import pandas as pd
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from config.config import DB_MERGED_STATS
+from config.config import DB_BASIC_STATS, DB_ADVANCED_STATS, DB_MERGED_STATS, DB_QUARANTINE, DB_VALIDATED_ROWS
+from analytics.validation import (
+    KEY_COLUMNS, rule_failures, failed_rule_names, key_index, has_key, orphan_rows, row_hashes
+)
 from utils.helpers import setup_logging
+from utils.schema import ADVANCED_SCHEMA, MERGED_SCHEMA, read_table
+from utils.store import append_csv, held_table, save_table, table_exists
+from utils.metrics import STEP_SECONDS, VALIDATION_FAILURES
 
 logger = setup_logging(__name__)
 
+QUARANTINE_INFO_COLUMNS = ['quarantined_at', 'source', 'failed_rules']
+
 
 def validate_data():
     """Run data quality checks"""
+    with STEP_SECONDS.time(step='validate'):
+        return _validate_data()
+
+
+def quarantined_keys():
+    """(match_id, player_name) keys in the quarantine table"""
+    if not DB_QUARANTINE.exists():
+        return key_index(pd.DataFrame(columns=KEY_COLUMNS))
+    return key_index(pd.read_csv(DB_QUARANTINE, usecols=KEY_COLUMNS))
+
+
+def _validated(hashes):
+    """Mask of rows already validated with their current contents"""
+    if not DB_VALIDATED_ROWS.exists():
+        return pd.Series(False, index=hashes.index)
+    ledger = pd.read_csv(DB_VALIDATED_ROWS, usecols=['row_hash'], dtype={'row_hash': 'uint64'})
+    return hashes.isin(ledger['row_hash'])
+
+
+def _key_columns(path):
+    held = held_table(path)
+    return held[KEY_COLUMNS] if held is not None else pd.read_csv(path, usecols=KEY_COLUMNS)
+
+
+def _orphan_advanced_rows():
+    """Advanced stats rows without a basic stats row, not yet quarantined"""
+    if not (table_exists(DB_ADVANCED_STATS) and table_exists(DB_BASIC_STATS)):
+        return pd.DataFrame()
+    # Key columns first; the full rows are only read when there are orphans
+    advanced = _key_columns(DB_ADVANCED_STATS)
+    basic = _key_columns(DB_BASIC_STATS)
+    orphaned = orphan_rows(advanced, basic) & ~has_key(advanced, quarantined_keys())
+    if not orphaned.any():
+        return pd.DataFrame()
+    return read_table(DB_ADVANCED_STATS, ADVANCED_SCHEMA)[orphaned.to_numpy()]
+
+
+def _validate_data():
     logger.info("Running data validation...")
-    
-    if not DB_MERGED_STATS.exists():
+
+    if not table_exists(DB_MERGED_STATS):
         logger.error(f"Merged stats file not found: {DB_MERGED_STATS}")
         return False
-    
-    df = pd.read_csv(DB_MERGED_STATS)
-    
+
+    df = read_table(DB_MERGED_STATS, MERGED_SCHEMA)
+
     issues = []
-    
-    # Check for duplicates
-    duplicates = df.duplicated(subset=['match_id', 'player_name'], keep=False)
-    if duplicates.any():
-        dup_count = duplicates.sum()
-        issues.append(f"Found {dup_count} duplicate records")
-        logger.warning(f"Found {dup_count} duplicate records")
-    
-    # Check for missing critical fields
-    critical_fields = ['match_id', 'player_name', 'goals', 'assists', 'points']
-    for field in critical_fields:
-        missing = df[field].isna().sum()
-        if missing > 0:
-            issues.append(f"{field} has {missing} missing values")
-            logger.warning(f"{field} has {missing} missing values")
-    
+
+    # Rows not validated before, plus every copy of a duplicated key
+    hashes = row_hashes(df)
+    pending = ~_validated(hashes) | df.duplicated(KEY_COLUMNS, keep=False)
+    rows = df[pending]
+    failures = rule_failures(rows)
+    failed = failures.any(axis=1)
+    logger.info(f"Checked {len(rows)} new or changed rows against {failures.shape[1]} rules")
+
+    for rule, count in failures.sum().items():
+        if count > 0:
+            issues.append(f"{rule}: {count} rows")
+            VALIDATION_FAILURES.inc(int(count), check=rule)
+
+    # Cross-table: advanced stats for a player-game the basic stats never had
+    orphans = _orphan_advanced_rows()
+    if not orphans.empty:
+        issues.append(f"advanced_without_basic: {len(orphans)} rows")
+        VALIDATION_FAILURES.inc(len(orphans), check='advanced_without_basic')
+
+    quarantine = [rows[failed].assign(source='merged_stats', failed_rules=failed_rule_names(failures[failed]))]
+    if not orphans.empty:
+        quarantine.append(orphans.assign(source='advanced_stats', failed_rules='advanced_without_basic'))
+    quarantine = pd.concat(quarantine)
+    if not quarantine.empty:
+        quarantine['quarantined_at'] = datetime.now().isoformat()
+        append_csv(quarantine, DB_QUARANTINE, QUARANTINE_INFO_COLUMNS + list(df.columns))
+        logger.warning(f"Quarantined {len(quarantine)} rows to {DB_QUARANTINE}")
+
+    if failed.any():
+        df = df[~has_key(df, key_index(rows[failed]))]
+        save_table(df, DB_MERGED_STATS)
+
+    passed = rows[~failed]
+    if not passed.empty:
+        append_csv(passed[KEY_COLUMNS].assign(row_hash=hashes[passed.index]), DB_VALIDATED_ROWS)
+
     # Check for advanced stats coverage
-    war_coverage = df['war'].notna().sum() / len(df) * 100
+    war_coverage = df['war'].notna().sum() / max(len(df), 1) * 100
     if war_coverage < 90:
         issues.append(f"Advanced stats coverage only {war_coverage:.1f}%")
+        VALIDATION_FAILURES.inc(check='war_coverage')
         logger.warning(f"Advanced stats coverage only {war_coverage:.1f}%")
-    
-    # Check for negative stats that shouldn't be negative
-    if (df['goals'] < 0).any():
-        issues.append("Found negative goal values")
-        logger.error("Found negative goal values")
-    
+
     if issues:
         logger.warning(f"Validation found {len(issues)} issues")
         for issue in issues:
@@ -62,4 +133,4 @@ def validate_data():
 
 
 if __name__ == "__main__":
-    validate_data()
\ No newline at end of file
+    validate_data()
@@ -0,0 +1,255 @@
+"""
+Local stand-in for chelstats.app and proclubs.ea.com
+
+Serves the club stats JSON, match pages with the advanced-stats DOM the UI
+scraper drives, and the Pro Clubs members endpoint, with optional latency
+and failure injection.
+
+Usage:
+    python replay/server.py --synthetic 50 --port 8765
+    python replay/server.py --recordings data/replay --latency-ms 200 --failure-rate 0.05
+
+Then run the pipeline against it:
+    NHL26_CHELSTATS_URL=http://127.0.0.1:8765 NHL26_PROCLUBS_URL=http://127.0.0.1:8765 \\
+        python pipeline/orchestrator.py
+
+A recordings directory may contain club_stats.json (the /clubs/stats
+response), proclubs_members_stats.json and advanced_stats.csv (values shown
+on the match pages). Missing files are served as 404.
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import sys
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import synthetic
+from utils.helpers import setup_logging
+
+logger = setup_logging(__name__)
+
+PERCENT_COLUMNS = ('war', 'total_offense', 'total_defense', 'efficiency')
+
+MATCH_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>ChelStats - Recent Games</title>
+<style>
+  #player-options[hidden], #advanced[hidden] {{ display: none; }}
+  [role=option] {{ cursor: pointer; padding: 4px; }}
+</style>
+</head>
+<body>
+<header><h1>{team_name}</h1></header>
+<main>
+  <nav><button id="tab-box">BOX SCORE</button><button id="tab-advanced">ADVANCED STATS</button></nav>
+  <section id="advanced" hidden>
+    <div id="player-select" role="combobox" aria-haspopup="listbox" tabindex="0">Select player</div>
+    <ul id="player-options" role="listbox" hidden>{options}</ul>
+    <div id="stats-panel" aria-label="Advanced stats"></div>
+  </section>
+</main>
+<script>
+  const STATS = {stats_json};
+  const LABELS = {labels_json};
+  document.getElementById('tab-advanced').addEventListener('click', () => {{
+    document.getElementById('advanced').hidden = false;
+  }});
+  document.getElementById('player-select').addEventListener('click', () => {{
+    const list = document.getElementById('player-options');
+    list.hidden = !list.hidden;
+  }});
+  for (const option of document.querySelectorAll('[role=option]')) {{
+    option.addEventListener('click', () => {{
+      const values = STATS[option.dataset.player];
+      document.getElementById('player-select').textContent = option.dataset.player;
+      document.getElementById('player-options').hidden = true;
+      document.getElementById('stats-panel').innerHTML = LABELS.map(([label, column, suffix]) =>
+        `<div class="css-1lekzkb"><p class="css-9y6e4h">${{label}}</p><p class="css-1xpcq1e">${{values[column]}}${{suffix}}</p></div>`
+      ).join('');
+    }});
+  }}
+</script>
+</body>
+</html>
+"""
+
+
+class ReplayData:
+    """Payloads served by the stand-in"""
+
+    def __init__(self, club_stats=None, members=None, advanced=None):
+        self.club_stats = club_stats
+        self.members = members
+        # {match_id (str): {player_name: {column: value}}}
+        self.advanced = advanced or {}
+
+    @classmethod
+    def from_synthetic(cls, n_games, seed=0):
+        player_games = synthetic.generate_player_games(n_games, seed)
+        advanced = synthetic.advanced_stats_frame(player_games)
+        return cls(
+            club_stats=synthetic.club_payload(player_games),
+            members=synthetic.members_payload(player_games, seed),
+            advanced=cls._index_advanced(advanced),
+        )
+
+    @classmethod
+    def from_recordings(cls, directory):
+        directory = Path(directory)
+        club_stats = members = None
+        advanced = {}
+        if (directory / "club_stats.json").exists():
+            with open(directory / "club_stats.json") as f:
+                club_stats = json.load(f)
+        if (directory / "proclubs_members_stats.json").exists():
+            with open(directory / "proclubs_members_stats.json") as f:
+                members = json.load(f)
+        if (directory / "advanced_stats.csv").exists():
+            advanced = cls._index_advanced(pd.read_csv(directory / "advanced_stats.csv"))
+        return cls(club_stats, members, advanced)
+
+    @staticmethod
+    def _index_advanced(df):
+        columns = list(synthetic.ADVANCED_LABELS.values())
+        index = {}
+        for row in df.to_dict('records'):
+            index.setdefault(str(row['match_id']), {})[row['player_name']] = {c: row.get(c) for c in columns}
+        return index
+
+    def match_page(self, match_id):
+        players = self.advanced.get(str(match_id))
+        if players is None:
+            return None
+        labels = [[label, column, '%' if column in PERCENT_COLUMNS else '']
+                  for label, column in synthetic.ADVANCED_LABELS.items()]
+        options = ''.join(
+            f'<li role="option" data-player="{html.escape(name)}">{html.escape(name)}</li>' for name in players
+        )
+        return MATCH_PAGE_TEMPLATE.format(
+            team_name='Club',
+            options=options,
+            stats_json=json.dumps(players, default=str),
+            labels_json=json.dumps(labels),
+        )
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Routes requests to the replay data; settings live on the server"""
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        server.request_counts[parsed.path] += 1
+
+        if parsed.path == '/__stats':
+            self._send_json(200, dict(server.request_counts))
+            return
+
+        if server.latency_ms:
+            delay = max(0.0, random.gauss(server.latency_ms, server.latency_ms * 0.25)) / 1000
+            time.sleep(delay)
+
+        if server.failure_rate and random.random() < server.failure_rate:
+            server.request_counts['__injected_failures'] += 1
+            self._send_json(server.failure_status, {'error': 'injected failure'})
+            return
+
+        query = parse_qs(parsed.query)
+        data = server.data
+
+        if parsed.path == '/api/clubs/stats':
+            self._send_payload(data.club_stats)
+        elif parsed.path == '/api/nhl/members/stats':
+            self._send_payload(data.members)
+        elif parsed.path == '/clubs/recent-games':
+            page = data.match_page(query.get('matchId', [''])[0])
+            if page is None:
+                self.send_error(404)
+            else:
+                self._send(200, page.encode('utf-8'), 'text/html; charset=utf-8')
+        else:
+            self.send_error(404)
+
+    def _send_payload(self, payload):
+        if payload is None:
+            self.send_error(404)
+        else:
+            self._send_json(200, payload)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, default=str).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(data, host='127.0.0.1', port=8765, latency_ms=0, failure_rate=0.0, failure_status=503):
+    """Build (but do not start) a stand-in server"""
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.daemon_threads = True
+    server.data = data
+    server.latency_ms = latency_ms
+    server.failure_rate = failure_rate
+    server.failure_status = failure_status
+    server.request_counts = Counter()
+    return server
+
+
+def start_server(data, **kwargs):
+    """Start a stand-in server on a daemon thread; returns (server, base_url)"""
+    server = create_server(data, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, name='replay-server', daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for chelstats.app and proclubs.ea.com")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--recordings', type=Path, help="Directory with recorded payloads")
+    source.add_argument('--synthetic', type=int, metavar='GAMES', default=20, help="Serve N synthetic games")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help="Mean added latency per request")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument('--failure-status', type=int, default=503, help="Status code for injected failures")
+    args = parser.parse_args()
+
+    if args.recordings:
+        data = ReplayData.from_recordings(args.recordings)
+    else:
+        data = ReplayData.from_synthetic(args.synthetic, args.seed)
+
+    server = create_server(data, args.host, args.port, args.latency_ms, args.failure_rate, args.failure_status)
+    base_url = f"http://{args.host}:{args.port}"
+    logger.info(f"Serving {len(data.advanced)} match pages on {base_url}")
+    logger.info(f"Run with NHL26_CHELSTATS_URL={base_url} NHL26_PROCLUBS_URL={base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
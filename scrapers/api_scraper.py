@@ -1,8 +1,7 @@
 """
 API-based scraper for basic NHL 26 stats
 """
-import requests
-import pandas as pd
+import json
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -13,7 +12,11 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config.config import (
     CLUB_STATS_URL, CLUB_ID, DB_BASIC_STATS
 )
+from utils.archive import PayloadArchive
 from utils.helpers import setup_logging
+from utils.ratelimit import http_get
+from utils.store import save_table, table_exists
+from utils.metrics import GAMES_DISCOVERED, RECORDS_SAVED
 
 logger = setup_logging(__name__)
 
@@ -21,11 +24,14 @@ logger = setup_logging(__name__)
 class APIBasicStatsScraper:
     """Scrapes basic game stats from ChelStats API"""
     
+    def __init__(self):
+        self.archive = PayloadArchive()
+    
     def fetch_club_data(self):
         """Fetch club data from API"""
         try:
             logger.info("Fetching club data from API...")
-            response = requests.get(CLUB_STATS_URL, timeout=30)
+            response = http_get(CLUB_STATS_URL)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -37,6 +43,7 @@ class APIBasicStatsScraper:
         try:
             games = data.get('recentGames', {}).get('RegularSeason', [])
             match_ids = [game['matchId'] for game in games]
+            GAMES_DISCOVERED.inc(len(match_ids), status='seen')
             logger.info(f"Found {len(match_ids)} recent games")
             return match_ids
         except Exception as e:
@@ -156,6 +163,9 @@ class APIBasicStatsScraper:
             match_id = game.get('matchId')
             logger.info(f"Processing game {match_id}")
             
+            # Keep the raw payload so the table can be rebuilt without the API (pipeline/reparse.py)
+            self.archive.put('club_game', json.dumps(game, sort_keys=True).encode('utf-8'), match_id)
+            
             player_stats = self.extract_player_game_stats(game, CLUB_ID)
             all_player_stats.extend(player_stats)
             logger.info(f"  Extracted stats for {len(player_stats)} players")
@@ -168,10 +178,14 @@ class APIBasicStatsScraper:
             logger.warning("No data to save")
             return 0
         
-        df_new = pd.DataFrame(data)
+        # pandas is only needed once there is something to save, not to check for new games
+        import pandas as pd
+        from utils.schema import BASIC_SCHEMA, apply_schema, read_table
+        
+        df_new = apply_schema(pd.DataFrame(data), BASIC_SCHEMA)
         
-        if DB_BASIC_STATS.exists():
-            df_existing = pd.read_csv(DB_BASIC_STATS)
+        if table_exists(DB_BASIC_STATS):
+            df_existing = read_table(DB_BASIC_STATS, BASIC_SCHEMA)
             
             # Check for duplicates
             df_existing['key'] = df_existing['match_id'].astype(str) + '_' + df_existing['player_id'].astype(str)
@@ -188,7 +202,8 @@ class APIBasicStatsScraper:
         else:
             df_combined = df_new
         
-        df_combined.to_csv(DB_BASIC_STATS, index=False)
+        save_table(df_combined, DB_BASIC_STATS)
+        RECORDS_SAVED.inc(len(df_new), table='basic_stats')
         logger.info(f"Saved {len(df_new)} new records to {DB_BASIC_STATS}")
         
         return len(df_new)
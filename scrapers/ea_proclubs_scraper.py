@@ -1,13 +1,15 @@
 # scrapers/ea_proclubs_scraper.py
 import asyncio
-from playwright.async_api import async_playwright
 import json
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from utils.helpers import setup_logging
-from config.config import CLUB_ID, CONSOLE
+from utils.metrics import BROWSER_STARTS, RECORDS_SAVED
+from utils.ratelimit import goto
+from utils.store import write_json
+from config.config import DB_PROCLUBS_MEMBERS, PROCLUBS_MEMBERS_URL
 
 logger = setup_logging(__name__)
 
@@ -15,19 +17,21 @@ USER_DATA_DIR = "ea_profile"
 
 async def capture_proclubs_api_data():
     """Navigate directly to API URL and extract JSON"""
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
         browser = await p.chromium.launch_persistent_context(
             USER_DATA_DIR,
             headless=False,
         )
+        BROWSER_STARTS.inc(scraper='proclubs')
         page = browser.pages[0] if browser.pages else await browser.new_page()
 
         # Go directly to the API endpoint
-        api_url = f"https://proclubs.ea.com/api/nhl/members/stats?platform={CONSOLE}&clubId={CLUB_ID}"
+        api_url = PROCLUBS_MEMBERS_URL
         logger.info(f"Navigating directly to API: {api_url}")
         
         try:
-            response = await page.goto(api_url, timeout=30000)
+            response = await goto(page, api_url, timeout=30000)
             
             if response.status == 200:
                 logger.info("API returned 200 OK")
@@ -45,12 +49,11 @@ async def capture_proclubs_api_data():
                     data = json.loads(json_text)
                 
                 # Save to file
-                Path("data/raw").mkdir(parents=True, exist_ok=True)
-                with open("data/raw/proclubs_members_stats.json", "w") as f:
-                    json.dump(data, f, indent=2)
+                write_json(data, DB_PROCLUBS_MEMBERS, indent=2)
                 
-                logger.info("✅ Data saved to data/raw/proclubs_members_stats.json")
+                logger.info(f"✅ Data saved to {DB_PROCLUBS_MEMBERS}")
                 logger.info(f"Found {len(data.get('members', []))} members")
+                RECORDS_SAVED.inc(len(data.get('members', [])), table='proclubs_members')
                 
                 await browser.close()
                 return True
@@ -7,6 +7,8 @@ import sys
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from utils.helpers import setup_logging
+from utils.store import write_csv
+from config.config import DB_PROCLUBS_MEMBERS, DB_SHOT_LOCATIONS
 
 logger = setup_logging(__name__)
 
@@ -15,7 +17,7 @@ def scrape_career_shot_data():
     logger.info("Loading shot location data from proclubs_members_stats.json...")
     
     try:
-        json_path = Path("data/raw/proclubs_members_stats.json")
+        json_path = DB_PROCLUBS_MEMBERS
         
         if not json_path.exists():
             logger.error("proclubs_members_stats.json not found - run ea_proclubs_scraper first")
@@ -80,8 +82,8 @@ def scrape_career_shot_data():
 
         df = pd.DataFrame(shot_data)
         df[['goals_zone_5', 'goals_zone_6']] = df[['goals_zone_6', 'goals_zone_5']]
-        output_path = 'data/processed/shot_locations.csv'
-        df.to_csv(output_path, index=False)
+        output_path = DB_SHOT_LOCATIONS
+        write_csv(df, output_path)
         logger.info(f"Saved shot location data to {output_path}")
         
         return df
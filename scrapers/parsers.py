@@ -0,0 +1,193 @@
+"""
+Parsers for scraped ChelStats pages (no browser needed, so archived pages can be re-parsed offline)
+
+Parsing is scoped to the advanced-stats panel: the page is cut from the first
+stats label to the value after the last one before any backend sees it.
+Backends ('html.parser', 'lxml', 'selectolax') return (label, value) pairs;
+lxml and selectolax are imported on first use.
+
+The 'class' selectors depend on ChelStats' generated class names. When a
+redeploy changes them, check_panel() finds which of the alternate selectors
+('label_text': elements whose text is a known label, 'aria': aria-label /
+term-definition markup) still reads every label.
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import PARSER_BACKEND
+
+# Advanced-stats panel label -> advanced_stats column
+ADVANCED_LABELS = {
+    'WAR': 'war',
+    'TO': 'total_offense',
+    'TD': 'total_defense',
+    'Eff': 'efficiency',
+    'xG': 'expected_goals',
+    'GAE': 'goals_above_expected',
+    'GAR': 'goals_above_replacement',
+}
+
+LABEL_CLASS = 'css-9y6e4h'
+
+
+def to_float(value):
+    try:
+        return float(str(value).replace('%', '').replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def stats_panel(html):
+    """The slice of the page from the first stats label to the value <p> after the last one"""
+    first = html.find(LABEL_CLASS)
+    if first == -1:
+        return ''
+    start = html.rfind('<', 0, first)
+    last = html.rfind(LABEL_CLASS)
+    end = html.find('</p>', html.find('</p>', last) + len('</p>'))
+    return html[start:end + len('</p>')] if end != -1 else html[start:]
+
+
+def _pairs_html_parser(panel):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(panel, 'html.parser')
+    pairs = []
+    for label in soup.find_all('p', class_=LABEL_CLASS):
+        value = label.find_next_sibling('p')
+        if value:
+            pairs.append((label.get_text(strip=True), value.get_text(strip=True)))
+    return pairs
+
+
+def _pairs_lxml(panel):
+    from lxml import html as lxml_html
+
+    root = lxml_html.fragment_fromstring(panel, create_parent='div')
+    pairs = []
+    for label in root.xpath(f'.//p[contains(concat(" ", normalize-space(@class), " "), " {LABEL_CLASS} ")]'):
+        value = label.xpath('following-sibling::p[1]')
+        if value:
+            pairs.append((label.text_content().strip(), value[0].text_content().strip()))
+    return pairs
+
+
+def _pairs_selectolax(panel):
+    from selectolax.parser import HTMLParser
+
+    pairs = []
+    for label in HTMLParser(panel).css(f'p.{LABEL_CLASS}'):
+        value = label.next
+        while value is not None and value.tag != 'p':
+            value = value.next
+        if value is not None:
+            pairs.append((label.text(strip=True), value.text(strip=True)))
+    return pairs
+
+
+PARSER_BACKENDS = {
+    'html.parser': _pairs_html_parser,
+    'lxml': _pairs_lxml,
+    'selectolax': _pairs_selectolax,
+}
+
+
+def _document(html):
+    from lxml import html as lxml_html
+
+    return lxml_html.document_fromstring(html)
+
+
+def _pairs_label_text(html):
+    """Leaf elements whose whole text is a known label, each followed by its value element"""
+    root = _document(html)
+    pairs = []
+    for label in ADVANCED_LABELS:
+        for element in root.xpath('//body//*[not(*) and not(ancestor-or-self::script) and normalize-space(.)=$label]',
+                                  label=label):
+            value = element.getnext()
+            if value is not None:
+                pairs.append((label, value.text_content().strip()))
+                break
+    return pairs
+
+
+def _pairs_aria(html):
+    """aria-label="WAR" on the value element, or role=term / role=definition (dt / dd) pairs"""
+    root = _document(html)
+    pairs = []
+    for element in root.xpath('//*[@aria-label]'):
+        pairs.append((element.get('aria-label').strip(), element.text_content().strip()))
+    for term in root.xpath('//*[@role="term"] | //dt'):
+        value = term.xpath('following-sibling::*[@role="definition" or self::dd][1]')
+        if value:
+            pairs.append((term.text_content().strip(), value[0].text_content().strip()))
+    return pairs
+
+
+# Alternate selectors work on the whole page (there is no class to scope by)
+ALTERNATE_SELECTORS = {
+    'label_text': _pairs_label_text,
+    'aria': _pairs_aria,
+}
+SELECTORS = ['class'] + list(ALTERNATE_SELECTORS)
+
+
+def parse_advanced_stats(html, backend=PARSER_BACKEND, selectors='class'):
+    """Parse advanced stats from HTML"""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r} (choose from {', '.join(PARSER_BACKENDS)})")
+
+    if selectors == 'class':
+        panel = stats_panel(html)
+        pairs = PARSER_BACKENDS[backend](panel) if panel else []
+    else:
+        pairs = ALTERNATE_SELECTORS[selectors](html)
+
+    stats = {}
+    for label, value in pairs:
+        column = ADVANCED_LABELS.get(label)
+        if column:
+            stats[column] = to_float(value)
+    return stats
+
+
+def panel_fingerprint(html):
+    """Short hash of the panel markup around the labels: tag and class of each label, its value and their parent
+
+    Found by label text, so it does not depend on the selectors it checks.
+    """
+    root = _document(html)
+    parts = []
+    for label in ADVANCED_LABELS:
+        elements = root.xpath('//body//*[not(*) and not(ancestor-or-self::script) and normalize-space(.)=$label]',
+                              label=label)
+        if not elements:
+            parts.append(f'{label}:-')
+            continue
+        element = elements[0]
+        value, parent = element.getnext(), element.getparent()
+        parts.append(':'.join([
+            label,
+            element.tag, element.get('class', ''),
+            value.tag if value is not None else '-', value.get('class', '') if value is not None else '',
+            parent.tag, parent.get('class', ''),
+        ]))
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def missing_labels(stats):
+    return [label for label, column in ADVANCED_LABELS.items() if stats.get(column) is None]
+
+
+def check_panel(html, backend=PARSER_BACKEND):
+    """First selectors in SELECTORS that read every label: (selectors or None, missing labels per selectors tried)"""
+    missing = {}
+    for selectors in SELECTORS:
+        missing[selectors] = missing_labels(parse_advanced_stats(html, backend, selectors))
+        if not missing[selectors]:
+            return selectors, missing
+    return None, missing
@@ -1,37 +1,97 @@
 """
 UI-based scraper for advanced NHL 26 stats
+
+The first page of a run is checked against the stats panel markup
+(scrapers/parsers.py check_panel): if the class selectors no longer read every
+label the run switches to an alternate selector set, and if none do it stops
+with PanelDriftError instead of saving games of empty advanced stats.
+
+In lean mode (LEAN_BROWSER) pages share one browser context with a smaller
+viewport, images, media, fonts and known trackers are aborted before they
+load, and a match page counts as loaded once the ADVANCED STATS tab is on it
+rather than when the network goes quiet. Full mode is the old behaviour: a
+fresh context per match, everything loaded, networkidle plus a fixed wait.
+Navigation time and bytes received per match are recorded either way,
+labelled 'lean' or 'full', so the two modes can be compared.
 """
 import asyncio
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+import json
+import time
 import pandas as pd
 from datetime import datetime
 import sys
 from pathlib import Path
+from urllib.parse import urlparse
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from config.config import (
     PLAYER_NAMES, CLUB_ID, DB_ADVANCED_STATS,
-    SCRAPER_TIMEOUT, WAIT_AFTER_CLICK, HEADLESS_MODE,
+    SCRAPER_TIMEOUT, WAIT_AFTER_CLICK, HEADLESS_MODE, PANEL_FINGERPRINT_FILE,
+    LEAN_BROWSER, LEAN_VIEWPORT, BLOCKED_RESOURCE_TYPES, BLOCKED_HOSTS,
     get_game_url
 )
-from utils.helpers import setup_logging
+from scrapers.parsers import check_panel, panel_fingerprint, parse_advanced_stats
+from utils.archive import PayloadArchive
+from utils.helpers import setup_logging, log_context
+from utils.schema import ADVANCED_SCHEMA, apply_schema, read_table
+from utils.store import save_table, table_exists, write_json
+from utils.ratelimit import goto, limiter_for
+from utils.metrics import (
+    BROWSER_STARTS, MATCH_SCRAPE_SECONDS, RECORDS_SAVED, UI_PANEL_CHECKS,
+    BLOCKED_REQUESTS, MATCH_NAVIGATION_SECONDS, MATCH_BYTES_RECEIVED
+)
 
 logger = setup_logging(__name__)
 
 
+class PanelDriftError(Exception):
+    """No selector set reads every advanced-stats label on the page"""
+
+
+def blocked_reason(resource_type, url):
+    """Why lean mode aborts a request ('tracker' or the resource type), or None to let it through"""
+    host = urlparse(url).hostname or ''
+    if any(host == blocked or host.endswith('.' + blocked) for blocked in BLOCKED_HOSTS):
+        return 'tracker'
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return resource_type
+    return None
+
+
+class PageTraffic:
+    """Bytes received (from the DevTools network events) and requests blocked on one page"""
+    
+    def __init__(self):
+        self.bytes = 0
+        self.blocked = 0
+    
+    def on_loading_finished(self, event):
+        self.bytes += event.get('encodedDataLength', 0)
+
+
 class UIAdvancedStatsScraper:
     """Scrapes advanced stats from ChelStats UI"""
     
-    def __init__(self):
+    def __init__(self, lean=LEAN_BROWSER):
         self.playwright = None
         self.browser = None
+        self.context = None
+        self.lean = lean
+        self.mode = 'lean' if lean else 'full'
+        self.archive = PayloadArchive()
+        self.selectors = None  # chosen from the first page of a run
+        self.drift_error = None
         
     async def initialize(self):
+        from playwright.async_api import async_playwright
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(headless=HEADLESS_MODE)
-        logger.info("Browser initialized")
+        if self.lean:
+            # One context for every match, so scripts and styles stay cached between games
+            self.context = await self.browser.new_context(viewport=LEAN_VIEWPORT)
+        BROWSER_STARTS.inc(scraper='ui')
+        logger.info(f"Browser initialized ({self.mode} mode)")
         
     async def close(self):
         if self.browser:
@@ -40,55 +100,79 @@ class UIAdvancedStatsScraper:
             await self.playwright.stop()
         logger.info("Browser closed")
     
-    def parse_advanced_stats(self, html):
-        """Parse advanced stats from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
-        stats = {}
+    async def open_page(self):
+        """New page with traffic accounting: in the shared context with blocking (lean) or in its own context (full)"""
+        # browser.new_page() gives the page a context of its own, closed with the page
+        page = await (self.context.new_page() if self.lean else self.browser.new_page())
+        traffic = PageTraffic()
         
-        # Find all label tags
-        labels = soup.find_all('p', class_='css-9y6e4h')
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send('Network.enable')
+        cdp.on('Network.loadingFinished', traffic.on_loading_finished)
         
-        for label in labels:
-            label_text = label.get_text(strip=True)
-            value_tag = label.find_next_sibling('p')
+        if self.lean:
+            async def block(route):
+                reason = blocked_reason(route.request.resource_type, route.request.url)
+                if reason is None:
+                    await route.continue_()
+                    return
+                traffic.blocked += 1
+                BLOCKED_REQUESTS.inc(reason=reason)
+                await route.abort()
             
-            if value_tag:
-                value_text = value_tag.get_text(strip=True)
-                
-                if label_text == 'WAR':
-                    stats['war'] = self._to_float(value_text)
-                elif label_text == 'TO':
-                    stats['total_offense'] = self._to_float(value_text)
-                elif label_text == 'TD':
-                    stats['total_defense'] = self._to_float(value_text)
-                elif label_text == 'Eff':
-                    stats['efficiency'] = self._to_float(value_text)
-                elif label_text == 'xG':
-                    stats['expected_goals'] = self._to_float(value_text)
-                elif label_text == 'GAE':
-                    stats['goals_above_expected'] = self._to_float(value_text)
-                elif label_text == 'GAR':
-                    stats['goals_above_replacement'] = self._to_float(value_text)
-        
-        return stats
+            await page.route('**/*', block)
+        return page, traffic
     
-    def _to_float(self, value):
-        try:
-            return float(str(value).replace('%', '').replace(',', '').strip())
-        except:
-            return None
+    def check_panel(self, html):
+        """Choose the selectors for this run from its first page, or raise PanelDriftError"""
+        fingerprint = panel_fingerprint(html)
+        baseline = {}
+        if PANEL_FINGERPRINT_FILE.exists():
+            baseline = json.loads(PANEL_FINGERPRINT_FILE.read_text())
+        
+        selectors, missing = check_panel(html)
+        if selectors is None:
+            UI_PANEL_CHECKS.inc(result='broken')
+            tried = '; '.join(f"{name} missing {', '.join(labels)}" for name, labels in missing.items())
+            raise PanelDriftError(f"stats panel changed (fingerprint {baseline.get('fingerprint')} -> {fingerprint}) "
+                                  f"and no selectors read every label: {tried}")
+        
+        if selectors != 'class':
+            UI_PANEL_CHECKS.inc(result='adapted')
+            logger.warning(f"Stats panel class selectors miss {', '.join(missing['class'])}; "
+                           f"using '{selectors}' selectors for this run")
+        elif baseline and baseline['fingerprint'] != fingerprint:
+            UI_PANEL_CHECKS.inc(result='changed')
+            logger.info(f"Stats panel markup changed ({baseline['fingerprint']} -> {fingerprint}), labels still parse")
+        else:
+            UI_PANEL_CHECKS.inc(result='ok')
+        
+        write_json({'fingerprint': fingerprint, 'selectors': selectors, 'checked_at': datetime.now().isoformat()},
+                   PANEL_FINGERPRINT_FILE)
+        self.selectors = selectors
     
     async def scrape_game(self, match_id):
         """Scrape advanced stats for one game"""
-        page = await self.browser.new_page()
+        page, traffic = await self.open_page()
         url = get_game_url(match_id)
         
         all_player_stats = []
         
         try:
             logger.info(f"Scraping game {match_id}")
-            await page.goto(url, wait_until="networkidle", timeout=SCRAPER_TIMEOUT)
-            await page.wait_for_timeout(5000)
+            start = time.perf_counter()
+            if self.lean:
+                # Blocked trackers and retried beacons keep the network from going idle; the tab is what we need
+                await goto(page, url, wait_until="domcontentloaded", timeout=SCRAPER_TIMEOUT)
+                await page.wait_for_selector('text=ADVANCED STATS', timeout=SCRAPER_TIMEOUT)
+            else:
+                await goto(page, url, wait_until="networkidle", timeout=SCRAPER_TIMEOUT)
+            navigation_seconds = time.perf_counter() - start
+            MATCH_NAVIGATION_SECONDS.observe(navigation_seconds, mode=self.mode)
+            logger.info(f"Loaded match page in {navigation_seconds:.1f}s "
+                        f"({traffic.bytes / 1e6:.2f} MB, {traffic.blocked} requests blocked)")
+            if not self.lean:
+                await page.wait_for_timeout(5000)
             
             # Close any modals
             await page.keyboard.press('Escape')
@@ -110,7 +194,9 @@ class UIAdvancedStatsScraper:
                     
                     # Select player
                     try:
-                        await page.locator(f'[role="option"]:has-text("{player_name}")').click(timeout=5000)
+                        # Selecting a player may fetch their stats, so it counts against the host too
+                        async with limiter_for(url).slot_async():
+                            await page.locator(f'[role="option"]:has-text("{player_name}")').click(timeout=5000)
                     except Exception as e:
                         logger.warning(f"  {player_name} not found in dropdown (likely didn't play)")
                         # Close the dropdown before continuing
@@ -122,7 +208,10 @@ class UIAdvancedStatsScraper:
                     
                     # Extract stats
                     html = await page.content()
-                    stats = self.parse_advanced_stats(html)
+                    self.archive.put('advanced_html', html.encode('utf-8'), match_id, player_name)
+                    if self.selectors is None:
+                        self.check_panel(html)
+                    stats = parse_advanced_stats(html, selectors=self.selectors)
                     
                     stats['player_name'] = player_name
                     stats['match_id'] = match_id
@@ -132,15 +221,21 @@ class UIAdvancedStatsScraper:
                     
                     logger.info(f"  {player_name}: WAR={stats.get('war', 'N/A')}%")
                     
+                except PanelDriftError:
+                    raise
                 except Exception as e:
                     logger.error(f"  Error scraping {player_name}: {e}")
             
             return all_player_stats
             
+        except PanelDriftError:
+            raise
         except Exception as e:
             logger.error(f"Error scraping game {match_id}: {e}")
             return []
         finally:
+            # Everything the match cost, including the player switches
+            MATCH_BYTES_RECEIVED.observe(traffic.bytes, mode=self.mode)
             await page.close()
     
     async def scrape(self, match_ids):
@@ -150,11 +245,16 @@ class UIAdvancedStatsScraper:
         await self.initialize()
         
         all_stats = []
-        for match_id in match_ids:
-            stats = await self.scrape_game(match_id)
-            all_stats.extend(stats)
-        
-        await self.close()
+        try:
+            for match_id in match_ids:
+                with log_context(match_id=match_id), MATCH_SCRAPE_SECONDS.time():
+                    stats = await self.scrape_game(match_id)
+                all_stats.extend(stats)
+        except PanelDriftError as e:
+            self.drift_error = str(e)
+            logger.error(f"Stopping advanced stats scraper after {len(all_stats)} records: {e}")
+        finally:
+            await self.close()
         
         return all_stats
     
@@ -164,13 +264,13 @@ class UIAdvancedStatsScraper:
             logger.warning("No data to save")
             return 0
         
-        df_new = pd.DataFrame(data)
+        df_new = apply_schema(pd.DataFrame(data), ADVANCED_SCHEMA)
         
-        if DB_ADVANCED_STATS.exists():
-            df_existing = pd.read_csv(DB_ADVANCED_STATS)
+        if table_exists(DB_ADVANCED_STATS):
+            df_existing = read_table(DB_ADVANCED_STATS, ADVANCED_SCHEMA)
             
-            df_existing['key'] = df_existing['match_id'].astype(str) + '_' + df_existing['player_name']
-            df_new['key'] = df_new['match_id'].astype(str) + '_' + df_new['player_name']
+            df_existing['key'] = df_existing['match_id'].astype(str) + '_' + df_existing['player_name'].astype(str)
+            df_new['key'] = df_new['match_id'].astype(str) + '_' + df_new['player_name'].astype(str)
             
             df_new_only = df_new[~df_new['key'].isin(df_existing['key'])].drop('key', axis=1)
             df_existing = df_existing.drop('key', axis=1)
@@ -183,7 +283,8 @@ class UIAdvancedStatsScraper:
         else:
             df_combined = df_new
         
-        df_combined.to_csv(DB_ADVANCED_STATS, index=False)
+        save_table(df_combined, DB_ADVANCED_STATS)
+        RECORDS_SAVED.inc(len(df_new), table='advanced_stats')
         logger.info(f"Saved {len(df_new)} new records to {DB_ADVANCED_STATS}")
         
         return len(df_new)
\ No newline at end of file
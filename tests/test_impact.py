@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from analytics.impact import RidgeImpactModel
+from benchmarks import synthetic
+
+
+def merged_rows(n_games=100):
+    return synthetic.merged_stats_frame(synthetic.generate_player_games(n_games))
+
+
+def test_chunked_fit_matches_single_pass():
+    df = merged_rows()
+    single = RidgeImpactModel()
+    single.partial_fit(df)
+
+    # 7-row chunks put most games across a chunk boundary
+    chunked = RidgeImpactModel()
+    for start in range(0, len(df), 7):
+        chunked.partial_fit(df.iloc[start:start + 7])
+
+    assert chunked.n == single.n == df[single.targets].notna().all(axis=1).sum()
+    np.testing.assert_allclose(chunked.xtx, single.xtx)
+    np.testing.assert_allclose(chunked.xty, single.xty)
+    np.testing.assert_allclose(chunked.solve().coef, single.solve().coef)
+
+
+def test_refit_skips_rows_already_seen(tmp_path):
+    df = merged_rows()
+    model = RidgeImpactModel()
+    model.partial_fit(df)
+    model.save(tmp_path / 'model.npz')
+
+    loaded = RidgeImpactModel.load(tmp_path / 'model.npz')
+    assert loaded.partial_fit(df) == 0
+    assert loaded.n == model.n
@@ -0,0 +1,85 @@
+"""
+Content-addressed archive of raw scraped payloads
+
+Every API game payload and advanced-stats page is stored once as a
+gzip-compressed blob named by the SHA-256 of its bytes, so the same payload
+seen on every poll costs one file. index.csv maps (kind, match_id,
+player_name) to blob digests; pipeline/reparse.py rebuilds the raw tables from
+it without touching the network.
+"""
+import gzip
+import hashlib
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import ARCHIVE_DIR
+from utils.metrics import ARCHIVE_WRITES
+
+INDEX_COLUMNS = ['kind', 'match_id', 'player_name', 'digest', 'bytes', 'archived_at']
+
+
+def blob_path(root, digest):
+    return Path(root) / 'blobs' / digest[:2] / f'{digest}.gz'
+
+
+def read_blob(path):
+    with gzip.open(path, 'rb') as f:
+        return f.read()
+
+
+class PayloadArchive:
+    """Gzip blobs keyed by SHA-256, indexed by kind, match_id and player"""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / 'index.csv'
+        self._indexed = None
+
+    def _load_index_keys(self):
+        if self._indexed is None:
+            index = self.index()
+            self._indexed = set(zip(index['kind'], index['match_id'].astype(str),
+                                    index['player_name'].fillna(''), index['digest']))
+        return self._indexed
+
+    def put(self, kind, data, match_id, player_name=''):
+        """Store `data` (bytes) unless an identical blob exists; returns its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = blob_path(self.root, digest)
+        if path.exists():
+            ARCHIVE_WRITES.inc(kind=kind, result='duplicate')
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(gzip.compress(data, mtime=0))
+            os.replace(tmp_path, path)
+            ARCHIVE_WRITES.inc(kind=kind, result='new')
+
+        key = (kind, str(match_id), player_name or '', digest)
+        indexed = self._load_index_keys()
+        if key not in indexed:
+            import pandas as pd
+            entry = pd.DataFrame([dict(zip(INDEX_COLUMNS, key[:3] + (digest, len(data), datetime.now().isoformat())))])
+            self.root.mkdir(parents=True, exist_ok=True)
+            entry.to_csv(self.index_path, mode='a', header=not self.index_path.exists(), index=False)
+            indexed.add(key)
+        return digest
+
+    def get(self, digest):
+        return read_blob(blob_path(self.root, digest))
+
+    def index(self, kind=None, latest=False):
+        """Index rows (optionally one kind); with `latest`, the newest blob per match and player"""
+        import pandas as pd
+        if not self.index_path.exists():
+            return pd.DataFrame(columns=INDEX_COLUMNS)
+        index = pd.read_csv(self.index_path, dtype={'match_id': str, 'player_name': str})
+        if kind is not None:
+            index = index[index['kind'] == kind]
+        if latest:
+            index = index.drop_duplicates(['kind', 'match_id', 'player_name'], keep='last')
+        return index.reset_index(drop=True)
@@ -0,0 +1,157 @@
+"""
+Append-only change log of merged stats rows, for downstream consumers
+
+Each inserted, updated or deleted (match_id, player_name) row of
+merged_stats.csv gets one entry with a monotonically increasing sequence
+number (SQLite, data/processed/changes.db). Consumers keep a cursor (the last
+sequence they processed) and read only what came after it:
+
+    log = ChangeLog()
+    for change in log.read(after=log.cursor('discord_bot')):
+        ...
+    log.commit('discord_bot', change['seq'])
+
+or from the shell: python utils/changelog.py --consumer discord_bot
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import CHANGELOG_DB, CHANGELOG_BATCH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    match_id INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    changed_at TEXT NOT NULL,
+    row TEXT
+);
+CREATE TABLE IF NOT EXISTS current_rows (
+    match_id INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    row_hash INTEGER NOT NULL,
+    PRIMARY KEY (match_id, player_name)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    consumer TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+"""
+
+KEY_COLUMNS = ['match_id', 'player_name']
+
+
+class ChangeLog:
+    """Sequence-numbered inserts/updates/deletes of merged stats rows, with named consumer cursors"""
+
+    def __init__(self, path=CHANGELOG_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success, rolls back on error and is always closed"""
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def publish(self, df, hashes):
+        """Log the rows of `df` that are new or changed since the last publish, and the keys that disappeared
+
+        `hashes` is a per-row content hash aligned with `df` (analytics.validation.row_hashes).
+        Returns {'insert': n, 'update': n, 'delete': n}.
+        """
+        keys = df[KEY_COLUMNS].astype({'match_id': 'int64', 'player_name': str})
+        # SQLite integers are signed; nullable Int64 keeps the hashes exact through the outer merge
+        incoming = keys.assign(row_hash=pd.array(hashes.to_numpy().view('int64'), dtype='Int64'),
+                               position=range(len(df)))
+
+        with self._connect() as conn:
+            current = pd.read_sql('SELECT match_id, player_name, row_hash FROM current_rows', conn)
+            current = current.astype({'match_id': 'int64', 'player_name': str, 'row_hash': 'Int64'})
+            both = incoming.merge(current, on=KEY_COLUMNS, how='outer', suffixes=('', '_logged'), indicator=True)
+
+            inserted = both[both['_merge'] == 'left_only']
+            changed_hash = both['row_hash'].ne(both['row_hash_logged']).fillna(False).astype(bool)
+            updated = both[(both['_merge'] == 'both') & changed_hash]
+            deleted = both[both['_merge'] == 'right_only']
+
+            changed = pd.concat([inserted.assign(op='insert'), updated.assign(op='update')]).sort_values('position')
+            rows = df.iloc[changed['position'].astype(int)].to_json(orient='records', lines=True, date_format='iso')
+            changed_at = datetime.now().isoformat()
+
+            entries = [(op, int(match_id), player_name, int(row_hash), changed_at, row)
+                       for op, match_id, player_name, row_hash, row in zip(
+                           changed['op'], changed['match_id'], changed['player_name'], changed['row_hash'],
+                           rows.splitlines())]
+            entries += [('delete', int(match_id), player_name, int(row_hash), changed_at, None)
+                        for match_id, player_name, row_hash in zip(
+                            deleted['match_id'], deleted['player_name'], deleted['row_hash_logged'])]
+
+            conn.executemany('INSERT INTO changes (op, match_id, player_name, row_hash, changed_at, row) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', entries)
+            conn.executemany('INSERT OR REPLACE INTO current_rows (match_id, player_name, row_hash) VALUES (?, ?, ?)',
+                             [entry[1:4] for entry in entries if entry[0] != 'delete'])
+            conn.executemany('DELETE FROM current_rows WHERE match_id = ? AND player_name = ?',
+                             [entry[1:3] for entry in entries if entry[0] == 'delete'])
+
+        return {'insert': len(inserted), 'update': len(updated), 'delete': len(deleted)}
+
+    def read(self, after=0, limit=CHANGELOG_BATCH):
+        """Up to `limit` changes with seq > `after`, oldest first; `row` is the row as a dict (None for deletes)"""
+        with self._connect() as conn:
+            records = conn.execute('SELECT seq, op, match_id, player_name, changed_at, row FROM changes '
+                                   'WHERE seq > ? ORDER BY seq LIMIT ?', (after, limit)).fetchall()
+        changes = [dict(record) for record in records]
+        for change in changes:
+            change['row'] = json.loads(change['row']) if change['row'] is not None else None
+        return changes
+
+    def latest_seq(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+
+    def cursor(self, consumer):
+        """Last sequence number `consumer` committed (0 if it never has)"""
+        with self._connect() as conn:
+            record = conn.execute('SELECT seq FROM cursors WHERE consumer = ?', (consumer,)).fetchone()
+        return record['seq'] if record else 0
+
+    def commit(self, consumer, seq):
+        """Record that `consumer` has processed everything up to `seq`"""
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO cursors (consumer, seq) VALUES (?, ?)', (consumer, seq))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print merged stats changes as JSON lines")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--consumer', help="Read from (and advance) this consumer's cursor")
+    source.add_argument('--after', type=int, default=0, help="Read changes after this sequence number")
+    parser.add_argument('--limit', type=int, default=CHANGELOG_BATCH)
+    args = parser.parse_args()
+
+    log = ChangeLog()
+    after = log.cursor(args.consumer) if args.consumer else args.after
+    changes = log.read(after, args.limit)
+    for change in changes:
+        print(json.dumps(change))
+    if args.consumer and changes:
+        log.commit(args.consumer, changes[-1]['seq'])
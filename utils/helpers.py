@@ -1,8 +1,15 @@
 """
 Shared utility functions
 """
+import atexit
+import contextvars
+import copy
+import csv
+import json
 import logging
-import pandas as pd
+import queue
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import sys
 
@@ -10,52 +17,138 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from config.config import (
     DB_BASIC_STATS, DB_ADVANCED_STATS,
-    LOG_FILE, LOG_LEVEL
+    LOG_FILE, LOG_LEVEL, LOG_LEVELS, LOG_MAX_BYTES, LOG_BACKUP_COUNT
 )
 
+LOG_CONTEXT_FIELDS = ('run_id', 'step', 'match_id')
 
-def setup_logging(name):
-    """Setup logging configuration"""
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, LOG_LEVEL))
+_log_context = contextvars.ContextVar('log_context', default={})
+_log_queue = None
+_log_listener = None
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current run_id/step/match_id onto each record"""
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in LOG_CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TracebackQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback in exc_text instead of folding it into the message"""
+
+    def prepare(self, record):
+        # QueueHandler.prepare formats the whole record into msg and drops exc_info/exc_text
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None  # tracebacks hold frames; only the formatted text crosses the queue
+        return record
+
+
+def _get_log_queue():
+    """Start the shared listener that does all log I/O off the caller's thread"""
+    global _log_queue, _log_listener
     
-    # Avoid duplicate handlers
-    if logger.handlers:
-        return logger
+    if _log_queue is not None:
+        return _log_queue
     
-    # File handler
-    file_handler = logging.FileHandler(LOG_FILE)
+    # File handler (JSON, rotated)
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
     file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(JsonFormatter())
     
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
+    console_handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    ))
     
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    _log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(_log_queue, file_handler, console_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    return _log_queue
+
+
+def setup_logging(name):
+    """Setup logging configuration"""
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, LOG_LEVELS.get(name, LOG_LEVEL)))
+    
+    # Avoid duplicate handlers
+    if logger.handlers:
+        return logger
+    
+    # Records are only enqueued here; formatting and I/O happen on the listener thread
+    queue_handler = TracebackQueueHandler(_get_log_queue())
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
     
     return logger
 
 
+def set_log_context(**fields):
+    """Set run_id/step/match_id for all subsequent records in this context"""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+@contextmanager
+def log_context(**fields):
+    """Temporarily add run_id/step/match_id fields to log records"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def _read_column(path, column):
+    """Values of one CSV column as strings, without loading pandas (this runs on every poll)"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        position = next(reader).index(column)
+        return {row[position] for row in reader if len(row) > position and row[position]}
+
+
 def get_existing_match_ids():
     """Get set of match IDs already in database"""
     match_ids = set()
     
     if DB_BASIC_STATS.exists():
-        df = pd.read_csv(DB_BASIC_STATS)
-        match_ids.update(df['match_id'].unique())
+        match_ids.update(int(match_id) for match_id in _read_column(DB_BASIC_STATS, 'match_id'))
     
     if DB_ADVANCED_STATS.exists():
-        df = pd.read_csv(DB_ADVANCED_STATS)
-        match_ids.update(df['match_id'].astype(str).unique())
+        match_ids.update(_read_column(DB_ADVANCED_STATS, 'match_id'))
     
     return match_ids
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Prometheus-style metrics for the stats pipeline
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class _Metric:
+    """Base class for a labelled metric family"""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (e.g. latencies in seconds)"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, state):
+        lines = []
+        names = self.labelnames + ('le',)
+        for bound, count in zip(self.buckets, state['counts']):
+            lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {count}")
+        lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {state['count']}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric family and renders the text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Pipeline metrics
+GAMES_DISCOVERED = REGISTRY.counter(
+    'nhl26_games_discovered_total', "Games returned by the club API ('seen') and games not yet stored ('new')", ['status'])
+RECORDS_SAVED = REGISTRY.counter(
+    'nhl26_records_saved_total', 'Records written to each table', ['table'])
+MATCH_SCRAPE_SECONDS = REGISTRY.histogram(
+    'nhl26_match_scrape_seconds', 'Wall-clock time to scrape advanced stats for one match')
+BROWSER_STARTS = REGISTRY.counter(
+    'nhl26_browser_starts_total', 'Browser launches by scraper', ['scraper'])
+HTTP_RESPONSES = REGISTRY.counter(
+    'nhl26_http_responses_total', 'HTTP responses by host and status code', ['host', 'status'])
+MERGED_RECORDS = REGISTRY.gauge(
+    'nhl26_merged_records', 'Records in the merged stats table after the last merge')
+VALIDATION_FAILURES = REGISTRY.counter(
+    'nhl26_validation_failures_total', 'Validation checks that failed', ['check'])
+ARCHIVE_WRITES = REGISTRY.counter(
+    'nhl26_archive_writes_total', "Raw payloads archived, by kind and whether the blob was 'new' or a 'duplicate'",
+    ['kind', 'result'])
+HTTP_RETRIES = REGISTRY.counter(
+    'nhl26_http_retries_total', "Requests retried by host and reason ('throttled', 'server_error', 'timeout')",
+    ['host', 'reason'])
+HOST_REQUEST_RATE = REGISTRY.gauge(
+    'nhl26_host_request_rate', 'Current allowed request rate per host (requests/s) after adaptive backoff', ['host'])
+MATCH_NAVIGATION_SECONDS = REGISTRY.histogram(
+    'nhl26_match_navigation_seconds', "Match page navigation time, by browsing mode ('lean' or 'full')", ['mode'])
+MATCH_BYTES_RECEIVED = REGISTRY.histogram(
+    'nhl26_match_bytes_received', "Bytes received over the network for one match page, by browsing mode", ['mode'],
+    buckets=(2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7, 5e7))
+BLOCKED_REQUESTS = REGISTRY.counter(
+    'nhl26_blocked_requests_total', "Requests aborted in lean browsing mode, by reason ('tracker' or resource type)",
+    ['reason'])
+CHANGES_PUBLISHED = REGISTRY.counter(
+    'nhl26_changes_published_total', "Merged stats rows appended to the change log, by op ('insert', 'update', 'delete')",
+    ['op'])
+API_REQUESTS = REGISTRY.counter(
+    'nhl26_api_requests_total', 'Stats API requests by endpoint and status code', ['endpoint', 'status'])
+API_CACHE_LOOKUPS = REGISTRY.counter(
+    'nhl26_api_cache_lookups_total', "Stats API response cache lookups ('hit' or 'miss')", ['result'])
+UI_PANEL_CHECKS = REGISTRY.counter(
+    'nhl26_ui_panel_checks_total',
+    "Stats panel checks on the first page of a UI scraper run: 'ok', 'changed' (markup changed, labels still parse), "
+    "'adapted' (alternate selectors) or 'broken' (run aborted)", ['result'])
+STEP_SECONDS = REGISTRY.histogram(
+    'nhl26_step_seconds', 'Duration of pipeline steps', ['step'])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, addr='127.0.0.1'):
+    """Serve /metrics from a daemon thread; returns the server"""
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    return server
+
+
+def write_textfile(path):
+    """Write all metrics to a node_exporter textfile-collector file"""
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
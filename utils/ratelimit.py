@@ -0,0 +1,187 @@
+"""
+Per-host politeness: token-bucket rate limits, concurrency caps and retries
+
+Every request to a host takes a token from that host's bucket (HOST_RATE_LIMITS
+in config/config.py) and holds one of its concurrency slots. A 429, 5xx or
+timeout multiplies the host's rate by RATE_LIMIT_BACKOFF (and pauses the host
+for Retry-After when sent); each success adds RATE_LIMIT_RECOVERY back, up to
+the configured rate. http_get() and goto() retry those failures with
+full-jitter exponential backoff. The current rate per host is the
+nhl26_host_request_rate gauge.
+"""
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+import sys
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import (
+    HOST_RATE_LIMITS, DEFAULT_RATE_LIMIT, RATE_LIMIT_MIN_RATE, RATE_LIMIT_BACKOFF, RATE_LIMIT_RECOVERY,
+    HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_RETRY_BASE, HTTP_RETRY_MAX
+)
+from utils.helpers import setup_logging
+from utils.metrics import HOST_REQUEST_RATE, HTTP_RESPONSES, HTTP_RETRIES
+
+logger = setup_logging(__name__)
+
+
+class HostLimiter:
+    """Token bucket and concurrency cap for one host; the rate backs off on failures and recovers on success"""
+
+    def __init__(self, host, rate, burst, concurrency):
+        self.host = host
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self._threads = threading.BoundedSemaphore(concurrency)
+        self._loop_semaphore = (None, None)
+        HOST_REQUEST_RATE.set(rate, host=host)
+
+    def _reserve(self):
+        """Take a token; seconds to wait before the request may start"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def _semaphore(self):
+        # asyncio primitives belong to one event loop; each asyncio.run() gets its own
+        loop = asyncio.get_running_loop()
+        if self._loop_semaphore[0] is not loop:
+            self._loop_semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        return self._loop_semaphore[1]
+
+    @contextmanager
+    def slot(self):
+        """Hold a concurrency slot and wait for a token (threads)"""
+        with self._threads:
+            time.sleep(self._reserve())
+            yield
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Hold a concurrency slot and wait for a token (coroutines)"""
+        async with self._semaphore():
+            await asyncio.sleep(self._reserve())
+            yield
+
+    def record(self, outcome, retry_after=None):
+        """Adapt the rate to a request outcome: 'ok', 'throttled', 'server_error' or 'timeout'"""
+        with self._lock:
+            if outcome == 'ok':
+                self.rate = min(self.max_rate, self.rate + RATE_LIMIT_RECOVERY)
+            else:
+                self.rate = max(RATE_LIMIT_MIN_RATE, self.rate * RATE_LIMIT_BACKOFF)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            rate = self.rate
+        HOST_REQUEST_RATE.set(round(rate, 3), host=self.host)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url):
+    """The shared HostLimiter for `url`'s host"""
+    parsed = urlparse(url)
+    with _limiters_lock:
+        if parsed.netloc not in _limiters:
+            settings = HOST_RATE_LIMITS.get(parsed.hostname, DEFAULT_RATE_LIMIT)
+            _limiters[parsed.netloc] = HostLimiter(parsed.netloc, **settings)
+        return _limiters[parsed.netloc]
+
+
+def status_outcome(status):
+    if status == 429:
+        return 'throttled'
+    if status >= 500:
+        return 'server_error'
+    return 'ok'
+
+
+def retry_after_seconds(value):
+    """Retry-After in seconds (the HTTP-date form is ignored)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+    delay = random.uniform(0, min(HTTP_RETRY_MAX, HTTP_RETRY_BASE * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+def _log_retry(limiter, reason, attempt, delay):
+    HTTP_RETRIES.inc(host=limiter.host, reason=reason)
+    logger.warning(f"{reason} from {limiter.host}, retry {attempt + 1}/{HTTP_MAX_RETRIES} in {delay:.1f}s")
+
+
+def http_get(url, **kwargs):
+    """requests.get through the host's limiter, retrying 429/5xx/timeouts; returns the last response"""
+    limiter = limiter_for(url)
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            with limiter.slot():
+                response = requests.get(url, **kwargs)
+        except (requests.Timeout, requests.ConnectionError):
+            limiter.record('timeout')
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+            reason, retry_after = 'timeout', None
+        else:
+            HTTP_RESPONSES.inc(host=limiter.host, status=response.status_code)
+            reason = status_outcome(response.status_code)
+            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+            limiter.record(reason, retry_after)
+            if reason == 'ok' or attempt == HTTP_MAX_RETRIES:
+                return response
+        delay = retry_delay(attempt, retry_after)
+        _log_retry(limiter, reason, attempt, delay)
+        time.sleep(delay)
+
+
+async def goto(page, url, **kwargs):
+    """Playwright page.goto through the host's limiter, with the same retries as http_get"""
+    limiter = limiter_for(url)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            async with limiter.slot_async():
+                response = await page.goto(url, **kwargs)
+        except Exception:
+            # Playwright navigation timeouts and network errors
+            limiter.record('timeout')
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+            reason, retry_after = 'timeout', None
+        else:
+            if response is None:  # same-document navigation
+                limiter.record('ok')
+                return response
+            HTTP_RESPONSES.inc(host=limiter.host, status=response.status)
+            reason = status_outcome(response.status)
+            retry_after = retry_after_seconds(response.headers.get('retry-after'))
+            limiter.record(reason, retry_after)
+            if reason == 'ok' or attempt == HTTP_MAX_RETRIES:
+                return response
+        delay = retry_delay(attempt, retry_after)
+        _log_retry(limiter, reason, attempt, delay)
+        await asyncio.sleep(delay)
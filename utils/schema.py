@@ -0,0 +1,175 @@
+"""
+Declared column types for the basic, advanced and merged stats tables
+
+read_csv infers every number as int64/float64 and every string as object.
+These schemas shrink that: per-game counts fit in int16, ratings and
+percentages (two decimals, at most a few hundred) in float32, repeated labels
+become categoricals and scraped_at a native datetime. timestamp stays epoch
+seconds (int64) because the form, xG and impact tables key on it.
+
+Usage:
+    python utils/schema.py    # bytes per row before/after for the stored tables
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DB_BASIC_STATS, DB_ADVANCED_STATS, DB_MERGED_STATS
+from utils.store import held_table
+
+DATETIME = 'datetime64[ns]'
+
+IDENTIFIER_TYPES = {
+    'match_id': 'int64',
+    'timestamp': 'int64',
+    'scraped_at': DATETIME,
+    'player_name': 'category',
+    'player_id': 'int64',
+    'position': 'category',
+    'player_class': 'category',
+}
+
+COUNT_COLUMNS = [
+    'score', 'opponent_score', 'toi_seconds', 'goals', 'assists', 'points', 'gwg', 'ppg', 'shg',
+    'plus_minus', 'shots', 'shot_attempts', 'deflections', 'passes', 'pass_attempts', 'saucer_passes',
+    'possession_seconds', 'faceoff_wins', 'faceoff_losses', 'hits', 'blocked_shots', 'interceptions',
+    'takeaways', 'giveaways', 'pk_clear_zone', 'pim', 'penalties_drawn', 'goalie_saves',
+    'goalie_shots_against', 'goalie_goals_against', 'goalie_shutout_periods',
+]
+
+RATE_COLUMNS = [
+    'toi_minutes', 'rating_offense', 'rating_defense', 'rating_teamplay', 'shot_pct', 'shot_on_net_pct',
+    'pass_pct', 'possession_minutes', 'faceoff_pct', 'goalie_save_pct', 'goalie_gaa',
+]
+
+ADVANCED_COLUMNS = [
+    'war', 'total_offense', 'total_defense', 'efficiency', 'expected_goals', 'goals_above_expected',
+    'goals_above_replacement',
+]
+
+BASIC_SCHEMA = {
+    **IDENTIFIER_TYPES,
+    'result': 'category',
+    'opponent_club_id': 'int32',
+    **{column: 'int16' for column in COUNT_COLUMNS},
+    **{column: 'float32' for column in RATE_COLUMNS},
+}
+
+ADVANCED_SCHEMA = {
+    'match_id': 'int64',
+    'scraped_at': DATETIME,
+    'player_name': 'category',
+    **{column: 'float32' for column in ADVANCED_COLUMNS},
+}
+
+# Written by the merge step (see analytics/outcomes.py)
+OUTCOME_SCHEMA = {
+    'outcome': 'category',
+    'is_win': 'bool',
+    'is_loss': 'bool',
+    'is_ot_loss': 'bool',
+    'is_dnf': 'bool',
+}
+
+MERGED_SCHEMA = {**BASIC_SCHEMA, **ADVANCED_SCHEMA, **OUTCOME_SCHEMA}
+
+
+def _is_integer(dtype):
+    return dtype not in ('category', 'bool', DATETIME) and np.issubdtype(np.dtype(dtype), np.integer)
+
+
+def _cast(series, dtype):
+    if dtype == DATETIME:
+        return pd.to_datetime(series, format='ISO8601')
+    if dtype == 'category':
+        # Labels as they read back from the CSV, whatever type the source sent (player_class comes as a number)
+        return series.map(str, na_action='ignore').astype('category')
+    if dtype == 'bool':
+        return series.astype(dtype)
+
+    values = pd.to_numeric(series)
+    if not _is_integer(dtype):
+        return values.astype(dtype)
+    if values.isna().any():
+        # Missing values (a field the API left out) cannot live in a NumPy integer
+        return values.astype('float32' if np.dtype(dtype).itemsize < 4 else 'float64')
+    info = np.iinfo(dtype)
+    if values.min() < info.min or values.max() > info.max:
+        return values.astype('int64')
+    return values.astype(dtype)
+
+
+def apply_schema(df, schema):
+    """Return `df` with the columns `schema` declares cast to their types (others untouched)"""
+    columns = {c: _cast(df[c], t) for c, t in schema.items() if c in df.columns and str(df[c].dtype) != t}
+    return df.assign(**columns) if columns else df
+
+
+def read_table(path, schema, chunksize=None):
+    """Read a stats CSV with `schema` applied while parsing
+
+    Integer columns with gaps or out-of-range values fall back to a second,
+    per-column cast (see apply_schema). With `chunksize` an iterator of typed
+    chunks is returned instead. A table saved earlier in the current pipeline
+    run (utils/store.py) comes from memory rather than the file.
+    """
+    held = held_table(path)
+    if held is not None:
+        df = apply_schema(held, schema)
+        if chunksize is not None:
+            return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+        return df
+
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: schema[c] for c in header if c in schema and schema[c] != DATETIME}
+    dates = [c for c in header if schema.get(c) == DATETIME]
+    options = {'parse_dates': dates, 'date_format': 'ISO8601'}
+
+    if chunksize is not None:
+        safe = {c: ('float64' if _is_integer(t) else t) for c, t in dtypes.items()}
+        return (apply_schema(chunk, schema) for chunk in pd.read_csv(path, dtype=safe, chunksize=chunksize, **options))
+
+    try:
+        return pd.read_csv(path, dtype=dtypes, **options)
+    except (ValueError, OverflowError):
+        safe = {c: ('float64' if _is_integer(t) else t) for c, t in dtypes.items()}
+        return apply_schema(pd.read_csv(path, dtype=safe, **options), schema)
+
+
+def bytes_per_row(df):
+    return df.memory_usage(index=False, deep=True).sum() / max(len(df), 1)
+
+
+def memory_report(path, schema):
+    """Per-column dtype and bytes per row as read_csv infers them vs with `schema` applied"""
+    inferred = pd.read_csv(path)
+    typed = read_table(path, schema)
+    rows = max(len(typed), 1)
+    report = pd.DataFrame({
+        'inferred_dtype': inferred.dtypes.astype(str),
+        'inferred_bytes': inferred.memory_usage(index=False, deep=True) / rows,
+        'typed_dtype': typed.dtypes.astype(str),
+        'typed_bytes': typed.memory_usage(index=False, deep=True) / rows,
+    })
+    report.loc['TOTAL'] = ['', report['inferred_bytes'].sum(), '', report['typed_bytes'].sum()]
+    return report.round({'inferred_bytes': 1, 'typed_bytes': 1})
+
+
+if __name__ == "__main__":
+    tables = [
+        ('basic_stats', DB_BASIC_STATS, BASIC_SCHEMA),
+        ('advanced_stats', DB_ADVANCED_STATS, ADVANCED_SCHEMA),
+        ('merged_stats', DB_MERGED_STATS, MERGED_SCHEMA),
+    ]
+    for name, path, schema in tables:
+        if not path.exists():
+            print(f"{name}: {path} not found")
+            continue
+        report = memory_report(path, schema)
+        before, after = report.loc['TOTAL', 'inferred_bytes'], report.loc['TOTAL', 'typed_bytes']
+        print(f"\n{name}: {before:.1f} -> {after:.1f} bytes/row ({(after - before) / before:+.0%})")
+        print(report.to_string())
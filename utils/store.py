@@ -0,0 +1,339 @@
+"""
+Crash-safe table writes, run manifests and snapshot rollback
+
+Every table write goes to a temporary file in the same directory, is
+fsynced, and replaces the table with os.replace, so a crash leaves either
+the old file or the new one and readers never see half a file.
+
+A pipeline run wraps its writes in a RunTransaction. Tables saved with
+save_table() during the run stay in memory (read_table in utils/schema.py
+returns them to later steps) and are written once, when the run commits;
+outside a run save_table writes through like write_csv. On commit, each
+tracked table (SNAPSHOT_TABLES) that changed is copied into
+data/snapshots/<run_id>/ and a manifest listing the snapshot file of every
+table is written, then made current by replacing data/manifest.json.
+Snapshot files are never modified, so readers that go through
+committed_path() see all tables from one committed run without locking.
+A run that fails (or crashes) before commit has its tables restored from
+the current manifest; changes made outside a run (standalone pipeline
+scripts) are committed as their own snapshot when the next run begins.
+rollback() makes the previous manifest current again.
+
+    python utils/store.py --list
+    python utils/store.py --rollback [--to RUN_ID]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.config import DATA_DIR, SNAPSHOT_DIR, MANIFEST_FILE, RUN_MARKER_FILE, SNAPSHOT_TABLES, SNAPSHOT_KEEP
+from utils.helpers import setup_logging
+
+logger = setup_logging(__name__)
+
+_held = None  # path -> DataFrame saved during the active run, written at commit
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories cannot be opened
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, write):
+    """Call write(tmp_path), fsync the result and move it over `path` in one step"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        with open(tmp, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
+def write_csv(df, path, **kwargs):
+    kwargs.setdefault('index', False)
+    atomic_write(path, lambda tmp: df.to_csv(tmp, **kwargs))
+
+
+def write_json(obj, path, **kwargs):
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(obj, f, **kwargs)
+    atomic_write(path, write)
+
+
+def write_bytes(data, path):
+    atomic_write(path, lambda tmp: Path(tmp).write_bytes(data))
+
+
+def append_csv(df, path, columns=None):
+    """Append rows (matching the existing file's columns) on a copy that then replaces the file"""
+    path = Path(path)
+    exists = path.exists()
+    if exists:
+        import pandas as pd
+        columns = pd.read_csv(path, nrows=0).columns
+    if columns is not None:
+        df = df.reindex(columns=columns)
+
+    def write(tmp):
+        if exists:
+            shutil.copyfile(path, tmp)
+        df.to_csv(tmp, mode='a', header=not exists, index=False)
+    atomic_write(path, write)
+
+
+def save_table(df, path):
+    """Write a table, or during a pipeline run keep it for later steps and write it when the run commits"""
+    if _held is None:
+        write_csv(df, path)
+    else:
+        _held[Path(path)] = df.reset_index(drop=True)
+
+
+def held_table(path):
+    """The active run's unwritten version of a table, or None when it should be read from disk"""
+    return _held.get(Path(path)) if _held else None
+
+
+def table_exists(path):
+    return held_table(path) is not None or Path(path).exists()
+
+
+def _write_held():
+    # In the order they were saved, so tables derived from merged_stats end up newer than it (dashboard is_fresh)
+    for path, df in _held.items():
+        write_csv(df, path)
+    return len(_held)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _table_name(path):
+    """Manifest key for a table: its path under DATA_DIR"""
+    return Path(path).resolve().relative_to(DATA_DIR.resolve()).as_posix()
+
+
+def read_manifest(path=MANIFEST_FILE):
+    """The current (or given) manifest, or None before the first commit"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def committed_path(path):
+    """Where to read `path` as of the last committed run (the path itself if it is not tracked)"""
+    manifest = read_manifest()
+    try:
+        entry = manifest and manifest['tables'].get(_table_name(path))
+    except ValueError:
+        entry = None  # outside DATA_DIR
+    return SNAPSHOT_DIR / entry['snapshot'] if entry else Path(path)
+
+
+def _unchanged(path, entry):
+    """Whether `path` still holds the content `entry` recorded (hashing only files touched since)"""
+    stat = path.stat()
+    if entry.get('mtime_ns') == stat.st_mtime_ns and entry['bytes'] == stat.st_size:
+        return True  # every write replaces the file, so an untouched file keeps its mtime
+    return _sha256(path) == entry['sha256']
+
+
+def _restore(manifest, tables=SNAPSHOT_TABLES):
+    """Put every tracked table back to its content in `manifest` (tables it lacks are removed)"""
+    restored = 0
+    for path in tables:
+        entry = manifest['tables'].get(_table_name(path)) if manifest else None
+        if entry is None:
+            if path.exists():
+                path.unlink()
+                restored += 1
+        elif not path.exists() or not _unchanged(path, entry):
+            snapshot = SNAPSHOT_DIR / entry['snapshot']
+            atomic_write(path, lambda tmp: shutil.copy2(snapshot, tmp))
+            restored += 1
+    return restored
+
+
+def _write_manifest(manifest):
+    run_dir = SNAPSHOT_DIR / manifest['run_id']
+    write_json(manifest, run_dir / 'manifest.json', indent=2)
+    write_json(manifest, MANIFEST_FILE, indent=2)  # commit point
+
+
+def _prune(keep=SNAPSHOT_KEEP):
+    """Delete snapshot directories no manifest among the last `keep` refers to"""
+    manifests, manifest = [], read_manifest()
+    while manifest and len(manifests) < keep:
+        manifests.append(manifest)
+        previous = manifest.get('previous')
+        manifest = read_manifest(SNAPSHOT_DIR / previous / 'manifest.json') if previous else None
+
+    referenced = {m['run_id'] for m in manifests}
+    for m in manifests:
+        referenced.update(entry['snapshot'].split('/', 1)[0] for entry in m['tables'].values())
+    for run_dir in SNAPSHOT_DIR.iterdir() if SNAPSHOT_DIR.exists() else []:
+        if run_dir.is_dir() and run_dir.name not in referenced:
+            shutil.rmtree(run_dir)
+            logger.info(f"Pruned snapshot {run_dir.name}")
+
+
+def _snapshot(run_id, previous, note=None):
+    """Copy the tracked tables that differ from `previous` into a new snapshot and make it current
+
+    Returns (manifest, changed table names); with nothing changed, `previous` stays current.
+    """
+    tables = dict(previous['tables']) if previous else {}
+    changed = []
+    for path in SNAPSHOT_TABLES:
+        name = _table_name(path)
+        if not path.exists():
+            if tables.pop(name, None):
+                changed.append(name)
+            continue
+        if name in tables and _unchanged(path, tables[name]):
+            continue
+        sha256 = _sha256(path)
+        if name in tables and tables[name]['sha256'] == sha256:
+            continue
+        target = SNAPSHOT_DIR / run_id / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)  # keeps mtimes, which the dashboard compares
+        with open(target, 'rb+') as f:
+            os.fsync(f.fileno())
+        stat = target.stat()
+        tables[name] = {'snapshot': f'{run_id}/{name}', 'sha256': sha256, 'bytes': stat.st_size,
+                        'mtime_ns': stat.st_mtime_ns}
+        changed.append(name)
+
+    if not changed:
+        return previous, changed
+    manifest = {'run_id': run_id, 'committed_at': datetime.now().isoformat(),
+                'previous': previous['run_id'] if previous else None, 'tables': tables}
+    if note:
+        manifest['note'] = note
+    _write_manifest(manifest)
+    return manifest, changed
+
+
+class RunTransaction:
+    """Tables written between begin() and commit() become visible to committed readers together"""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.base = None
+
+    def begin(self):
+        global _held
+        self.base = read_manifest()
+        if RUN_MARKER_FILE.exists() and self.base is not None:
+            # An earlier run crashed between writing and committing
+            crashed = RUN_MARKER_FILE.read_text().strip()
+            restored = _restore(self.base)
+            logger.warning(f"Run {crashed} did not commit; restored {restored} tables to {self.base['run_id']}")
+
+        # Tables changed outside a run (or before the first one) get their own snapshot, so this run can be
+        # rolled back to them
+        self.base, adopted = _snapshot(f'{self.run_id}-base', self.base, note='changes made outside a pipeline run')
+        if adopted:
+            logger.info(f"Committed {len(adopted)} tables changed outside a pipeline run")
+
+        write_bytes(self.run_id.encode('utf-8'), RUN_MARKER_FILE)
+        _held = {}
+        return self
+
+    def commit(self):
+        """Write the tables held in memory, snapshot the changed tables and publish the run's manifest"""
+        global _held
+        written = _write_held()
+        _held = None
+        if written:
+            logger.info(f"Wrote {written} tables held in memory during run {self.run_id}")
+        manifest, changed = _snapshot(self.run_id, self.base)
+        RUN_MARKER_FILE.unlink(missing_ok=True)
+        if changed:
+            logger.info(f"Committed run {self.run_id}: {len(changed)} tables changed, "
+                        f"{len(manifest['tables'])} in the manifest")
+            _prune()
+        else:
+            logger.info(f"Run {self.run_id} changed no tables")
+        return manifest
+
+    def abort(self):
+        """Discard the run's writes: put the tables back as of the manifest the run started from"""
+        global _held
+        _held = None
+        restored = _restore(self.base) if self.base is not None else 0
+        RUN_MARKER_FILE.unlink(missing_ok=True)
+        logger.warning(f"Run {self.run_id} aborted, restored {restored} tables")
+
+
+def list_runs():
+    """Manifests from the current one back through its predecessors"""
+    runs, manifest = [], read_manifest()
+    while manifest:
+        runs.append(manifest)
+        previous = manifest.get('previous')
+        path = SNAPSHOT_DIR / previous / 'manifest.json' if previous else None
+        manifest = read_manifest(path) if path and path.exists() else None
+    return runs
+
+
+def rollback(run_id=None):
+    """Make the previous (or `run_id`'s) manifest current and restore its tables"""
+    current = read_manifest()
+    if current is None:
+        raise ValueError("Nothing to roll back: no run has been committed")
+    target_id = run_id or current.get('previous')
+    if target_id is None:
+        raise ValueError(f"Run {current['run_id']} has no previous snapshot")
+    target_path = SNAPSHOT_DIR / target_id / 'manifest.json'
+    if not target_path.exists():
+        raise ValueError(f"No snapshot for run {target_id} (pruned, or never committed)")
+
+    target = read_manifest(target_path)
+    write_json(target, MANIFEST_FILE, indent=2)
+    restored = _restore(target)
+    logger.info(f"Rolled back from {current['run_id']} to {target_id} ({restored} tables restored)")
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List committed runs or roll back to an earlier one")
+    parser.add_argument('--list', action='store_true', help="List committed runs, newest first")
+    parser.add_argument('--rollback', action='store_true', help="Restore the previous run's tables")
+    parser.add_argument('--to', metavar='RUN_ID', help="Run to roll back to (default: the previous one)")
+    args = parser.parse_args()
+
+    if args.rollback:
+        rollback(args.to)
+    for run in list_runs():
+        print(f"{run['run_id']}  {run['committed_at']}  {len(run['tables'])} tables"
+              + (f"  ({run['note']})" if run.get('note') else ''))